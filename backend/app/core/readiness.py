@@ -0,0 +1,80 @@
+# backend/app/core/readiness.py
+"""
+Startup state of the API process.
+
+app.main only imports FastAPI and light modules; the recommender stack
+(LangChain, Chroma, pandas) is imported and warmed up by the lifespan,
+by default in a background thread while the server already answers.
+This module records how far that got and how long each phase took, for
+/health, /health/ready, /metrics and the startup log line.
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# starting -> loading -> ready | no_vector_store | failed
+_state = "starting"
+_error: str | None = None
+_phases: dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def record(phase: str, seconds: float) -> None:
+    """Store the duration of a startup phase (e.g. import_app, warmup_agent)."""
+    with _lock:
+        _phases[phase] = seconds
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as startup phase `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def set_state(state: str, error: str | None = None) -> None:
+    global _state, _error
+    with _lock:
+        _state, _error = state, error
+
+
+def is_ready() -> bool:
+    """
+    True once startup loading finished. A missing vector store still counts:
+    the API is up and /vector/create can build one.
+    """
+    return _state in ("ready", "no_vector_store")
+
+
+def phases() -> dict[str, float]:
+    with _lock:
+        return dict(_phases)
+
+
+def snapshot() -> dict:
+    """State, error and per-phase seconds, for the health endpoints."""
+    with _lock:
+        return {
+            "state": _state,
+            "error": _error,
+            "phases": {name: round(seconds, 3) for name, seconds in _phases.items()},
+        }
+
+
+def report() -> str:
+    """One-line summary of the startup phases, e.g. 'import_app 0.61s, warmup_agent 0.42s'."""
+    return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in phases().items())
+
+
+def loaded(module: str, name: str):
+    """
+    Attribute `name` of `module` if that module has already been imported,
+    else None. Lets light endpoints report on heavy components without
+    importing them (or blocking on the background import).
+    """
+    return getattr(sys.modules.get(module), name, None)
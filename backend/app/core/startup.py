@@ -1,35 +1,75 @@
 # backend/app/core/startup.py
+import asyncio
+import threading
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.services.recommender_service import RecommenderService
-from config.settings import Settings
+from app.core import readiness
+from config.settings import get_settings
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
-settings = Settings()
+settings = get_settings()
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """
-    Handles application startup and shutdown events.
 
-    On startup:
-      - Tries to preload the recommender (if Chroma DB exists)
-      - If not found, logs a warning and continues gracefully.
+def warm_up() -> None:
     """
+    Imports the recommender stack and preloads a recommender for every
+    mode in WARMUP_MODES (if Chroma DB exists); all modes share one model
+    and vector store. Progress and phase timings go to `readiness`.
+    """
+    start = time.perf_counter()
+    readiness.set_state("loading")
+    modes = [m.strip().upper() for m in settings.WARMUP_MODES.split(",") if m.strip()]
     try:
-        mode = (settings.RAG_MODE or "AGENT").upper()
+        with readiness.phase("import_recommender"):
+            from app.services.recommender_service import RecommenderService  # LangChain, Chroma, pandas
+        with readiness.phase("tokenizer"):
+            # tiktoken fetches its BPE file on first use; do it here rather than on a request
+            from rag.tokens import load_encoding
+
+            load_encoding(settings.MODEL_NAME, timeout=settings.TOKENIZER_LOAD_TIMEOUT)
         try:
-            RecommenderService.get_recommender(settings, mode)
-            logger.info(f"✅ Startup warm-up complete in mode: {mode}")
+            for mode in modes:
+                with readiness.phase(f"warmup_{mode.lower()}"):
+                    RecommenderService.get_recommender(settings, mode)
+            readiness.set_state("ready")
+            logger.info(f"✅ Startup warm-up complete in modes: {', '.join(modes) or 'none'}")
         except FileNotFoundError:
+            readiness.set_state("no_vector_store")
             logger.warning(
                 f"⚠️ No Chroma DB found at '{settings.CHROMA_DIR}'. "
                 "Skipping warm-up. Please build vector store via /vector/create."
             )
-        yield
     except Exception as e:
-        logger.exception(f"❌ Startup initialization failed: {e}")
-        raise
+        readiness.set_state("failed", str(e))
+        logger.exception(f"❌ Startup warm-up failed: {e}")
+    finally:
+        readiness.record("ready", time.perf_counter() - start)
+        logger.info(f"⏱️ Startup: {readiness.report()}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Handles application startup and shutdown events.
+
+    On startup:
+      - Runs `warm_up` — in a daemon thread when WARMUP_BACKGROUND is on,
+        so /health answers immediately and reports `ready: false` until it
+        finishes; otherwise before the first request is served (and a
+        failed warm-up aborts startup).
+      - Without a Chroma DB, logs a warning and continues gracefully.
+    """
+    try:
+        if settings.WARMUP_BACKGROUND:
+            threading.Thread(target=warm_up, name="startup-warmup", daemon=True).start()
+            logger.info("🚀 Accepting requests; loading the recommender in the background...")
+        else:
+            await asyncio.to_thread(warm_up)
+            startup = readiness.snapshot()
+            if startup["state"] == "failed":
+                raise RuntimeError(f"Startup warm-up failed: {startup['error']}")
+        yield
     finally:
         logger.info("👋 Shutting down Anime Recommender API...")
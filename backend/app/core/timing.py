@@ -0,0 +1,50 @@
+# backend/app/core/timing.py
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.metrics import HTTP_SECONDS, server_timing, track_request
+
+
+def _route_label(scope: Scope) -> str:
+    """
+    Template of the matched route (/recommend/similar/{title}), keeping
+    label cardinality bounded. Routers declare their own prefixes, so the
+    route's path is the full template.
+    """
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+class TimingMiddleware:
+    """
+    Records every HTTP request in the `anime_http_request_seconds` histogram
+    and collects its stage timings (see utils/metrics.py).
+
+    With `headers=True` the breakdown is returned as a Server-Timing header
+    (plus `total`). Headers leave before the body, so streaming endpoints
+    (/recommend/stream, /recommend/batch) only report the stages that ran
+    before their first chunk.
+    """
+
+    def __init__(self, app: ASGIApp, headers: bool = False):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        with track_request() as timings:
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    elapsed = time.perf_counter() - start
+                    route = _route_label(scope)
+                    HTTP_SECONDS.observe(elapsed, method=scope["method"], route=route, status=message["status"])
+                    if self.headers:
+                        value = server_timing({**timings, "total": elapsed})
+                        message["headers"] = [*message.get("headers", []), (b"server-timing", value.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
@@ -1,13 +1,19 @@
 # backend/app/main.py
+import time
+
+_import_start = time.perf_counter()
+
 from fastapi import FastAPI
 
 # Import lifespan and routers
+from app.core import readiness
 from app.core.startup import lifespan
-from app.routes import health_router, recommend_router, vector_router
+from app.core.timing import TimingMiddleware
+from app.routes import health_router, metrics_router, recommend_router, vector_router
 from fastapi.middleware.cors import CORSMiddleware
-from config.settings import Settings
+from config.settings import get_settings
 
-settings = Settings()
+settings = get_settings()
 
 # ------------------------------------------------------------------------------
 # FastAPI Application Initialization
@@ -32,13 +38,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ---------------------------------------------------------------------------
+# Stage timing (histograms on /metrics, optional Server-Timing headers)
+# ---------------------------------------------------------------------------
+app.add_middleware(TimingMiddleware, headers=settings.TIMING_HEADERS)
+
 # ------------------------------------------------------------------------------
 # Include Routers
 # ------------------------------------------------------------------------------
 
-app.include_router(health_router.router, prefix="/health", tags=["Health"])
-app.include_router(recommend_router.router, prefix="/recommend", tags=["Recommender"])
-app.include_router(vector_router.router, prefix="/vector", tags=["Vector Store"])
+app.include_router(health_router.router)
+app.include_router(recommend_router.router)
+app.include_router(vector_router.router)
+app.include_router(metrics_router.router)
+
+# Heavy modules (LangChain, Chroma, pandas) are imported by the startup warm-up, not here
+readiness.record("import_app", time.perf_counter() - _import_start)
 
 # ------------------------------------------------------------------------------
 # Entry Point for Local Development
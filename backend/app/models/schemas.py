@@ -28,8 +28,83 @@ class RecommendResponse(BaseModel):
     answer: str = Field(..., description="Generated recommendation result.")
 
 
+class RecommendBatchRequest(BaseModel):
+    """Request body for the /recommend/batch endpoint."""
+
+    questions: list[str] = Field(
+        ...,
+        min_length=1,
+        description="Questions to answer; results reference them by index.",
+        example=["Dark fantasy with a tragic hero", "A lighthearted school romance"]
+    )
+    mode: Optional[Literal["AGENT", "CHAIN"]] = Field(
+        default=None,
+        description="Execution mode applied to every question.",
+        example="CHAIN"
+    )
+    concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=64,
+        description="Maximum concurrent LLM generations (defaults to BATCH_CONCURRENCY).",
+    )
+
+
+class BatchRecommendResult(BaseModel):
+    """One line of the /recommend/batch stream."""
+
+    index: int = Field(..., description="Position of the question in the request.")
+    question: str = Field(..., description="The question answered.")
+    mode: str = Field(..., description="Mode used for the recommendation process.")
+    answer: Optional[str] = Field(default=None, description="Generated recommendation result.")
+    error: Optional[str] = Field(default=None, description="Failure reason, if this question failed.")
+
+
+class SimilarTitle(BaseModel):
+    """One entry of a /recommend/similar result."""
+
+    title: str = Field(..., description="Anime title.")
+    score: float = Field(..., description="Cosine similarity to the requested title (0-1).")
+
+
+class SimilarResponse(BaseModel):
+    """Response model for the /recommend/similar/{title} endpoint."""
+
+    title: str = Field(..., description="Catalog title matched for the requested title.")
+    matches: list[SimilarTitle] = Field(default_factory=list, description="Most similar titles, best first.")
+
+
 class BuildResponse(BaseModel):
     """Response model for the /vector/create endpoint."""
 
     status: str = Field(..., description="Operation status (e.g., 'success').")
     seconds: float = Field(..., description="Execution time in seconds.")
+    version: Optional[str] = Field(default=None, description="Vector store version that is now live.")
+    chunks: int = Field(default=0, description="Number of chunks in the collection.")
+    embedded_chunks: int = Field(default=0, description="Chunks embedded by this run (excludes resumed batches).")
+    resumed_batches: int = Field(default=0, description="Batches skipped because a previous run completed them.")
+    chunks_per_second: float = Field(default=0.0, description="Embedding throughput of this run.")
+    added: int = Field(default=0, description="Incremental builds: titles newly indexed.")
+    updated: int = Field(default=0, description="Incremental builds: titles re-embedded after a content change.")
+    deleted: int = Field(default=0, description="Incremental builds: titles removed from the collection.")
+    unchanged: int = Field(default=0, description="Incremental builds: titles left untouched.")
+
+
+class BuildJobResponse(BaseModel):
+    """Status of a background vector store build (/vector/create, /vector/jobs)."""
+
+    job_id: str = Field(..., description="Identifier to poll via GET /vector/jobs/{job_id}.")
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"] = Field(..., description="Job lifecycle state.")
+    phase: Optional[Literal["loading", "splitting", "embedding", "similarity", "persisting"]] = Field(
+        default=None, description="Current build phase."
+    )
+    incremental: bool = Field(default=False, description="Whether this is an incremental build.")
+    done_chunks: int = Field(default=0, description="Chunks embedded so far (including resumed batches).")
+    total_chunks: int = Field(default=0, description="Chunks to embed in total (0 until known).")
+    progress: float = Field(default=0.0, description="Embedding progress as a fraction (0-1).")
+    chunks_per_second: float = Field(default=0.0, description="Embedding throughput of this job.")
+    created_at: float = Field(..., description="Submission time (Unix seconds).")
+    started_at: Optional[float] = Field(default=None, description="Start time (Unix seconds).")
+    finished_at: Optional[float] = Field(default=None, description="Completion time (Unix seconds).")
+    error: Optional[str] = Field(default=None, description="Failure reason, if the job failed.")
+    result: Optional[BuildResponse] = Field(default=None, description="Build summary once succeeded.")
@@ -1,26 +1,50 @@
 # health_router.py
 # backend/app/routes/health_router.py
 from fastapi import APIRouter
-from config.settings import Settings
+from fastapi.responses import JSONResponse
+from app.core import readiness
+from config.settings import get_settings
 from utils.logger import setup_logger
 
 # Initialize
-router = APIRouter()
+router = APIRouter(prefix="/health", tags=["Health"])
 logger = setup_logger(__name__)
-settings = Settings()
+settings = get_settings()
+
+
+def _cache_stats(module: str, name: str) -> dict | None:
+    """Stats of a cache singleton; None until the recommender stack has imported it."""
+    cache = readiness.loaded(module, name)
+    return cache.stats() if cache is not None else None
+
 
 @router.get("", tags=["Health"])
 def health_check():
     """
     Simple health check endpoint.
 
-    Returns the current environment, model configuration,
-    and a generic OK status. Used by uptime monitors,
-    load balancers, and deployment pipelines.
+    Returns the current environment, model configuration, startup
+    readiness, answer/embedding cache counters and a generic OK status.
+    Answers as soon as the server is up, also while the recommender is
+    still loading. Used by uptime monitors, load balancers, and deployment pipelines.
     """
     logger.debug("Health check requested.")
     return {
         "status": "ok",
+        "ready": readiness.is_ready(),
         "environment": settings.ENVIRONMENT,
         "model": settings.MODEL_NAME,
+        "startup": readiness.snapshot(),
+        "answer_cache": _cache_stats("recommender.answer_cache", "answer_cache"),
+        "embedding_cache": _cache_stats("rag.embedding_cache", "embedding_cache"),
     }
+
+
+@router.get("/ready", tags=["Health"])
+def readiness_check():
+    """
+    Readiness probe: 200 once the startup warm-up has finished, 503 while
+    it is still loading (or if it failed).
+    """
+    ready = readiness.is_ready()
+    return JSONResponse({"ready": ready, **readiness.snapshot()}, status_code=200 if ready else 503)
@@ -0,0 +1,61 @@
+# backend/app/routes/metrics_router.py
+from typing import Iterator
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core import readiness
+from utils import metrics
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+def _cache_and_agent_metrics() -> Iterator[str]:
+    """
+    Expose the caches' and agent limits' own counters at scrape time, plus
+    the startup phase durations. Components the background warm-up has not
+    imported yet are skipped rather than imported here.
+    """
+    yield "# HELP anime_startup_seconds Duration of each startup phase (import_app, import_recommender, tokenizer, warmup_*, ready)."
+    yield "# TYPE anime_startup_seconds gauge"
+    for phase, seconds in readiness.phases().items():
+        yield f'anime_startup_seconds{{phase="{phase}"}} {seconds:.6f}'
+    yield "# HELP anime_ready Whether the startup warm-up has finished."
+    yield "# TYPE anime_ready gauge"
+    yield f"anime_ready {int(readiness.is_ready())}"
+
+    answer_cache = readiness.loaded("recommender.answer_cache", "answer_cache")
+    embedding_cache = readiness.loaded("rag.embedding_cache", "embedding_cache")
+    limit_counts = readiness.loaded("recommender.agent_limits", "limit_counts")
+    if answer_cache is None or embedding_cache is None or limit_counts is None:
+        return
+
+    answer = answer_cache.stats()
+    yield "# HELP anime_answer_cache_lookups_total Answer-cache lookups by result."
+    yield "# TYPE anime_answer_cache_lookups_total counter"
+    for result in ("exact_hits", "semantic_hits", "misses"):
+        yield f'anime_answer_cache_lookups_total{{result="{result}"}} {answer.get(result, 0)}'
+    yield "# HELP anime_answer_cache_entries Answers currently cached."
+    yield "# TYPE anime_answer_cache_entries gauge"
+    yield f"anime_answer_cache_entries {answer['size']}"
+
+    embeddings = embedding_cache.stats()
+    yield "# HELP anime_embedding_cache_lookups_total Query-embedding cache lookups by result."
+    yield "# TYPE anime_embedding_cache_lookups_total counter"
+    yield f'anime_embedding_cache_lookups_total{{result="hits"}} {embeddings["hits"]}'
+    yield f'anime_embedding_cache_lookups_total{{result="misses"}} {embeddings["misses"]}'
+
+    yield "# HELP anime_agent_events_total Agent limit hits, CHAIN fallbacks, reused and prefetched tool calls."
+    yield "# TYPE anime_agent_events_total counter"
+    for event, count in sorted(limit_counts().items()):
+        yield f'anime_agent_events_total{{event="{event}"}} {count}'
+
+
+metrics.register_collector(_cache_and_agent_metrics)
+
+
+@router.get("", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Stage latency histograms, token / tool-call counters and cache hit
+    counters in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
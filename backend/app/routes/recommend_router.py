@@ -1,22 +1,163 @@
 # backend/app/routes/recommend_router.py
-from fastapi import APIRouter, HTTPException
-from app.models.schemas import RecommendRequest, RecommendResponse
-from app.services.recommender_service import RecommenderService
-from config.settings import Settings
+import json
+import time
+from typing import AsyncIterator
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.models.schemas import (
+    BatchRecommendResult,
+    RecommendBatchRequest,
+    RecommendRequest,
+    RecommendResponse,
+    SimilarResponse,
+    SimilarTitle,
+)
+from config.settings import get_settings
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
-settings = Settings()
-router = APIRouter()
+settings = get_settings()
+router = APIRouter(prefix="/recommend", tags=["Recommender"])
+
+
+def _get_recommender(mode: str):
+    """
+    RecommenderService.get_recommender, importing the service on first use.
+    Call it via run_in_threadpool: the first call may import LangChain /
+    Chroma and load the model and store (or wait for the startup warm-up).
+    """
+    from app.services.recommender_service import RecommenderService
+
+    return RecommenderService.get_recommender(settings, mode)
+
+
+def _get_similarity_index():
+    """RecommenderService.get_similarity_index, importing the service on first use (threadpool only)."""
+    from app.services.recommender_service import RecommenderService
+
+    return RecommenderService.get_similarity_index(settings)
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format a single Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 
 @router.post("", response_model=RecommendResponse)
-def recommend(req: RecommendRequest):
+async def recommend(req: RecommendRequest):
     """Generate anime recommendations based on input query and mode."""
     try:
         mode = (req.mode or settings.RAG_MODE or "AGENT").upper()
-        recommender = RecommenderService.get_recommender(settings, mode)
-        answer = recommender.recommend(req.question)
+        # First call may load the model and Chroma store — keep that off the event loop
+        recommender = await run_in_threadpool(_get_recommender, mode)
+        answer = await recommender.arecommend(req.question)
         return RecommendResponse(mode=mode, answer=answer or "")
     except Exception as e:
         logger.exception("❌ Recommendation failed")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/stream")
+async def recommend_stream(req: RecommendRequest):
+    """
+    Stream anime recommendations as Server-Sent Events.
+
+    Events:
+      - token: {"delta": "<text>"} for each generated text fragment
+      - done:  {"mode", "ttft_seconds", "seconds"} once generation finishes
+      - error: {"detail": "<message>"} if generation fails mid-stream
+    """
+    mode = (req.mode or settings.RAG_MODE or "AGENT").upper()
+    try:
+        recommender = await run_in_threadpool(_get_recommender, mode)
+    except Exception as e:
+        logger.exception("❌ Recommendation failed")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def event_stream() -> AsyncIterator[str]:
+        start = time.perf_counter()
+        ttft = None
+        try:
+            async for delta in recommender.astream(req.question):
+                if ttft is None:
+                    ttft = round(time.perf_counter() - start, 3)
+                yield _sse("token", {"delta": delta})
+            yield _sse("done", {
+                "mode": mode,
+                "ttft_seconds": ttft,
+                "seconds": round(time.perf_counter() - start, 3),
+            })
+        except Exception as e:
+            logger.exception("❌ Streaming recommendation failed")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/batch")
+async def recommend_batch(req: RecommendBatchRequest):
+    """
+    Answer many questions in one request, streamed as JSON lines.
+
+    Questions are embedded together (and, in CHAIN mode, searched together);
+    generations then run concurrently and each result line
+    ({"index", "question", "mode", "answer", "error"}) is written as soon as
+    its answer completes, so lines arrive in completion order.
+    """
+    if len(req.questions) > settings.BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BATCH_MAX_QUESTIONS} questions per batch.",
+        )
+    mode = (req.mode or settings.RAG_MODE or "AGENT").upper()
+    concurrency = req.concurrency or settings.BATCH_CONCURRENCY
+    try:
+        recommender = await run_in_threadpool(_get_recommender, mode)
+    except Exception as e:
+        logger.exception("❌ Recommendation failed")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def lines() -> AsyncIterator[str]:
+        start = time.perf_counter()
+        try:
+            async for index, answer, error in recommender.arecommend_batch(req.questions, concurrency):
+                result = BatchRecommendResult(
+                    index=index, question=req.questions[index], mode=mode, answer=answer, error=error
+                )
+                yield result.model_dump_json() + "\n"
+        except Exception as e:
+            logger.exception("❌ Batch recommendation failed")
+            yield json.dumps({"error": str(e)}) + "\n"
+        logger.info(f"[BATCH] {len(req.questions)} questions in {time.perf_counter() - start:.3f}s")
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
+
+@router.get("/similar/{title}", response_model=SimilarResponse)
+async def recommend_similar(title: str, k: int = Query(default=10, ge=1, le=100)):
+    """
+    Return the titles most similar to `title` from the precomputed
+    similarity index — no LLM call and no embedding call.
+
+    Titles are matched case- and punctuation-insensitively, falling back
+    to the closest catalog title for small typos.
+    """
+    # First call may load the index from disk — keep that off the event loop
+    index = await run_in_threadpool(_get_similarity_index)
+    if index is None:
+        raise HTTPException(status_code=503, detail="Similarity index not built yet. Rebuild the vector store.")
+
+    # Misses fall back to a fuzzy scan of all titles; don't run that on the loop either
+    result = await run_in_threadpool(index.similar, title, k)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"No anime titled '{title}' found.")
+    matched, matches = result
+    return SimilarResponse(
+        title=matched,
+        matches=[SimilarTitle(title=name, score=score) for name, score in matches],
+    )
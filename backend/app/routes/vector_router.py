@@ -1,25 +1,81 @@
 # backend/app/routes/vector_router.py
+import time
 from fastapi import APIRouter, HTTPException
-from app.models.schemas import BuildResponse
-from app.services.vector_service import VectorService
-from config.settings import Settings
+from app.models.schemas import BuildJobResponse, BuildResponse
+from config.settings import get_settings
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
-settings = Settings()
-router = APIRouter()
+settings = get_settings()
+router = APIRouter(prefix="/vector", tags=["Vector Store"])
+
+# Build / rollback services pull in Chroma and LangChain; they are imported
+# inside the (threadpool) handlers so importing the app stays fast.
+
+@router.post("/create", response_model=BuildJobResponse, status_code=202)
+def create_vector_store(incremental: bool = False):
+    """
+    Starts a background rebuild of the Chroma vector store from the configured CSV.
+
+    Returns immediately with a job ID; poll GET /vector/jobs/{job_id} for
+    phase, progress and throughput. Only one build runs at a time (409 otherwise).
+    The build goes into a new version that is validated and then swapped
+    in live; queries keep hitting the current version meanwhile.
+    Pass `?incremental=true` to only embed added/changed titles.
+    """
+    from app.services.build_jobs import BuildJobService
+
+    try:
+        job = BuildJobService.submit(settings, incremental=incremental)
+        return BuildJobResponse(**job.snapshot())
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/jobs", response_model=list[BuildJobResponse])
+def list_build_jobs():
+    """Lists recent build jobs, newest first."""
+    from app.services.build_jobs import BuildJobService
+
+    return [BuildJobResponse(**job.snapshot()) for job in BuildJobService.list_jobs()]
+
+
+@router.get("/jobs/{job_id}", response_model=BuildJobResponse)
+def get_build_job(job_id: str):
+    """Reports the phase, progress and throughput of a build job."""
+    from app.services.build_jobs import BuildJobService
+
+    job = BuildJobService.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown build job: {job_id}")
+    return BuildJobResponse(**job.snapshot())
+
+
+@router.delete("/jobs/{job_id}", response_model=BuildJobResponse, status_code=202)
+def cancel_build_job(job_id: str):
+    """Cancels a queued or running build; it stops after the current batch."""
+    from app.services.build_jobs import BuildJobService
+
+    job = BuildJobService.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown build job: {job_id}")
+    if not job.cancel():
+        raise HTTPException(status_code=409, detail=f"Build job {job_id} already finished.")
+    logger.info(f"🛑 Cancellation requested for build job {job_id}.")
+    return BuildJobResponse(**job.snapshot())
+
+
+@router.post("/rollback", response_model=BuildResponse)
+def rollback_vector_store():
+    """Re-activates the previous vector store version."""
+    from app.services.vector_service import VectorService
 
-@router.post("/create", response_model=BuildResponse)
-def create_vector_store():
-    """Rebuilds the Chroma vector store using the configured CSV file."""
     try:
-        result = VectorService.build_vector_store(
-            raw_csv=settings.RAW_CSV_PATH,
-            chroma_dir=settings.CHROMA_DIR,
-            settings=settings,
-        )
-        logger.info("✅ Vector store created successfully.")
-        return BuildResponse(**result)
+        start = time.time()
+        result = VectorService.rollback(settings)
+        return BuildResponse(**result, seconds=round(time.time() - start, 2))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.exception("❌ Vector store build failed")
+        logger.exception("❌ Vector store rollback failed")
         raise HTTPException(status_code=500, detail=str(e))
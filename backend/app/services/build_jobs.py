@@ -0,0 +1,152 @@
+# backend/app/services/build_jobs.py
+import threading
+import time
+import uuid
+from app.services.vector_service import VectorService
+from rag.vector_store import BuildCancelled, BuildProgress
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class BuildJob(BuildProgress):
+    """A vector store build running on a background thread."""
+
+    def __init__(self, incremental: bool):
+        self.id = uuid.uuid4().hex
+        self.incremental = incremental
+        self.status = "queued"  # queued | running | succeeded | failed | cancelled
+        self.phase_name: str | None = None
+        self.done = 0
+        self.total = 0
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.error: str | None = None
+        self.result: dict | None = None
+        self._embedding_started: tuple[float, int] | None = None
+        self._lock = threading.Lock()
+
+    # BuildProgress hooks (called from the build thread)
+    def phase(self, name: str) -> None:
+        with self._lock:
+            self.phase_name = name
+        logger.info(f"[JOB {self.id[:8]}] phase: {name}")
+
+    def advance(self, done: int, total: int) -> None:
+        with self._lock:
+            if self._embedding_started is None:
+                self._embedding_started = (time.time(), done)
+            self.done, self.total = done, total
+
+    def update(self, **fields) -> None:
+        """Set job fields under the lock, so snapshots never see a half-applied change."""
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def cancel(self) -> bool:
+        """Request cancellation; returns False if the job already finished."""
+        with self._lock:
+            if self.status not in ("queued", "running"):
+                return False
+            self.cancelled = True
+            return True
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def snapshot(self) -> dict:
+        """Return a consistent, JSON-serializable view of the job."""
+        with self._lock:
+            rate = 0.0
+            if self._embedding_started and self.done:
+                started_at, started_done = self._embedding_started
+                elapsed = (self.finished_at or time.time()) - started_at
+                rate = round((self.done - started_done) / elapsed, 2) if elapsed > 0 else 0.0
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "phase": self.phase_name,
+                "incremental": self.incremental,
+                "done_chunks": self.done,
+                "total_chunks": self.total,
+                "progress": round(self.done / self.total, 4) if self.total else 0.0,
+                "chunks_per_second": rate,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "error": self.error,
+                "result": self.result,
+            }
+
+
+class BuildJobService:
+    """Runs at most one vector store build at a time in the background."""
+
+    _lock = threading.Lock()
+    _jobs: dict[str, BuildJob] = {}
+    _max_history = 20
+
+    @classmethod
+    def submit(cls, settings, incremental: bool = False) -> BuildJob:
+        """
+        Start a build on a background thread.
+
+        Raises:
+            RuntimeError: if another build is still queued or running.
+        """
+        with cls._lock:
+            running = next((job for job in cls._jobs.values() if job.active), None)
+            if running is not None:
+                raise RuntimeError(f"Build {running.id} is already in progress.")
+            job = BuildJob(incremental=incremental)
+            cls._jobs[job.id] = job
+            cls._trim_history()
+
+        threading.Thread(
+            target=cls._run, args=(job, settings), name=f"vector-build-{job.id[:8]}", daemon=True
+        ).start()
+        logger.info(f"📥 Submitted vector store build job {job.id}.")
+        return job
+
+    @classmethod
+    def get(cls, job_id: str) -> BuildJob | None:
+        with cls._lock:
+            return cls._jobs.get(job_id)
+
+    @classmethod
+    def list_jobs(cls) -> list[BuildJob]:
+        with cls._lock:
+            return cls._newest_first()
+
+    @classmethod
+    def _newest_first(cls) -> list[BuildJob]:
+        """Jobs sorted newest first; callers hold `_lock`."""
+        return sorted(cls._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    @classmethod
+    def _run(cls, job: BuildJob, settings) -> None:
+        job.update(status="running", started_at=time.time())
+        try:
+            job.check_cancelled()
+            result = VectorService.build_vector_store(
+                raw_csv=settings.RAW_CSV_PATH,
+                chroma_dir=settings.CHROMA_DIR,
+                settings=settings,
+                incremental=job.incremental,
+                progress=job,
+            )
+            job.update(status="succeeded", result=result, finished_at=time.time())
+        except BuildCancelled:
+            job.update(status="cancelled", finished_at=time.time())
+        except Exception as e:
+            job.update(status="failed", error=str(e), finished_at=time.time())
+        logger.info(f"🏁 Build job {job.id} finished with status: {job.status}")
+
+    @classmethod
+    def _trim_history(cls) -> None:
+        finished = [job for job in cls._newest_first() if not job.active]
+        for job in finished[cls._max_history:]:
+            del cls._jobs[job.id]
@@ -1,24 +1,152 @@
 # backend/app/services/recommender_service.py
-import os
+import threading
+from langchain.chat_models import init_chat_model
+from langchain_chroma import Chroma
+from rag.keyword_index import KeywordIndex
+from rag.metadata_index import MetadataIndex
+from rag.similarity_index import SimilarityIndex
+from rag.store_versions import StoreVersions
+from rag.vector_store import VectorStoreBuilder
 from recommender.anime_recommender import AnimeRecommender
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 class RecommenderService:
-    """Manages cached AnimeRecommender instance."""
+    """
+    Thread-safe registry of AnimeRecommender instances.
 
-    _cached = {"mode": None, "rec": None}
+    Recommenders are keyed by (mode, model, collection) and built once.
+    The chat model and the loaded Chroma store are shared across modes,
+    so switching between AGENT and CHAIN never reloads either.
+    """
+
+    _lock = threading.RLock()
+    _recommenders: dict[tuple[str, str, str], AnimeRecommender] = {}
+    _models: dict[str, object] = {}
+    _vector_stores: dict[tuple[str, str, str], Chroma] = {}
+    _similarity_indexes: dict[tuple[str, str, str], SimilarityIndex | None] = {}
+    _keyword_indexes: dict[tuple[str, str, str], KeywordIndex | None] = {}
+    _metadata_indexes: dict[tuple[str, str, str], MetadataIndex | None] = {}
 
     @classmethod
     def get_recommender(cls, settings, mode: str) -> AnimeRecommender:
-        """Return cached AnimeRecommender instance, reinitialize if mode changes."""
-        mode = mode.upper()
-        os.environ["RAG_MODE"] = mode
-        if cls._cached["rec"] and cls._cached["mode"] == mode:
-            return cls._cached["rec"]
-
-        rec = AnimeRecommender(settings=settings)
-        cls._cached.update({"mode": mode, "rec": rec})
-        logger.info(f"🔄 Initialized new recommender in mode: {mode}")
+        """Return the AnimeRecommender for a mode, building it on first use."""
+        key = (mode.upper(), settings.MODEL_NAME, settings.CHROMA_COLLECTION)
+        rec = cls._recommenders.get(key)
+        if rec is not None:
+            return rec
+
+        with cls._lock:
+            # Another thread may have built it while we waited for the lock
+            rec = cls._recommenders.get(key)
+            if rec is None:
+                rec = AnimeRecommender(
+                    settings=settings,
+                    mode=key[0],
+                    model=cls._get_model(settings),
+                    vector_store=cls._get_vector_store(settings),
+                    similarity_index=cls.get_similarity_index(settings),
+                    keyword_index=cls.get_keyword_index(settings),
+                    metadata_index=cls.get_metadata_index(settings),
+                )
+                cls._recommenders[key] = rec
+                logger.info(f"🔄 Initialized new recommender in mode: {key[0]}")
         return rec
+
+    @classmethod
+    def _get_model(cls, settings):
+        """Return the shared chat model for settings.MODEL_NAME."""
+        model = cls._models.get(settings.MODEL_NAME)
+        if model is None:
+            model = init_chat_model(settings.MODEL_NAME)
+            cls._models[settings.MODEL_NAME] = model
+        return model
+
+    @classmethod
+    def _get_vector_store(cls, settings) -> Chroma:
+        """Return the shared Chroma store for the configured directory and collection."""
+        key = (settings.CHROMA_DIR, settings.CHROMA_COLLECTION, settings.EMBEDDING_MODEL)
+        store = cls._vector_stores.get(key)
+        if store is None:
+            store = VectorStoreBuilder(processed_csv="", settings=settings).load_vector_store()
+            cls._vector_stores[key] = store
+        return store
+
+    @classmethod
+    def get_similarity_index(cls, settings) -> SimilarityIndex | None:
+        """Return the similarity index of the live version (None if it has none)."""
+        key = (settings.CHROMA_DIR, settings.CHROMA_COLLECTION, settings.EMBEDDING_MODEL)
+        if key not in cls._similarity_indexes:
+            with cls._lock:
+                if key not in cls._similarity_indexes:
+                    current_dir = StoreVersions(settings.CHROMA_DIR).current_dir()
+                    cls._similarity_indexes[key] = SimilarityIndex.load(current_dir)
+        return cls._similarity_indexes[key]
+
+    @classmethod
+    def get_keyword_index(cls, settings) -> KeywordIndex | None:
+        """Return the memory-mapped BM25 index of the live version (None if disabled or missing)."""
+        if not settings.HYBRID_SEARCH_ENABLED:
+            return None
+        key = (settings.CHROMA_DIR, settings.CHROMA_COLLECTION, settings.EMBEDDING_MODEL)
+        if key not in cls._keyword_indexes:
+            with cls._lock:
+                if key not in cls._keyword_indexes:
+                    current_dir = StoreVersions(settings.CHROMA_DIR).current_dir()
+                    cls._keyword_indexes[key] = KeywordIndex.load(current_dir)
+        return cls._keyword_indexes[key]
+
+    @classmethod
+    def get_metadata_index(cls, settings) -> MetadataIndex | None:
+        """Return the typed-metadata index of the live version (None if disabled or missing)."""
+        if not settings.METADATA_FILTERS_ENABLED:
+            return None
+        key = (settings.CHROMA_DIR, settings.CHROMA_COLLECTION, settings.EMBEDDING_MODEL)
+        if key not in cls._metadata_indexes:
+            with cls._lock:
+                if key not in cls._metadata_indexes:
+                    current_dir = StoreVersions(settings.CHROMA_DIR).current_dir()
+                    cls._metadata_indexes[key] = MetadataIndex.load(
+                        current_dir, settings.METADATA_TOP_RATED_SCORE, settings.METADATA_QUESTION_GENRES
+                    )
+        return cls._metadata_indexes[key]
+
+    @classmethod
+    def swap_vector_store(
+        cls,
+        settings,
+        vector_store: Chroma,
+        similarity_index: SimilarityIndex | None = None,
+        keyword_index: KeywordIndex | None = None,
+        metadata_index: MetadataIndex | None = None,
+    ) -> None:
+        """
+        Hot-swap the shared vector store (and its similarity, keyword and
+        metadata indexes) for the configured collection.
+
+        Recommenders rebuild their agents around the new store; requests
+        already in flight finish against the store they started with.
+        """
+        key = (settings.CHROMA_DIR, settings.CHROMA_COLLECTION, settings.EMBEDDING_MODEL)
+        with cls._lock:
+            old_store = cls._vector_stores.get(key)
+            cls._vector_stores[key] = vector_store
+            cls._similarity_indexes[key] = similarity_index
+            cls._keyword_indexes[key] = keyword_index
+            cls._metadata_indexes[key] = metadata_index
+            for rec in cls._recommenders.values():
+                if old_store is None or rec.vector_store is old_store:
+                    rec.use_vector_store(vector_store, similarity_index, keyword_index, metadata_index)
+        logger.info("🔀 Vector store hot-swapped into recommender registry.")
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop all cached recommenders and vector stores (e.g. after a rebuild)."""
+        with cls._lock:
+            cls._recommenders.clear()
+            cls._vector_stores.clear()
+            cls._similarity_indexes.clear()
+            cls._keyword_indexes.clear()
+            cls._metadata_indexes.clear()
+        logger.info("♻️ Recommender registry cleared.")
@@ -2,8 +2,14 @@
 import os
 import shutil
 import time
+from app.services.recommender_service import RecommenderService
 from dataio.data_loader import AnimeDataLoader
-from rag.vector_store import VectorStoreBuilder
+from rag.keyword_index import KeywordIndex
+from rag.metadata_index import MetadataIndex
+from rag.similarity_index import SimilarityIndex
+from rag.store_versions import StoreVersions
+from rag.vector_store import CHECKPOINT_FILE, BuildCancelled, BuildProgress, VectorStoreBuilder
+from recommender.answer_cache import answer_cache
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -14,7 +20,7 @@ class VectorService:
     @staticmethod
     def clear_chroma(chroma_dir: str) -> None:
         """
-        Delete existing Chroma DB folder if it exists.
+        Delete existing Chroma DB folder (all versions) if it exists.
         Safe to call even if directory doesn't exist.
         """
         start = time.time()
@@ -29,35 +35,143 @@ class VectorService:
             logger.exception(f"❌ Failed to clear Chroma DB: {e}")
 
     @staticmethod
-    def build_vector_store(raw_csv: str, chroma_dir: str, settings) -> dict:
+    def build_vector_store(
+        raw_csv: str,
+        chroma_dir: str,
+        settings,
+        incremental: bool = False,
+        resume: bool = True,
+        progress: BuildProgress | None = None,
+    ) -> dict:
         """
-        Rebuild the Chroma vector database.
+        Build a new vector store version and hot-swap it in without downtime.
+
+        The live version is never touched: the build goes into a fresh
+        version directory, which only becomes active after validation.
+        With `incremental=True` the new version starts as a copy of the live
+        one and only added/changed titles are embedded. `progress` receives
+        phase/progress updates and can cancel the build between batches;
+        a cancelled build is left in place and resumed by the next build.
 
         Steps:
-        1. Clear existing Chroma DB directory.
+        1. Create a new version directory (or resume an interrupted build).
         2. Load and process anime dataset.
-        3. Build vector store from processed data.
+        3. Build vector store into the new version.
+        4. Precompute the per-title similarity table from the stored embeddings.
+        5. Validate, atomically activate and hot-swap it into the recommenders.
+        6. Invalidate cached answers generated from the old collection.
         """
         start_time = time.time()
         logger.info("🚀 Starting vector store build...")
+        versions = StoreVersions(chroma_dir)
+        progress = progress or BuildProgress()
 
         try:
-            # Step 1: Cleanup
-            VectorService.clear_chroma(chroma_dir)
+            # Step 1: New version (unless an interrupted build can be resumed)
+            version = versions.pending(CHECKPOINT_FILE) if resume and not incremental else None
+            if version:
+                logger.info(f"⏩ Found an interrupted build — resuming version {version}.")
+            else:
+                version = versions.create(copy_current=incremental)
+                logger.info(f"🆕 Building into new version {version}.")
 
-            # Step 2: Load and process data
+            # Step 2: Load and process data (or stream it straight into indexing)
+            progress.phase("loading")
             loader = AnimeDataLoader(raw_csv)
-            processed_file = loader.load_and_process()
-            logger.info(f"✅ Processed data saved to: {processed_file}")
+            documents, fingerprint, processed_file = None, None, ""
+            if settings.INGEST_STREAMING:
+                documents = loader.iter_documents(chunk_rows=settings.INGEST_CHUNK_ROWS)
+                fingerprint = loader.fingerprint()
+                logger.info(f"🌊 Streaming {raw_csv} in chunks of {settings.INGEST_CHUNK_ROWS} rows.")
+            else:
+                processed_file = loader.load_and_process()
+                logger.info(f"✅ Processed data saved to: {processed_file}")
 
             # Step 3: Create vector store
-            builder = VectorStoreBuilder(processed_file, settings)
-            builder.create_vector_store()
+            progress.check_cancelled()
+            builder = VectorStoreBuilder(
+                processed_file, settings, persist_directory=versions.path(version), progress=progress
+            )
+            vector_store = builder.create_vector_store(
+                incremental=incremental, documents=documents, fingerprint=fingerprint
+            )
+
+            # Step 4: Nearest titles from the embeddings we just stored
+            progress.phase("similarity")
+            progress.check_cancelled()
+            similarity_index = SimilarityIndex.build(
+                vector_store,
+                top_n=settings.SIMILARITY_TOP_N,
+                block_size=settings.SIMILARITY_BLOCK_SIZE,
+            )
+            similarity_index.save(versions.path(version))
+
+            # Step 5: Validate, flip the pointer and hot-swap
+            progress.phase("persisting")
+            progress.check_cancelled()
+            try:
+                VectorService.validate(vector_store, builder.build_stats.get("chunks"))
+            except Exception:
+                versions.discard(version)
+                raise
+            versions.activate(version)
+            RecommenderService.swap_vector_store(
+                settings, vector_store, similarity_index, *VectorService._load_indexes(settings, versions.path(version))
+            )
+            versions.prune()
+
+            # Step 6: Cached answers were grounded in the old collection
+            answer_cache.clear()
 
             duration = round(time.time() - start_time, 2)
-            logger.info(f"🎉 Vector store successfully built in {duration}s.")
-            return {"status": "success", "seconds": duration}
+            logger.info(f"🎉 Vector store version {version} built and activated in {duration}s.")
+            return {"status": "success", "seconds": duration, "version": version, **builder.build_stats}
 
+        except BuildCancelled:
+            logger.warning("🛑 Vector store build cancelled; it will resume on the next build.")
+            raise
         except Exception as e:
             logger.exception(f"❌ Vector store build failed: {e}")
             raise
+
+    @staticmethod
+    def _load_indexes(settings, version_dir: str) -> tuple[KeywordIndex | None, MetadataIndex | None]:
+        """Load the retrieval indexes saved next to a version's collection (if enabled)."""
+        keyword_index = KeywordIndex.load(version_dir) if settings.HYBRID_SEARCH_ENABLED else None
+        metadata_index = (
+            MetadataIndex.load(version_dir, settings.METADATA_TOP_RATED_SCORE, settings.METADATA_QUESTION_GENRES)
+            if settings.METADATA_FILTERS_ENABLED else None
+        )
+        return keyword_index, metadata_index
+
+    @staticmethod
+    def validate(vector_store, expected_chunks: int | None = None) -> None:
+        """
+        Sanity-check a freshly built store before it goes live: it must hold
+        the expected number of chunks and answer a nearest-neighbour query.
+        """
+        count = vector_store._collection.count()
+        if count == 0 or (expected_chunks is not None and count != expected_chunks):
+            raise RuntimeError(
+                f"Vector store validation failed: {count} chunks stored, expected {expected_chunks}."
+            )
+        # Query with a stored vector — exercises the index without an embedding call
+        sample = vector_store._collection.get(limit=1, include=["embeddings"])
+        if not vector_store.similarity_search_by_vector(list(sample["embeddings"][0]), k=1):
+            raise RuntimeError("Vector store validation failed: sample query returned no results.")
+
+    @staticmethod
+    def rollback(settings) -> dict:
+        """Re-activate the previous vector store version and hot-swap it in."""
+        versions = StoreVersions(settings.CHROMA_DIR)
+        version = versions.rollback()
+        vector_store = VectorStoreBuilder(
+            processed_csv="", settings=settings, persist_directory=versions.path(version)
+        ).load_vector_store()
+        similarity_index = SimilarityIndex.load(versions.path(version))
+        RecommenderService.swap_vector_store(
+            settings, vector_store, similarity_index, *VectorService._load_indexes(settings, versions.path(version))
+        )
+        answer_cache.clear()
+        logger.info(f"⏪ Rolled back to vector store version {version}.")
+        return {"status": "success", "version": version}
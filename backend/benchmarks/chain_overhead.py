@@ -0,0 +1,99 @@
+"""
+chain_overhead.py — Per-request overhead of the CHAIN executors.
+
+Runs CHAIN-mode requests through AnimeRecommender with the direct
+executor and with the create_agent-based one, against an in-memory Chroma
+store filled from the raw catalog CSV. Embeddings and the chat model are
+LangChain's deterministic fakes, so nothing leaves the machine and the
+numbers are pure pipeline cost:
+
+  retrieval  search + context building + prompt filling alone
+  model      streaming the fake model's answer alone
+  total      a full `recommend()` call
+  overhead   total - retrieval - model (executor runtime)
+
+Usage (from backend/):
+    python -m benchmarks.chain_overhead --requests 200
+"""
+
+import argparse
+import itertools
+import os
+import statistics
+import time
+
+os.environ.setdefault("ENABLE_FILE_LOGGING", "False")
+
+from langchain_chroma import Chroma  # noqa: E402
+from langchain_core.embeddings import DeterministicFakeEmbedding  # noqa: E402
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage  # noqa: E402
+
+from config.settings import Settings  # noqa: E402
+from dataio.data_loader import AnimeDataLoader  # noqa: E402
+from recommender.anime_recommender import AnimeRecommender  # noqa: E402
+
+ANSWER = " ".join(
+    f"{i}. A recommended title with a short summary and why it matches your taste." for i in range(1, 4)
+)
+QUESTIONS = [
+    "Dark fantasy with demons and a tragic hero",
+    "A lighthearted school romance comedy",
+    "Space bounty hunters with jazz and noir vibes",
+    "Sports anime about an underdog team",
+]
+
+
+def fake_model() -> GenericFakeChatModel:
+    return GenericFakeChatModel(messages=itertools.repeat(AIMessage(content=ANSWER)))
+
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    samples = sorted(samples)
+    return 1000 * statistics.median(samples), 1000 * samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+
+
+def measure(fn, n: int) -> list[float]:
+    latencies = []
+    for question in itertools.islice(itertools.cycle(QUESTIONS), n):
+        start = time.perf_counter()
+        fn(question)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CHAIN executor overhead benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per executor.")
+    parser.add_argument("--titles", type=int, default=500, help="Catalog rows loaded into the store.")
+    args = parser.parse_args()
+
+    base = Settings(ANSWER_CACHE_ENABLED=False, EMBEDDING_CACHE_ENABLED=False)
+    # One document per title, ids in the `<anime_id>-<n>` layout retrieval expects
+    documents = list(itertools.islice(AnimeDataLoader(base.RAW_CSV_PATH).iter_documents(), args.titles))
+    ids = [f"{i}-0" for i in range(len(documents))]
+    store = Chroma.from_documents(documents, DeterministicFakeEmbedding(size=256), ids=ids)
+
+    results = {}
+    for executor in ("agent", "direct"):
+        settings = base.model_copy(update={"CHAIN_EXECUTOR": executor})
+        recommender = AnimeRecommender(settings, mode="CHAIN", model=fake_model(), vector_store=store)
+        recommender.recommend(QUESTIONS[0])  # warm up
+        results[executor] = measure(recommender.recommend, args.requests)
+
+    prompt = recommender.agent.prompt
+    retrieval = measure(prompt.prompt_for, args.requests)
+    model = fake_model()
+    messages = [SystemMessage(content=prompt.prompt_for(QUESTIONS[0])), HumanMessage(content=QUESTIONS[0])]
+    streaming = measure(lambda _: list(model.stream(messages)), args.requests)
+    baseline = statistics.fmean(retrieval) + statistics.fmean(streaming)
+
+    print(f"retrieval: p50 {percentiles(retrieval)[0]:.2f} ms   model: p50 {percentiles(streaming)[0]:.2f} ms")
+    for executor, latencies in results.items():
+        p50, p95 = percentiles(latencies)
+        overhead = 1000 * (statistics.fmean(latencies) - baseline)
+        print(f"{executor:>6}: p50 {p50:.2f} ms  p95 {p95:.2f} ms  overhead {overhead:.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
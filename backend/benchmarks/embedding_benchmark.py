@@ -0,0 +1,101 @@
+"""
+embedding_benchmark.py — Remote vs local embedding throughput and latency.
+
+For each provider, embeds a synthetic catalog the way a build does
+(EMBED_BATCH_SIZE texts per embed_documents call) and then times
+uncached embed_query calls, reporting:
+
+  build   chunks/sec over the whole catalog
+  query   p50 / p95 / mean per-query embedding latency
+
+Provider settings (LOCAL_EMBED_*, EMBED_BATCH_SIZE) come from the
+environment / .env as usual; the openai provider needs OPENAI_API_KEY.
+
+Usage (from backend/):
+    python -m benchmarks.embedding_benchmark --docs 2000 --queries 50
+    python -m benchmarks.embedding_benchmark --providers local \\
+        --local-model sentence-transformers/all-MiniLM-L6-v2
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("ENABLE_FILE_LOGGING", "False")
+
+from config.settings import Settings  # noqa: E402
+from rag.embeddings import get_embeddings  # noqa: E402
+
+WORDS = (
+    "the a hero journey world power friends battle secret school city ancient dream "
+    "mecha pilot magic girl detective samurai demon romance space crew tournament"
+).split()
+
+
+def synthetic_texts(n: int, words: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [f"combined_info: Title: Anime {i}. Overview: {' '.join(rng.choices(WORDS, k=words))}" for i in range(n)]
+
+
+def run(provider: str, model: str, docs: list[str], queries: list[str], batch_size: int) -> dict:
+    settings = Settings(EMBEDDING_PROVIDER=provider, EMBEDDING_MODEL=model)
+    embeddings = get_embeddings(settings)
+
+    # Warm-up: model load / connection setup shouldn't count towards either number
+    embeddings.embed_query("warm up")
+
+    start = time.perf_counter()
+    for i in range(0, len(docs), batch_size):
+        embeddings.embed_documents(docs[i:i + batch_size])
+    build_seconds = time.perf_counter() - start
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        embeddings.embed_query(query)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    if hasattr(embeddings, "close"):
+        embeddings.close()
+    return {
+        "provider": provider,
+        "model": model,
+        "chunks_per_second": len(docs) / build_seconds,
+        "p50_ms": 1000 * statistics.median(latencies),
+        "p95_ms": 1000 * latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        "mean_ms": 1000 * statistics.fmean(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding provider benchmark")
+    parser.add_argument("--providers", default="openai,local", help="Comma-separated providers to compare.")
+    parser.add_argument("--openai-model", default="text-embedding-3-large")
+    parser.add_argument("--local-model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--docs", type=int, default=2000, help="Synthetic chunks to embed.")
+    parser.add_argument("--words", type=int, default=150, help="Words per synthetic chunk.")
+    parser.add_argument("--queries", type=int, default=50, help="Distinct queries to time.")
+    parser.add_argument("--batch-size", type=int, help="Texts per embed_documents call (default EMBED_BATCH_SIZE).")
+    args = parser.parse_args()
+
+    batch_size = args.batch_size or Settings().EMBED_BATCH_SIZE
+    docs = synthetic_texts(args.docs, args.words, seed=1)
+    queries = [f"recommend something like {q}" for q in synthetic_texts(args.queries, 6, seed=2)]
+    models = {"openai": args.openai_model, "local": args.local_model}
+
+    for provider in args.providers.split(","):
+        provider = provider.strip()
+        result = run(provider, models[provider], docs, queries, batch_size)
+        print(
+            f"{result['provider']:>7} ({result['model']}): "
+            f"build {result['chunks_per_second']:.1f} chunks/sec | "
+            f"query p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, "
+            f"mean {result['mean_ms']:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
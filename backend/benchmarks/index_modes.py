@@ -0,0 +1,94 @@
+"""
+index_modes.py — Chunked vs one-document-per-title indexing.
+
+Builds the catalog into a throwaway Chroma directory once per INDEX_MODE
+and reports, for each:
+
+  documents      indexed documents (chunks or titles)
+  size           on-disk size of the Chroma directory
+  build          wall time of the build (embedding included)
+  distinct@k     distinct titles among the raw top-k vector hits, averaged
+                 over the sample queries (k means no duplicates)
+  deduped@k      the same after retrieval-path de-duplication by title
+
+Embeddings go through the configured provider, so each run embeds the
+catalog twice (use EMBEDDING_PROVIDER=local for an offline run).
+
+Usage (from backend/):
+    python -m benchmarks.index_modes --k 3
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("ENABLE_FILE_LOGGING", "False")
+
+from config.settings import Settings  # noqa: E402
+from dataio.data_loader import AnimeDataLoader  # noqa: E402
+from rag.retrieval import search  # noqa: E402
+from rag.vector_store import VectorStoreBuilder  # noqa: E402
+
+QUERIES = [
+    "Recommend anime similar to Attack on Titan with deep psychological and emotional themes.",
+    "A lighthearted school romance comedy",
+    "Space bounty hunters with jazz and noir vibes",
+    "Dark fantasy with demons and a tragic hero",
+    "Sports anime about an underdog team",
+    "Mecha war drama with political intrigue",
+    "Slice of life about friendship and music",
+    "Detective mystery with a genius protagonist",
+]
+
+
+def dir_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files
+    )
+
+
+def run(mode: str, raw_csv: str, max_chars: int, queries: list[str], k: int) -> dict:
+    settings = Settings(INDEX_MODE=mode, TITLE_DOC_MAX_CHARS=max_chars)
+    documents = AnimeDataLoader(raw_csv).iter_documents(chunk_rows=settings.INGEST_CHUNK_ROWS)
+    with tempfile.TemporaryDirectory() as persist_directory:
+        builder = VectorStoreBuilder("", settings, persist_directory=persist_directory)
+        start = time.perf_counter()
+        vector_store = builder.create_vector_store(documents=documents)
+        seconds = time.perf_counter() - start
+
+        raw, deduped = [], []
+        for query in queries:
+            hits = vector_store.similarity_search(query, k=k)
+            raw.append(len({d.metadata.get("anime_id") for d in hits}))
+            deduped.append(len({d.metadata.get("anime_id") for d in search(vector_store, query, k=k)}))
+
+        return {
+            "mode": mode,
+            "documents": vector_store._collection.count(),
+            "size_mb": dir_size(persist_directory) / 1e6,
+            "seconds": seconds,
+            "distinct": statistics.fmean(raw),
+            "deduped": statistics.fmean(deduped),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index mode benchmark")
+    parser.add_argument("--csv", default=Settings().RAW_CSV_PATH, help="Raw catalog CSV.")
+    parser.add_argument("--k", type=int, default=3, help="Results per query.")
+    parser.add_argument("--max-chars", type=int, default=0, help="TITLE_DOC_MAX_CHARS for title mode.")
+    args = parser.parse_args()
+
+    for mode in ("chunks", "title"):
+        r = run(mode, args.csv, args.max_chars, QUERIES, args.k)
+        print(
+            f"{r['mode']:>6}: {r['documents']} documents, {r['size_mb']:.1f} MB, "
+            f"build {r['seconds']:.1f}s, distinct@{args.k} {r['distinct']:.2f}, "
+            f"deduped@{args.k} {r['deduped']:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+ingest_memory.py — Peak-memory comparison of eager vs streaming CSV ingestion.
+
+Generates a synthetic raw catalog and, in a fresh subprocess per mode,
+runs ingestion up to the point where chunks would be handed to the
+embedder, reporting wall time and peak RSS:
+
+  eager      AnimeDataLoader.load_and_process() + processed-CSV load + split
+  streaming  AnimeDataLoader.iter_documents() piped through iter_chunks()
+
+Usage (from backend/):
+    python -m benchmarks.ingest_memory --rows 2000000
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GENRES = ["Action", "Adventure", "Comedy", "Drama", "Fantasy", "Mecha", "Romance", "Sci-Fi", "Slice of Life"]
+WORDS = "the a hero journey world power friends battle secret school city ancient dream".split()
+
+
+def write_synthetic_csv(path: str, rows: int, synopsis_words: int = 80) -> None:
+    """Write a raw catalog with the same columns as data/anime_raw.csv."""
+    rng = random.Random(42)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["MAL_ID", "Name", "Score", "Genre", "Synopsis"])
+        for i in range(rows):
+            writer.writerow([
+                i,
+                f"Synthetic Anime {i}",
+                round(rng.uniform(5, 9.5), 2),
+                ", ".join(rng.sample(GENRES, 3)),
+                " ".join(rng.choices(WORDS, k=synopsis_words)),
+            ])
+
+
+def _measure(mode: str, raw_csv: str, chunk_rows: int) -> dict:
+    """Run one ingestion mode in this process and report peak RSS."""
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault("ENABLE_FILE_LOGGING", "False")
+    # The builder constructs an embedding client but never calls it here
+    os.environ.setdefault("OPENAI_API_KEY", "unused-by-benchmark")
+
+    from config.settings import Settings
+    from dataio.data_loader import AnimeDataLoader
+    from rag.vector_store import VectorStoreBuilder
+
+    start = time.perf_counter()
+    loader = AnimeDataLoader(raw_csv)
+    if mode == "eager":
+        processed_csv = loader.load_and_process()
+        builder = VectorStoreBuilder(processed_csv, Settings(), persist_directory="unused")
+        chunks = len(builder.load_chunks())
+    else:
+        builder = VectorStoreBuilder("", Settings(), persist_directory="unused")
+        chunks = sum(1 for _ in builder.iter_chunks(loader.iter_documents(chunk_rows=chunk_rows)))
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "mode": mode,
+        "chunks": chunks,
+        "seconds": round(time.perf_counter() - start, 2),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion memory benchmark")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Synthetic catalog size.")
+    parser.add_argument("--chunk-rows", type=int, default=10_000, help="Rows per streaming chunk.")
+    parser.add_argument("--measure", choices=["eager", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(_measure(args.measure, args.csv, args.chunk_rows)))
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # load_and_process() writes data/anime_processed.csv relative to cwd
+        os.makedirs(os.path.join(workdir, "data"))
+        raw_csv = os.path.join(workdir, "anime_raw.csv")
+        print(f"Generating {args.rows:,} synthetic rows...")
+        write_synthetic_csv(raw_csv, args.rows)
+        print(f"Raw CSV size: {os.path.getsize(raw_csv) / 1e6:.1f} MB")
+
+        for mode in ("eager", "streaming"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.ingest_memory", "--measure", mode,
+                 "--csv", raw_csv, "--chunk-rows", str(args.chunk_rows)],
+                cwd=workdir, env=dict(os.environ, PYTHONPATH=BACKEND_DIR),
+                capture_output=True, text=True, check=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{result['mode']:>10}: {result['chunks']:,} chunks in {result['seconds']}s, "
+                f"peak RSS {result['peak_rss_mb']} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+load_test.py — Concurrent throughput probe for a running Anime Recommender API.
+
+Fires a fixed number of /recommend requests with bounded concurrency and
+reports throughput and latency percentiles for a single worker.
+
+Usage (from backend/):
+    uvicorn app.main:app --workers 1 --port 8080
+    python -m benchmarks.load_test --concurrency 64 --requests 256
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _worker(client: httpx.AsyncClient, url: str, payload: dict, queue: asyncio.Queue, latencies: list, errors: list):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        try:
+            res = await client.post(url, json=payload)
+            res.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e))
+
+
+async def run_load_test(
+    base_url: str,
+    question: str,
+    mode: str,
+    concurrency: int,
+    total: int,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> dict:
+    """
+    Send `total` requests with at most `concurrency` in flight and summarize.
+    Pass an `httpx.ASGITransport` to drive an app in-process instead of over the network.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    latencies: list[float] = []
+    errors: list[str] = []
+    payload = {"question": question, "mode": mode}
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits, transport=transport) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(client, "/recommend", payload, queue, latencies, errors)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+    return {
+        "requests": total,
+        "errors": len(errors),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_mean": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "latency_p50": round(pct(0.50), 3),
+        "latency_p95": round(pct(0.95), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Anime Recommender load test")
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL of the API.")
+    parser.add_argument("--mode", choices=["AGENT", "CHAIN"], default="CHAIN")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument(
+        "--question",
+        default="Recommend anime similar to Attack on Titan with deep psychological and emotional themes.",
+    )
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run_load_test(args.url, args.question, args.mode, args.concurrency, args.requests)
+    )
+    for key, value in result.items():
+        print(f"{key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+logging_overhead.py — Per-request cost of logging on the recommendation path.
+
+Runs the same CHAIN (or AGENT) requests against stub models (see stubs.py)
+in a fresh process per logging configuration, since loggers are set up
+once at import:
+
+  off        logging disabled (the floor)
+  sync       handlers write on the request thread (LOG_QUEUE=False)
+  queue      records handed to the background listener (LOG_QUEUE=True)
+  queue+json queue mode with LOG_FORMAT=json
+  sampled    queue mode, chatty request-path loggers sampled to 10%
+
+The console handler writes to a pipe drained by this process (as under a
+container log driver); --file-logging adds the local logs/app.log handler.
+--sink-latency-ms makes every console write block for that long, like a
+slow or back-pressured log consumer.
+Reported per configuration:
+
+  mean / p50 / p95   request latency
+  overhead           mean latency minus `off` (noisy: a few tenths of a ms)
+  log ms/req         time the request thread spent inside Logger.handle
+                     (filtering, formatting, writing or enqueueing) — the
+                     direct hot-path cost of logging
+  records/req        records emitted per request
+
+Usage (from backend/):
+    python -m benchmarks.logging_overhead --requests 500
+    python -m benchmarks.logging_overhead --requests 500 --file-logging
+    python -m benchmarks.logging_overhead --requests 500 --sink-latency-ms 0.5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHATTY_LOGGERS = "recommender.anime_recommender=0.1,tools.retrieval_tools=0.1,rag.retrieval=0.1,rag.context_builder=0.1"
+
+CONFIGS = {
+    "off": {"LOG_QUEUE": "False"},
+    "sync": {"LOG_QUEUE": "False"},
+    "queue": {"LOG_QUEUE": "True"},
+    "queue+json": {"LOG_QUEUE": "True", "LOG_FORMAT": "json"},
+    "sampled": {"LOG_QUEUE": "True", "LOG_SAMPLE_RATES": CHATTY_LOGGERS},
+}
+QUESTIONS = [
+    "Dark fantasy with demons and a tragic hero",
+    "A lighthearted school romance comedy",
+    "Space bounty hunters with jazz and noir vibes",
+    "Sports anime about an underdog team",
+]
+
+
+class SlowStream:
+    """Stream wrapper whose writes block for `latency` seconds (GIL released, like real I/O)."""
+
+    def __init__(self, stream, latency: float):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def run_requests(mode: str, requests: int, titles: int, disable_logging: bool, sink_latency: float) -> dict:
+    """Child process: time `requests` recommendations with the logging config from the environment."""
+    import itertools
+    import logging
+
+    if sink_latency > 0:
+        # Before any logger is set up, so the console handler picks it up
+        sys.stdout = SlowStream(sys.stdout, sink_latency)
+
+    from langchain_chroma import Chroma
+
+    from benchmarks.stubs import StubChatModel, StubEmbeddings
+    from config.settings import Settings
+    from dataio.data_loader import AnimeDataLoader
+    from recommender.anime_recommender import AnimeRecommender
+
+    if disable_logging:
+        logging.disable(logging.CRITICAL)
+
+    settings = Settings(ANSWER_CACHE_ENABLED=False)
+    documents = list(itertools.islice(AnimeDataLoader(settings.RAW_CSV_PATH).iter_documents(), titles))
+    ids = [f"{i}-0" for i in range(len(documents))]
+    store = Chroma.from_documents(documents, StubEmbeddings(), ids=ids)
+    recommender = AnimeRecommender(settings, mode=mode, model=StubChatModel(), vector_store=store)
+    recommender.recommend(QUESTIONS[0])  # warm up
+
+    # Time spent logging on the request thread
+    handle = logging.Logger.handle
+    spent = {"seconds": 0.0, "records": 0}
+
+    def timed_handle(self, record):
+        start = time.perf_counter()
+        try:
+            return handle(self, record)
+        finally:
+            spent["seconds"] += time.perf_counter() - start
+            spent["records"] += 1
+
+    logging.Logger.handle = timed_handle
+
+    latencies = []
+    for i in range(requests):
+        question = f"{QUESTIONS[i % len(QUESTIONS)]} (request {i})"
+        start = time.perf_counter()
+        recommender.recommend(question)
+        latencies.append(time.perf_counter() - start)
+    return {"latencies": latencies, "log_seconds": spent["seconds"], "records": spent["records"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging overhead benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per configuration.")
+    parser.add_argument("--titles", type=int, default=500, help="Catalog rows loaded into the store.")
+    parser.add_argument("--mode", choices=["AGENT", "CHAIN"], default="CHAIN")
+    parser.add_argument("--configs", nargs="+", choices=list(CONFIGS), default=list(CONFIGS))
+    parser.add_argument("--file-logging", action="store_true", help="Also write logs/app.log (local file handler).")
+    parser.add_argument("--sink-latency-ms", type=float, default=0.0, help="Block each console write this long.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_requests(
+            args.mode, args.requests, args.titles,
+            disable_logging=os.environ.get("BENCH_LOGGING_OFF") == "1",
+            sink_latency=args.sink_latency_ms / 1000,
+        )
+        with open(args.child, "w") as f:
+            json.dump(result, f)
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="anime-logging-bench-") as workdir:
+        for name in args.configs:
+            out = os.path.join(workdir, f"{name}.json")
+            env = {
+                **os.environ,
+                **CONFIGS[name],
+                "ENVIRONMENT": "local",
+                "ENABLE_FILE_LOGGING": str(args.file_logging),
+                "RAW_CSV_PATH": os.path.abspath(os.environ.get("RAW_CSV_PATH", "data/anime_raw.csv")),
+                "PYTHONPATH": BACKEND_DIR,
+                "BENCH_LOGGING_OFF": "1" if name == "off" else "0",
+            }
+            # Run from the scratch dir so logs/app.log lands there; stdout is drained and discarded
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.logging_overhead", "--child", out,
+                 "--requests", str(args.requests), "--titles", str(args.titles), "--mode", args.mode,
+                 "--sink-latency-ms", str(args.sink_latency_ms)],
+                cwd=workdir, env=env, stdout=subprocess.PIPE, check=True,
+            )
+            with open(out) as f:
+                results[name] = json.load(f)
+
+    baseline = statistics.fmean(results["off"]["latencies"]) if "off" in results else None
+    print(
+        f"{'config':>11} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'overhead':>9} "
+        f"{'log ms/req':>11} {'records/req':>12}"
+    )
+    for name, result in results.items():
+        latencies = sorted(result["latencies"])
+        mean = statistics.fmean(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        overhead = f"{1000 * (mean - baseline):>9.3f}" if baseline is not None else f"{'-':>9}"
+        print(
+            f"{name:>11} {1000 * mean:>8.3f} {1000 * statistics.median(latencies):>8.3f} {1000 * p95:>8.3f} "
+            f"{overhead} {1000 * result['log_seconds'] / args.requests:>11.3f} "
+            f"{result['records'] / args.requests:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
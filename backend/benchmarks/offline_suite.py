@@ -0,0 +1,223 @@
+"""
+offline_suite.py — End-to-end benchmarks with stub models, no network needed.
+
+Runs the real build, recommendation and HTTP code paths with the chat
+model and embeddings replaced by the deterministic stand-ins from
+stubs.py. The stubs' latency and token rate are configurable, so you can
+measure the pipeline's own overhead (all zero, the default) or
+approximate production timings. Three sections:
+
+  build   VectorService builds of synthetic catalogs of increasing size:
+          seconds, chunks/sec and titles/sec
+  query   sequential recommend() calls per mode (AGENT vs CHAIN): TTFT and
+          total latency p50 / p95 / p99
+  http    concurrent POST /recommend against the FastAPI app in-process
+          (httpx ASGI transport): throughput and latency per concurrency
+
+Everything is written to a temporary directory (builds stream the raw
+CSV, so data/anime_processed.csv is left alone) and removed afterwards.
+The answer cache is disabled so every request reaches the model. INFO
+logging is disabled unless --verbose is passed.
+
+Usage (from backend/):
+    python -m benchmarks.offline_suite
+    python -m benchmarks.offline_suite --sizes 1000 5000 20000 \\
+        --embed-latency 0.05 --llm-first-token 0.4 --llm-tokens-per-second 60
+    python -m benchmarks.offline_suite --sections query http --http-concurrency 1 16 64
+"""
+
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+
+# Isolate the run before any module reads Settings()
+WORKDIR = tempfile.mkdtemp(prefix="anime-offline-bench-")
+os.environ.update({
+    "ENABLE_FILE_LOGGING": "False",
+    "CHROMA_DIR": os.path.join(WORKDIR, "chroma"),
+    "EMBEDDING_MODEL": "stub-embeddings",
+    "EMBEDDING_CACHE_PATH": "",
+    "ANSWER_CACHE_ENABLED": "False",
+    "INGEST_STREAMING": "True",
+    "WARMUP_MODES": "",
+})
+
+import httpx  # noqa: E402
+
+from app.services.recommender_service import RecommenderService  # noqa: E402
+from app.services.vector_service import VectorService  # noqa: E402
+from benchmarks.load_test import run_load_test  # noqa: E402
+from benchmarks.stubs import StubChatModel, StubEmbeddings, install  # noqa: E402
+from config.settings import Settings  # noqa: E402
+
+GENRES = [
+    "Action", "Adventure", "Comedy", "Drama", "Fantasy", "Horror", "Mecha", "Mystery",
+    "Romance", "School", "Sci-Fi", "Slice of Life", "Space", "Sports", "Supernatural",
+]
+TYPES = ["TV", "Movie", "OVA", "ONA", "Special"]
+WORDS = (
+    "the a hero journey world power friends battle secret school city ancient dream "
+    "mecha pilot magic girl detective samurai demon romance space crew tournament "
+    "war memory village kingdom curse rival team music island robot spirit"
+).split()
+QUESTIONS = [
+    "Dark fantasy with demons and a tragic hero",
+    "A lighthearted school romance comedy",
+    "Space bounty hunters with jazz and noir vibes",
+    "Sports anime about an underdog team",
+    "Top-rated mecha war drama from the 2000s",
+    "Mystery series with a genius detective",
+]
+
+
+def synthetic_catalog(path: str, titles: int, seed: int = 7) -> None:
+    """Write a raw CSV in the dataset's layout with `titles` rows."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["MAL_ID", "Name", "Score", "Genre", "Synopsis", "Type", "Year"])
+        for i in range(titles):
+            synopsis = ". ".join(" ".join(rng.choices(WORDS, k=12)).capitalize() for _ in range(6)) + "."
+            writer.writerow([
+                i + 1,
+                f"Synthetic Anime {i + 1}",
+                f"{rng.uniform(5, 9.5):.2f}",
+                ", ".join(rng.sample(GENRES, k=rng.randint(1, 4))),
+                synopsis,
+                rng.choice(TYPES),
+                rng.randint(1980, 2024),
+            ])
+
+
+def percentile(samples: list[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p * len(samples)))] if samples else 0.0
+
+
+def build(settings: Settings, titles: int, chroma_dir: str) -> dict:
+    """Build a synthetic catalog of `titles` rows into `chroma_dir` and return the build stats."""
+    csv_path = os.path.join(WORKDIR, f"catalog-{titles}.csv")
+    synthetic_catalog(csv_path, titles)
+    settings = settings.model_copy(update={"CHROMA_DIR": chroma_dir})
+    start = time.perf_counter()
+    stats = VectorService.build_vector_store(csv_path, chroma_dir, settings, resume=False)
+    stats["wall_seconds"] = time.perf_counter() - start
+    return stats
+
+
+# -----------------------------------------------------
+# 🏗️ Build throughput
+# -----------------------------------------------------
+def bench_build(settings: Settings, sizes: list[int]) -> None:
+    print("\n== build ==")
+    print(f"{'titles':>8} {'chunks':>8} {'seconds':>9} {'chunks/s':>10} {'titles/s':>10}")
+    for titles in sizes:
+        stats = build(settings, titles, os.path.join(WORKDIR, f"build-{titles}"))
+        seconds = stats["wall_seconds"]
+        print(
+            f"{titles:>8} {stats['chunks']:>8} {seconds:>9.2f} "
+            f"{stats['chunks_per_second']:>10.1f} {titles / seconds:>10.1f}"
+        )
+
+
+# -----------------------------------------------------
+# ⚡ AGENT vs CHAIN latency
+# -----------------------------------------------------
+def bench_queries(settings: Settings, modes: list[str], requests: int) -> None:
+    print("\n== query ==")
+    print(f"{'mode':>6} {'ttft p50':>9} {'ttft p95':>9} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    for mode in modes:
+        recommender = RecommenderService.get_recommender(settings, mode)
+        recommender.recommend(QUESTIONS[0])  # warm up
+
+        ttfts, totals = [], []
+        for i in range(requests):
+            # Distinct questions, so the query-embedding cache doesn't hide embedding latency
+            question = f"{QUESTIONS[i % len(QUESTIONS)]} (request {i})"
+            start = time.perf_counter()
+            first = None
+            for _ in recommender.stream(question):
+                if first is None:
+                    first = time.perf_counter() - start
+            totals.append(time.perf_counter() - start)
+            ttfts.append(first or totals[-1])
+
+        ms = lambda samples, p: 1000 * percentile(samples, p)  # noqa: E731
+        print(
+            f"{mode:>6} {ms(ttfts, 0.5):>9.1f} {ms(ttfts, 0.95):>9.1f} "
+            f"{ms(totals, 0.5):>8.1f} {ms(totals, 0.95):>8.1f} {ms(totals, 0.99):>8.1f}"
+        )
+
+
+# -----------------------------------------------------
+# 🌐 FastAPI throughput
+# -----------------------------------------------------
+def bench_http(modes: list[str], concurrencies: list[int], requests: int) -> None:
+    from app.main import app
+
+    print("\n== http ==")
+    print(f"{'mode':>6} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    transport = httpx.ASGITransport(app=app)
+    for mode in modes:
+        for concurrency in concurrencies:
+            result = asyncio.run(run_load_test(
+                "http://bench", QUESTIONS[0], mode, concurrency, requests, transport=transport
+            ))
+            print(
+                f"{mode:>6} {concurrency:>5} {result['throughput_rps']:>8.1f} "
+                f"{1000 * result['latency_p50']:>8.1f} {1000 * result['latency_p95']:>8.1f} {result['errors']:>7}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite (stub LLM and embeddings)")
+    parser.add_argument("--sections", nargs="+", choices=["build", "query", "http"], default=["build", "query", "http"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 8000], help="Build: catalog sizes.")
+    parser.add_argument("--catalog", type=int, default=2000, help="Query/http: titles in the served catalog.")
+    parser.add_argument("--modes", nargs="+", choices=["AGENT", "CHAIN"], default=["AGENT", "CHAIN"])
+    parser.add_argument("--requests", type=int, default=200, help="Query: sequential requests per mode.")
+    parser.add_argument("--http-concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--http-requests", type=int, default=256, help="Http: requests per concurrency level.")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="Stub seconds per embedding call.")
+    parser.add_argument("--embed-latency-per-text", type=float, default=0.0, help="Stub seconds per embedded text.")
+    parser.add_argument("--embed-size", type=int, default=256, help="Stub embedding dimension.")
+    parser.add_argument("--llm-first-token", type=float, default=0.0, help="Stub seconds before each model call's first token.")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=0.0, help="Stub streaming rate (0 = instant).")
+    parser.add_argument("--verbose", action="store_true", help="Keep INFO logging on.")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    model = StubChatModel(first_token_latency=args.llm_first_token, tokens_per_second=args.llm_tokens_per_second)
+    embeddings = StubEmbeddings(args.embed_size, args.embed_latency, args.embed_latency_per_text)
+    settings = Settings()
+    print(
+        f"stubs: embeddings {args.embed_latency * 1000:.0f} ms/call + {args.embed_latency_per_text * 1000:.1f} ms/text, "
+        f"LLM first token {args.llm_first_token * 1000:.0f} ms, "
+        f"{args.llm_tokens_per_second or 'unlimited'} tokens/s"
+    )
+
+    try:
+        with install(model, embeddings):
+            if "build" in args.sections:
+                bench_build(settings, args.sizes)
+            if "query" in args.sections or "http" in args.sections:
+                # The served catalog lives in CHROMA_DIR, where the app's routers look
+                build(settings, args.catalog, settings.CHROMA_DIR)
+            if "query" in args.sections:
+                bench_queries(settings, args.modes, args.requests)
+            if "http" in args.sections:
+                bench_http(args.modes, args.http_concurrency, args.http_requests)
+    finally:
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+retrieval_benchmark.py — Dense vs BM25 vs hybrid retrieval quality and latency.
+
+Runs known-item queries against the live vector store and its keyword
+index. Each query targets one catalog title; a hit is any retrieved chunk
+of that title. Two query sets are generated from the stored chunks:
+
+  title    "anime like <Name>"         (names, studios, rare words)
+  snippet  8 consecutive synopsis words (descriptive phrasing)
+
+Reports hit@k and MRR@k per method and query set, plus p50/p95 latency.
+Query embeddings go through the configured provider (uncached).
+
+Usage (from backend/, after a build):
+    python -m benchmarks.retrieval_benchmark --queries 100 --k 3
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("ENABLE_FILE_LOGGING", "False")
+os.environ.setdefault("EMBEDDING_CACHE_ENABLED", "False")
+
+from config.settings import Settings  # noqa: E402
+from rag.keyword_index import KeywordIndex  # noqa: E402
+from rag.retrieval import search  # noqa: E402
+from rag.store_versions import StoreVersions  # noqa: E402
+from rag.vector_store import VectorStoreBuilder  # noqa: E402
+
+
+def make_queries(vector_store, n: int, seed: int = 7) -> dict[str, list[tuple[str, str]]]:
+    """Return {query_set: [(query, anime_id), ...]} sampled from the stored chunks."""
+    stored = vector_store._collection.get(include=["documents", "metadatas"])
+    first_chunks = [
+        (doc, meta) for doc, meta, chunk_id in zip(stored["documents"], stored["metadatas"], stored["ids"])
+        if chunk_id.endswith("-0") and meta.get("Name")
+    ]
+    rng = random.Random(seed)
+    sample = rng.sample(first_chunks, min(n, len(first_chunks)))
+
+    snippets = []
+    for doc, meta in sample:
+        words = doc.split("Overview:", 1)[-1].split()
+        lo = rng.randrange(max(1, len(words) - 8))
+        snippets.append((" ".join(words[lo:lo + 8]), meta["anime_id"]))
+    return {
+        "title": [(f"anime like {meta['Name']}", meta["anime_id"]) for _, meta in sample],
+        "snippet": snippets,
+    }
+
+
+def evaluate(vector_store, keyword_index, queries: list[tuple[str, str]], k: int, method: str) -> dict:
+    hits, reciprocal_ranks, latencies = 0, [], []
+    for query, anime_id in queries:
+        start = time.perf_counter()
+        if method == "bm25":
+            ids = [chunk_id for chunk_id, _ in keyword_index.search(query, k)]
+        else:
+            docs = search(vector_store, query, k=k, keyword_index=keyword_index if method == "hybrid" else None)
+            ids = [d.id for d in docs]
+        latencies.append(time.perf_counter() - start)
+
+        rank = next((i for i, chunk_id in enumerate(ids, 1) if chunk_id.rsplit("-", 1)[0] == anime_id), None)
+        hits += rank is not None
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+    latencies.sort()
+    return {
+        "hit_rate": hits / len(queries),
+        "mrr": statistics.fmean(reciprocal_ranks),
+        "p50_ms": 1000 * statistics.median(latencies),
+        "p95_ms": 1000 * latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hybrid retrieval benchmark")
+    parser.add_argument("--queries", type=int, default=100, help="Queries per query set.")
+    parser.add_argument("--k", type=int, default=3, help="Documents retrieved per query.")
+    args = parser.parse_args()
+
+    settings = Settings()
+    vector_store = VectorStoreBuilder(processed_csv="", settings=settings).load_vector_store()
+    keyword_index = KeywordIndex.load(StoreVersions(settings.CHROMA_DIR).current_dir())
+    if keyword_index is None:
+        raise SystemExit("No keyword index in the live vector store version — rebuild it first.")
+
+    for query_set, queries in make_queries(vector_store, args.queries).items():
+        print(f"\n{query_set} queries ({len(queries)}), k={args.k}")
+        for method in ("dense", "bm25", "hybrid"):
+            r = evaluate(vector_store, keyword_index, queries, args.k, method)
+            print(
+                f"  {method:>6}: hit@{args.k} {r['hit_rate']:.3f}  MRR {r['mrr']:.3f}  "
+                f"p50 {r['p50_ms']:.1f} ms  p95 {r['p95_ms']:.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+startup_time.py — Cold-start report: import cost and time to healthy / ready.
+
+Each measurement runs in a fresh interpreter, since imports are cached
+per process:
+
+  imports   `python -X importtime -c "import <module>"`: total import time
+            and the top-level packages that account for it (cumulative
+            self time, so nested imports are attributed to their package)
+  startup   imports app.main, starts the lifespan (in-process TestClient)
+            and polls until /health/ready turns 200: import time, first
+            /health response, ready time and the app's own phase breakdown
+            (import_recommender, warmup_<mode>, ...)
+
+With WARMUP_BACKGROUND=True (the default) /health answers right after
+import; ready follows once LangChain / Chroma are imported and the
+WARMUP_MODES recommenders are loaded. Warming up against a real store
+needs the configured model's API key in the environment (no calls are
+made at startup). Without a store, ready is reached once imports finish.
+
+Usage (from backend/):
+    python -m benchmarks.startup_time
+    python -m benchmarks.startup_time --module pipeline.main --top 15
+    python -m benchmarks.startup_time --sync --chroma-dir chroma_db
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(module: str, env: dict) -> tuple[float, dict[str, float]]:
+    """Total import seconds of `module` and self seconds per top-level package."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+    )
+    packages: dict[str, float] = defaultdict(float)
+    total = 0.0
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        packages[name.strip().split(".")[0]] += int(self_us) / 1e6
+        if name.strip() == module:
+            total = int(cumulative_us) / 1e6
+    return total, dict(packages)
+
+
+def measure_startup(timeout: float) -> dict:
+    """Child process: import the app, start it and wait for readiness."""
+    start = time.perf_counter()
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    imported = time.perf_counter() - start
+
+    with TestClient(app) as client:
+        client.get("/health").raise_for_status()
+        healthy = time.perf_counter() - start
+        while client.get("/health/ready").status_code != 200:
+            if time.perf_counter() - start > timeout:
+                break
+            time.sleep(0.02)
+        ready = time.perf_counter() - start
+        startup = client.get("/health").json()["startup"]
+    return {"import": imported, "healthy": healthy, "ready": ready, "startup": startup}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import and readiness report")
+    parser.add_argument("--module", default="app.main", help="Module whose import time is profiled.")
+    parser.add_argument("--top", type=int, default=10, help="Packages listed in the import profile.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per measurement (median reported).")
+    parser.add_argument("--sync", action="store_true", help="Measure with WARMUP_BACKGROUND=False.")
+    parser.add_argument("--chroma-dir", help="Store to warm up against (default: CHROMA_DIR from the environment).")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for readiness.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with open(args.child, "w") as f:
+            json.dump(measure_startup(args.timeout), f)
+        return
+
+    env = {**os.environ, "PYTHONPATH": BACKEND_DIR, "ENABLE_FILE_LOGGING": "False"}
+    env["WARMUP_BACKGROUND"] = str(not args.sync)
+    if args.chroma_dir:
+        env["CHROMA_DIR"] = os.path.abspath(args.chroma_dir)
+
+    median = lambda values: sorted(values)[len(values) // 2]  # noqa: E731
+
+    print(f"== imports ({args.module}) ==")
+    profiles = [import_profile(args.module, env) for _ in range(args.runs)]
+    total = median([t for t, _ in profiles])
+    packages = profiles[-1][1]
+    print(f"{'total':>28} {total:>8.3f} s")
+    for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{name:>28} {seconds:>8.3f} s  {100 * seconds / max(total, 1e-9):>5.1f}%")
+
+    print(f"\n== startup (WARMUP_BACKGROUND={env['WARMUP_BACKGROUND']}) ==")
+    results = []
+    with tempfile.TemporaryDirectory(prefix="anime-startup-bench-") as workdir:
+        for i in range(args.runs):
+            out = os.path.join(workdir, f"run-{i}.json")
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.startup_time", "--child", out, "--timeout", str(args.timeout)],
+                cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, check=True,
+            )
+            with open(out) as f:
+                results.append(json.load(f))
+
+    for key in ("import", "healthy", "ready"):
+        print(f"{key:>28} {median([r[key] for r in results]):>8.3f} s")
+    startup = results[-1]["startup"]
+    print(f"{'state':>28} {startup['state']}" + (f" ({startup['error']})" if startup["error"] else ""))
+    for phase, seconds in startup["phases"].items():
+        print(f"{phase:>28} {seconds:>8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
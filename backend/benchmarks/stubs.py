@@ -0,0 +1,161 @@
+"""
+stubs.py — Deterministic local stand-ins for the chat model and embeddings.
+
+Lets the benchmarks run the real pipeline (AnimeRecommender,
+VectorStoreBuilder, the FastAPI app) without network access or API costs,
+while still simulating provider latency:
+
+  StubEmbeddings   hash-seeded unit vectors; `latency` per call plus
+                   `latency_per_text` per embedded text
+  StubChatModel    streams a fixed answer after `first_token_latency`, then
+                   one word every 1 / `tokens_per_second` seconds. Bound to
+                   tools (AGENT mode), its first turn calls retrieve_context
+                   with the user's question.
+
+`install()` plugs them into the places the app creates its models
+(`init_chat_model`, `get_embeddings`), so code paths that build their own
+models — RecommenderService, VectorService builds — pick them up too.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+ANSWER = " ".join(
+    f"{i}. A recommended title with a short summary and why it matches your taste." for i in range(1, 4)
+)
+
+
+class StubEmbeddings(Embeddings):
+    """Deterministic embeddings with simulated provider latency."""
+
+    def __init__(self, size: int = 256, latency: float = 0.0, latency_per_text: float = 0.0):
+        """
+        Args:
+            size: Vector dimension.
+            latency: Seconds added to every embedding call (network round-trip).
+            latency_per_text: Seconds added per embedded text (provider compute).
+        """
+        self.size = size
+        self.latency = latency
+        self.latency_per_text = latency_per_text
+
+    def _vector(self, text: str) -> list[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vec = np.random.default_rng(seed).standard_normal(self.size).astype(np.float32)
+        return (vec / np.linalg.norm(vec)).tolist()
+
+    def _delay(self, n: int) -> float:
+        return self.latency + n * self.latency_per_text
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self._delay(len(texts)))
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(self._delay(1))
+        return self._vector(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(self._delay(len(texts)))
+        return [self._vector(t) for t in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        await asyncio.sleep(self._delay(1))
+        return self._vector(text)
+
+
+class StubChatModel(BaseChatModel):
+    """Chat model streaming a fixed answer at a configurable pace."""
+
+    answer: str = ANSWER
+    first_token_latency: float = 0.0  # seconds before the first chunk of every call
+    tokens_per_second: float = 0.0  # words streamed per second (0 = no delay)
+    tool_names: tuple[str, ...] = ()  # set by bind_tools
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def bind_tools(self, tools, **kwargs):
+        names = tuple(getattr(t, "name", None) or t["name"] for t in tools)
+        return self.model_copy(update={"tool_names": names})
+
+    def _tool_call(self, messages) -> dict | None:
+        """First agent turn: search for the question; afterwards answer."""
+        if "retrieve_context" not in self.tool_names or any(isinstance(m, ToolMessage) for m in messages):
+            return None
+        question = next((m.text for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+        return {"name": "retrieve_context", "args": {"query": question}, "id": f"call-{len(messages)}"}
+
+    def _chunks(self, messages) -> Iterator[AIMessageChunk]:
+        call = self._tool_call(messages)
+        if call is not None:
+            chunk = {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}
+            yield AIMessageChunk(content="", tool_call_chunks=[chunk])
+            return
+        words = self.answer.split(" ")
+        for i, word in enumerate(words):
+            yield AIMessageChunk(content=word if i == len(words) - 1 else word + " ")
+
+    def _token_delay(self) -> float:
+        return 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _message(self, messages) -> AIMessage:
+        call = self._tool_call(messages)
+        if call is not None:
+            return AIMessage(content="", tool_calls=[call])
+        return AIMessage(content=self.answer)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.first_token_latency + self._token_delay() * len(self.answer.split(" ")))
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.first_token_latency + self._token_delay() * len(self.answer.split(" ")))
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_latency)
+        for i, chunk in enumerate(self._chunks(messages)):
+            if i:
+                time.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.first_token_latency)
+        for i, chunk in enumerate(self._chunks(messages)):
+            if i:
+                await asyncio.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=chunk)
+
+
+@contextmanager
+def install(model: StubChatModel, embeddings: StubEmbeddings) -> Iterator[None]:
+    """Make the app create `model` / `embeddings` instead of the configured providers."""
+    import app.services.recommender_service as recommender_service
+    import rag.vector_store as vector_store
+    import recommender.anime_recommender as anime_recommender
+
+    patches = [
+        (recommender_service, "init_chat_model", lambda *args, **kwargs: model),
+        (anime_recommender, "init_chat_model", lambda *args, **kwargs: model),
+        (vector_store, "get_embeddings", lambda settings: embeddings),
+    ]
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    for module, name, stub in patches:
+        setattr(module, name, stub)
+    try:
+        yield
+    finally:
+        for module, name, original in originals:
+            setattr(module, name, original)
@@ -1,4 +1,5 @@
 # src/animerec/config/settings.py
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from pydantic import Field
 import os
@@ -8,22 +9,99 @@ class Settings(BaseSettings):
     # Core configuration
     ENABLE_FILE_LOGGING: bool = Field(default=True)
     ENVIRONMENT: str = Field(default="local", description="Environment name: local, dev, prod, or azure")
+    LOG_QUEUE: bool = True  # console/file writes happen on a background listener thread
+    LOG_FORMAT: str = "text"  # text | json (one object per line)
+    LOG_STREAM: str = "stdout"  # console log stream: stdout | stderr (the pipeline CLI defaults to stderr)
+    LOG_SAMPLE_RATES: str = Field(
+        default="",
+        description="Per-logger fraction of INFO records kept, e.g. 'recommender.anime_recommender=0.1'",
+    )
+    LOG_RATE_LIMITS: str = Field(
+        default="",
+        description="Per-logger max INFO records per second, e.g. 'rag.retrieval=20'",
+    )
     
     # Models
     MODEL_NAME: str = Field(default="gpt-4o-mini")  # or llama-3.1-8b-instant if using Groq
-    EMBEDDING_MODEL: str = "text-embedding-3-large"  # or sentence-transformers
+    EMBEDDING_MODEL: str = "text-embedding-3-large"  # or sentence-transformers/all-MiniLM-L6-v2
+    EMBEDDING_PROVIDER: str | None = Field(
+        default=None,
+        description="openai | local; inferred from EMBEDDING_MODEL when unset",
+    )
+
+    # Local embeddings (EMBEDDING_PROVIDER=local)
+    LOCAL_EMBED_DEVICE: str = "cpu"
+    LOCAL_EMBED_BATCH_SIZE: int = 64  # texts per forward pass
+    LOCAL_EMBED_PROCESSES: int = 0  # worker processes for build batches (0/1 = in-process)
+    LOCAL_EMBED_QUANTIZE: bool = False  # dynamic int8 quantization of the model (CPU)
 
     # Stores
     CHROMA_DIR: str = "chroma_db"
     CHROMA_COLLECTION: str = "anime_collection"
-    TOP_K: int = 3
+    TOP_K: int = 3  # documents retrieved into each prompt / tool result
+    RETRIEVAL_CANDIDATES: int = 12  # distinct titles fetched before MMR / re-ranking pick TOP_K
+    MMR_ENABLED: bool = False  # diversify the TOP_K picks with maximal marginal relevance
+    MMR_LAMBDA: float = 0.7  # 1 = relevance only, 0 = diversity only
+    RERANK_MODEL: str | None = None  # local cross-encoder, e.g. cross-encoder/ms-marco-MiniLM-L-6-v2
+    RERANK_DEVICE: str = "cpu"
+    CONTEXT_MAX_TOKENS: int = 1000  # token budget of the retrieved context per prompt / tool result (0 = no limit)
+    CONTEXT_DOC_MAX_TOKENS: int = 250  # compress longer documents to their most relevant sentences (0 = never)
+    TOKENIZER_LOAD_TIMEOUT: float = 10.0  # seconds the startup warm-up waits for the tiktoken encoding (estimates meanwhile)
+    INDEX_MODE: str = "chunks"  # or "title": one document per title instead of 1000-char chunks
+    TITLE_DOC_MAX_CHARS: int = 0  # INDEX_MODE=title: truncate each title's overview (0 = full text)
+    HYBRID_SEARCH_ENABLED: bool = True  # fuse BM25 keyword hits with vector hits
+    HYBRID_CANDIDATES: int = 20  # candidates taken from each retriever before fusion
+    HYBRID_RRF_K: int = 60  # reciprocal-rank fusion constant
+    METADATA_FILTERS_ENABLED: bool = True  # pre-filter retrieval by genre/score/type/year
+    METADATA_TOP_RATED_SCORE: float = 8.0  # minimum score implied by "top-rated" questions
+    METADATA_QUESTION_GENRES: bool = False  # also require genres named (not negated) in the question
+    EMBED_BATCH_SIZE: int = 256  # chunks per embedding request during builds
+    EMBED_CONCURRENCY: int = 4  # parallel embedding requests during builds
+    EMBED_MAX_RETRIES: int = 5  # retries per batch on rate-limit / transient errors
+    INGEST_STREAMING: bool = False  # stream the raw CSV into indexing instead of writing a processed CSV
+    INGEST_CHUNK_ROWS: int = 10_000  # rows per pandas chunk when streaming
+    SIMILARITY_TOP_N: int = 20  # neighbours precomputed per title for /recommend/similar
+    SIMILARITY_BLOCK_SIZE: int = 512  # titles scored per matrix block (bounds build memory)
     RAW_CSV_PATH: str = os.path.join("data", "anime_raw.csv")
 
     # Providers
     OPENAI_API_KEY: str | None = None
 
+    # Query-embedding cache
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 4096
+    EMBEDDING_CACHE_PATH: str | None = Field(
+        default=None,
+        description="Optional SQLite file to persist query embeddings across restarts",
+    )
+
+    # Answer cache
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_MAX_ENTRIES: int = 1024
+    ANSWER_CACHE_TTL_SECONDS: float = 3600
+    ANSWER_CACHE_SIMILARITY: float = Field(
+        default=0.95,
+        description="Cosine similarity for near-duplicate cache hits (>= 1 disables them)",
+    )
+
     # Others
     RAG_MODE: str = "AGENT"  # or CHAIN
+    CHAIN_EXECUTOR: str = "direct"  # CHAIN mode runtime: direct (single model call) or agent (create_agent)
+    AGENT_MAX_MODEL_CALLS: int = 6  # per request; exceeding it answers via CHAIN (0 = no limit)
+    AGENT_MAX_TOOL_CALLS: int = 4  # per request; exceeding it answers via CHAIN (0 = no limit)
+    AGENT_TIMEOUT_SECONDS: float = 30  # per request; exceeding it answers via CHAIN (0 = no limit)
+    AGENT_SPECULATIVE_RETRIEVAL: bool = False  # retrieve for the raw question during the first model turn (an extra search when unused)
+    AGENT_SPECULATIVE_MIN_OVERLAP: float = 0.5  # keyword overlap a tool query needs to use the prefetch
+    BATCH_MAX_QUESTIONS: int = 1000  # questions accepted by one /recommend/batch request
+    BATCH_CONCURRENCY: int = 8  # default concurrent LLM generations per batch
+    WARMUP_MODES: str = Field(
+        default="AGENT,CHAIN",
+        description="Comma-separated list of RAG modes to preload at startup",
+    )
+    WARMUP_BACKGROUND: bool = True  # serve requests while the recommender loads; False = load before serving
+
+    # Observability
+    TIMING_HEADERS: bool = False  # add a per-request Server-Timing header with stage latencies
 
     # CORS
     CORS_ALLOW_ORIGINS: str = Field(
@@ -33,3 +111,15 @@ class Settings(BaseSettings):
 
     class Config:
         env_file = ".env"
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    The process-wide Settings, read from the environment / .env once.
+
+    Modules share this instance instead of each parsing the environment
+    at import. Code needing different values builds its own Settings(...)
+    or uses `get_settings().model_copy(update=...)`.
+    """
+    return Settings()
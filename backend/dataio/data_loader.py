@@ -1,5 +1,63 @@
+import hashlib
+import math
+import re
 import pandas as pd
 import os
+from typing import Iterator, Mapping
+from langchain_core.documents import Document
+
+# Only the columns ingestion needs, read as plain strings
+INGEST_DTYPES = {"Name": "string", "Genre": "string", "Synopsis": "string"}
+
+# Optional raw columns carried through as typed metadata when the CSV has them
+METADATA_COLUMNS = ["Score", "Episodes", "Type", "Aired", "Premiered", "Year"]
+
+_YEAR_RE = re.compile(r"\b(19\d\d|20\d\d)\b")
+
+
+def genre_key(genre: str) -> str:
+    """Metadata key of the boolean flag for a genre, e.g. 'Sci-Fi' -> 'genre_sci_fi'."""
+    return "genre_" + re.sub(r"[^a-z0-9]+", "_", genre.strip().lower()).strip("_")
+
+
+def _number(value, cast):
+    try:
+        number = cast(float(value))
+    except (TypeError, ValueError):
+        return None  # "Unknown", "", missing
+    return None if isinstance(number, float) and math.isnan(number) else number
+
+
+def anime_metadata(row: Mapping) -> dict:
+    """
+    Typed, filterable metadata for one catalog row.
+
+    Returns `genres` (display string) plus a `genre_<slug>: True` flag per
+    genre, and `score` (float), `episodes` (int), `type` (str) and `year`
+    (int) when the row has them. Chroma metadata can't hold lists, hence
+    one boolean flag per genre.
+    """
+    metadata: dict = {}
+    genres = [g.strip() for g in str(row.get("Genre") or "").split(",") if g.strip() and g.strip() != "nan"]
+    if genres:
+        metadata["genres"] = ", ".join(genres)
+        metadata.update({genre_key(g): True for g in genres})
+
+    score = _number(row.get("Score"), float)
+    if score is not None:
+        metadata["score"] = score
+    episodes = _number(row.get("Episodes"), int)
+    if episodes is not None:
+        metadata["episodes"] = episodes
+    kind = str(row.get("Type") or "").strip()
+    if kind and kind not in ("nan", "Unknown"):
+        metadata["type"] = kind
+    for column in ("Year", "Aired", "Premiered"):
+        match = _YEAR_RE.search(str(row.get(column) or ""))
+        if match:
+            metadata["year"] = int(match.group(1))
+            break
+    return metadata
 
 
 # create a class AnimeDataLoader with constructor that take original_csv and processed_csv as parameters
@@ -29,9 +87,12 @@ class AnimeDataLoader:
                 + " Genres: "
                 + df["Genre"].astype(str)
             )
-            # convert combined_info to CSV and save to processed_csv. Index should be False and encoding should be 'utf-8'
+            # convert Name + combined_info to CSV and save to processed_csv. Index should be False and encoding should be 'utf-8'
+            # Name is kept as metadata so each title gets a stable ID in the vector store;
+            # Genre and any optional metadata columns become typed document metadata
             processed_csv = os.path.join("data", "anime_processed.csv")
-            df[["combined_info"]].to_csv(
+            metadata_cols = [col for col in METADATA_COLUMNS if col in df.columns]
+            df[["Name", "Genre", *metadata_cols, "combined_info"]].to_csv(
                 processed_csv, index=False, encoding="utf-8"
             )
         except FileNotFoundError:
@@ -41,4 +102,59 @@ class AnimeDataLoader:
             # raise exception
             raise ValueError(f"The file {self.original_csv} is empty.")
         # return the processed csv
-        return processed_csv
\ No newline at end of file
+        return processed_csv
+
+    def iter_documents(self, chunk_rows: int = 10_000) -> Iterator[Document]:
+        """
+        Stream the raw CSV as Documents without materializing the catalog.
+
+        Reads `chunk_rows` rows at a time (only Name/Genre/Synopsis plus the
+        optional metadata columns, as strings) and yields one Document per
+        row, with the same page_content and metadata the processed-CSV path
+        produces. Peak memory is bounded by the chunk size rather than the
+        file size.
+        """
+        try:
+            reader = pd.read_csv(
+                self.original_csv,
+                encoding="utf-8",
+                on_bad_lines="skip",
+                usecols=lambda col: col in INGEST_DTYPES or col in METADATA_COLUMNS,
+                dtype="string",
+                chunksize=chunk_rows,
+            )
+        except FileNotFoundError:
+            raise FileNotFoundError(f"The file {self.original_csv} was not found.")
+        except pd.errors.EmptyDataError:
+            raise ValueError(f"The file {self.original_csv} is empty.")
+
+        row = 0
+        with reader:
+            for chunk in reader:
+                missing_cols = set(INGEST_DTYPES) - set(chunk.columns)
+                if missing_cols:
+                    missing_list = ", ".join(sorted(missing_cols))
+                    raise ValueError(
+                        f"CSV file is missing required column(s): {missing_list}"
+                    )
+                chunk = chunk.fillna("nan")
+                for record in chunk.to_dict("records"):
+                    combined_info = f"Title: {record['Name']} Overview: {record['Synopsis']} Genres: {record['Genre']}"
+                    yield Document(
+                        page_content=f"combined_info: {combined_info.strip()}",
+                        metadata={
+                            "source": self.original_csv,
+                            "row": row,
+                            "Name": record["Name"],
+                            **anime_metadata(record),
+                        },
+                    )
+                    row += 1
+
+    def fingerprint(self) -> str:
+        """Content hash of the raw CSV, used to resume interrupted streaming builds."""
+        digest = hashlib.sha256()
+        with open(self.original_csv, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
@@ -1,61 +1,62 @@
 import argparse
+import asyncio
+import json
 import logging
 import os
-import shutil
 import sys
 import time
 
-from config.settings import Settings
-from dataio.data_loader import AnimeDataLoader
-from recommender.anime_recommender import AnimeRecommender
-from utils.logger import setup_logger
-from rag.vector_store import VectorStoreBuilder
+# stdout carries the CLI's results (batch JSON lines); log to stderr unless
+# LOG_STREAM says otherwise. Set before the first logger is created.
+os.environ.setdefault("LOG_STREAM", "stderr")
+
+from config.settings import get_settings  # noqa: E402
+from utils.logger import setup_logger  # noqa: E402
 
 logger = setup_logger(__name__, level=logging.INFO)
-settings = Settings()
+settings = get_settings()
 
-
-# ---------------------------------------------------------
-# 🧹 UTILS
-# ---------------------------------------------------------
-def clear_chroma_db(chroma_path: str):
-    """Delete existing Chroma DB folder if it exists."""
-    if os.path.exists(chroma_path):
-        logger.info(f"🧹 Clearing existing Chroma DB at: {chroma_path}")
-        shutil.rmtree(chroma_path)
-        time.sleep(1)
-    else:
-        logger.debug(f"No existing Chroma DB found at {chroma_path}.")
+# VectorService / AnimeRecommender (LangChain, Chroma, pandas) are imported
+# by the commands that use them, so --help and argument errors stay instant.
 
 
 # ---------------------------------------------------------
 # 🧱 BUILD PIPELINE
 # ---------------------------------------------------------
-def build_pipeline():
+def build_pipeline(fresh: bool = False, incremental: bool = False):
     """
-    Build vector store from raw dataset.
+    Build vector store from raw dataset into a new blue/green version.
     Steps:
-      1. Clear old Chroma DB
+      1. Create a new version (or resume an interrupted build)
       2. Load & process dataset
       3. Create & persist new vector store
+      4. Precompute the per-title similarity table (/recommend/similar)
+      5. Validate and activate the new version
     """
+    from app.services.vector_service import VectorService
+
     start_time = time.time()
     logger.info("🚀 Starting vector store build pipeline...")
 
     try:
-        clear_chroma_db(settings.CHROMA_DIR)
-
-        # Load and process the dataset
-        loader = AnimeDataLoader(settings.RAW_CSV_PATH)
-        processed_file = loader.load_and_process()
-        logger.info(f"✅ Processed data saved to: {processed_file}")
-
-        # Build the vector store
-        builder = VectorStoreBuilder(processed_file, settings)
-        builder.create_vector_store()
+        stats = VectorService.build_vector_store(
+            raw_csv=settings.RAW_CSV_PATH,
+            chroma_dir=settings.CHROMA_DIR,
+            settings=settings,
+            incremental=incremental,
+            resume=not fresh,
+        )
 
         elapsed = time.time() - start_time
-        logger.info(f"✅ Vector store build completed in {elapsed:.2f}s!")
+        if incremental:
+            logger.info(
+                f"🔁 added={stats['added']} updated={stats['updated']} "
+                f"deleted={stats['deleted']} unchanged={stats['unchanged']}"
+            )
+        logger.info(
+            f"✅ Vector store build completed in {elapsed:.2f}s! "
+            f"(version {stats['version']}, {stats.get('chunks_per_second', 0)} chunks/sec)"
+        )
 
     except Exception as e:
         logger.exception(f"❌ Vector store build failed: {e}")
@@ -69,11 +70,12 @@ def run_mode(question: str, rag_mode: str):
     """
     Run the recommender in a given RAG mode (AGENT / CHAIN).
     """
-    os.environ["RAG_MODE"] = rag_mode.upper()
+    from recommender.anime_recommender import AnimeRecommender
+
     logger.info(f"=== Running {rag_mode.upper()} Mode ===")
 
     try:
-        recommender = AnimeRecommender(settings=settings)
+        recommender = AnimeRecommender(settings=settings, mode=rag_mode)
         response = recommender.recommend(question)
         logger.info("🎯 Recommendation completed successfully.")
         return response
@@ -82,6 +84,45 @@ def run_mode(question: str, rag_mode: str):
         return None
 
 
+def read_batch_file(path: str) -> list[str]:
+    """One question per line, or JSON lines with a "question" field; blank lines are skipped."""
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                line = json.loads(line)["question"]
+            questions.append(line)
+    return questions
+
+
+async def run_batch(questions: list[str], rag_mode: str, concurrency: int, output=None) -> int:
+    """
+    Answer `questions` and write one JSON line per answer, in completion order,
+    to `output` (a text file; stdout by default).
+    Returns the number of failed questions.
+    """
+    from recommender.anime_recommender import AnimeRecommender
+
+    logger.info(f"=== Running {rag_mode.upper()} Mode on {len(questions)} questions ===")
+    recommender = AnimeRecommender(settings=settings, mode=rag_mode)
+
+    failed = 0
+    start = time.perf_counter()
+    async for index, answer, error in recommender.arecommend_batch(questions, concurrency):
+        failed += error is not None
+        line = {"index": index, "question": questions[index], "mode": rag_mode, "answer": answer, "error": error}
+        print(json.dumps(line, ensure_ascii=False), file=output or sys.stdout, flush=True)
+
+    logger.info(
+        f"📦 Batch completed in {time.perf_counter() - start:.2f}s "
+        f"({len(questions) - failed} answered, {failed} failed)"
+    )
+    return failed
+
+
 # ---------------------------------------------------------
 # 🏁 ENTRY POINT
 # ---------------------------------------------------------
@@ -92,6 +133,21 @@ def main():
         action="store_true",
         help="Build the Chroma vector store and exit.",
     )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="With --build: ignore any interrupted build and start a new version.",
+    )
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Re-activate the previous vector store version and exit.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="With --build: only embed added/changed titles and delete removed ones.",
+    )
     parser.add_argument(
         "--mode",
         choices=["AGENT", "CHAIN"],
@@ -104,6 +160,23 @@ def main():
         default="Recommend anime similar to Attack on Titan with deep psychological and emotional themes.",
         help="Question to query the recommender with.",
     )
+    parser.add_argument(
+        "--batch-file",
+        type=str,
+        help="Answer every question in this file (one per line, or JSON lines with \"question\") "
+        "and write JSON lines to stdout (or --output).",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="With --batch-file: write the JSON lines to this file instead of stdout.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.BATCH_CONCURRENCY,
+        help="With --batch-file: maximum concurrent LLM generations.",
+    )
 
     args = parser.parse_args()
 
@@ -111,7 +184,26 @@ def main():
 
     if args.build:
         logger.info("[MODE] BUILD MODE")
-        build_pipeline()
+        build_pipeline(fresh=args.fresh, incremental=args.incremental)
+        return
+
+    if args.rollback:
+        from app.services.vector_service import VectorService
+
+        result = VectorService.rollback(settings)
+        logger.info(f"⏪ Active vector store version: {result['version']}")
+        return
+
+    if args.batch_file:
+        logger.info(f"[MODE] BATCH MODE ({args.mode})")
+        questions = read_batch_file(args.batch_file)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as output:
+                failed = asyncio.run(run_batch(questions, args.mode, args.concurrency, output))
+        else:
+            failed = asyncio.run(run_batch(questions, args.mode, args.concurrency))
+        if failed:
+            sys.exit(1)
         return
 
     logger.info(f"[MODE] QUERY MODE ({args.mode})")
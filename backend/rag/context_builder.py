@@ -0,0 +1,148 @@
+"""
+context_builder.py — Turns retrieved documents into the prompt context.
+
+Prompt tokens drive LLM latency and cost, so instead of concatenating
+whole chunks the builder:
+
+1. drops overview sentences already included from a higher-ranked
+   document (overlapping chunks of one title, repeated tool results)
+2. compresses documents longer than CONTEXT_DOC_MAX_TOKENS to their most
+   query-relevant sentences (keyword overlap with the question; the
+   opening sentence is always kept), preserving the title and genres
+3. stops adding documents once CONTEXT_MAX_TOKENS is reached; the first
+   document is always included, compressed to fit
+
+Each build returns the context text with its token counts, so callers can
+log per-request prompt size.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+
+from langchain_core.documents import Document
+
+from config.settings import Settings
+from rag.keyword_index import tokenize
+from rag.retrieval import format_document
+from rag.tokens import count_tokens, load_encoding
+from utils.logger import setup_logger
+from utils.metrics import timed
+
+logger = setup_logger(__name__, level=logging.INFO)
+
+# Overview text between the "... Overview:" header and the " Genres: ..." footer
+_LAYOUT_RE = re.compile(r"^(?P<head>.*?Overview:)?\s*(?P<body>.*?)\s*(?P<tail>Genres:.*)?$", re.S)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Shorter sentences ("It's great.") are too generic to treat as duplicates
+_DEDUPE_MIN_WORDS = 5
+# Below this many tokens of room, another document isn't worth including
+_MIN_DOC_TOKENS = 40
+
+
+@dataclass
+class BuiltContext:
+    """Prompt context and its size."""
+
+    text: str
+    documents: int  # documents included
+    tokens: int  # tokens of `text`
+    raw_tokens: int  # tokens the uncompressed documents would have taken
+
+    def describe(self) -> str:
+        saved = f", {self.raw_tokens - self.tokens} saved" if self.raw_tokens > self.tokens else ""
+        return f"{self.tokens} context tokens from {self.documents} documents{saved}"
+
+
+class ContextBuilder:
+    """De-duplicates, compresses and budgets retrieved documents for a prompt."""
+
+    def __init__(self, max_tokens: int = 0, doc_max_tokens: int = 0, model_name: str = "gpt-4o-mini"):
+        """
+        Args:
+            max_tokens: Token budget of the whole context (0 = no limit).
+            doc_max_tokens: Documents above this are compressed to their most
+                relevant sentences (0 = never compress).
+            model_name: Chat model whose tokenizer counts the tokens.
+        """
+        self.max_tokens = max_tokens
+        self.doc_max_tokens = doc_max_tokens
+        self.model_name = model_name
+        load_encoding(model_name)  # background; counts are estimated until it is ready
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ContextBuilder":
+        return cls(settings.CONTEXT_MAX_TOKENS, settings.CONTEXT_DOC_MAX_TOKENS, settings.MODEL_NAME)
+
+    def count(self, text: str) -> int:
+        return count_tokens(text, self.model_name)
+
+    def build(self, query: str, docs: list[Document]) -> BuiltContext:
+        """Return the context for `docs` (best first) answering `query`."""
+        with timed("context_build"):
+            return self._build(query, docs)
+
+    def _build(self, query: str, docs: list[Document]) -> BuiltContext:
+        query_terms = set(tokenize(query))
+        seen: set[str] = set()
+        parts: list[str] = []
+        used = raw = 0
+
+        for doc in docs:
+            raw += self.count(format_document(doc))
+            room = self.max_tokens - used if self.max_tokens > 0 else None
+            if parts and room is not None and room < _MIN_DOC_TOKENS:
+                continue
+
+            limit = self.doc_max_tokens or None
+            if room is not None:
+                limit = min(limit, room) if limit else room
+            content = self._compress(doc.page_content, query_terms, seen, limit)
+            if not content:
+                continue
+            text = format_document(doc, content)
+            parts.append(text)
+            used += self.count(text)
+
+        return BuiltContext(text="\n\n".join(parts), documents=len(parts), tokens=used, raw_tokens=raw)
+
+    def _compress(self, content: str, query_terms: set[str], seen: set[str], limit: int | None) -> str:
+        """Drop already-seen sentences and, above `limit` tokens, keep the most relevant ones."""
+        match = _LAYOUT_RE.match(content)
+        head, body, tail = match.group("head") or "", match.group("body") or "", match.group("tail") or ""
+
+        sentences = []
+        for sentence in filter(None, _SENTENCE_RE.split(body)):
+            key = " ".join(sentence.lower().split())
+            if len(key.split()) >= _DEDUPE_MIN_WORDS:
+                if key in seen:
+                    continue
+                seen.add(key)
+            sentences.append(sentence)
+        if body and not sentences:
+            # Nothing new in this document
+            return ""
+
+        def join(chosen: list[str]) -> str:
+            return " ".join(part for part in (head, *chosen, tail) if part)
+
+        if limit is None or self.count(join(sentences)) <= limit:
+            return join(sentences)
+
+        # Keep the opening sentence, then the sentences sharing most terms with the query
+        costs = [self.count(s) + 1 for s in sentences]
+        budget = limit - self.count(join([])) - 1
+        ranked = sorted(
+            range(len(sentences)),
+            key=lambda i: (i > 0, -len(query_terms.intersection(tokenize(sentences[i]))), i),
+        )
+        chosen = []
+        for i in ranked:
+            if costs[i] <= budget:
+                chosen.append(i)
+                budget -= costs[i]
+        chosen.sort()
+        kept = [sentences[i] for i in chosen]
+        # Mark gaps so the model doesn't read the excerpt as continuous text
+        return join(kept + ["..."] if len(kept) < len(sentences) else kept)
@@ -0,0 +1,156 @@
+"""
+embedding_cache.py — Query-embedding cache wrapped around the embedding model.
+
+`CachedEmbeddings` wraps the embedding function handed to Chroma so that
+repeated query embeddings (CHAIN middleware, AGENT tool calls, answer-cache
+lookups) are served from memory instead of another provider round-trip.
+
+Key features:
+- Keyed by (embedding model, SHA-256 of the text)
+- Bounded in-process LRU, optionally backed by a SQLite file on disk
+- Hit/miss counters and an estimate of embedding latency saved
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from config.settings import get_settings
+
+settings = get_settings()
+
+
+class EmbeddingCache:
+    """Thread-safe LRU of query embeddings with an optional SQLite spill file."""
+
+    def __init__(self, max_entries: int = 4096, path: str | None = None):
+        """
+        Args:
+            max_entries: Maximum number of embeddings kept in memory.
+            path: Optional SQLite file for persistence across restarts.
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "miss_seconds": 0.0}
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return f"{model}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> list[float] | None:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None and self._db is not None:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vector)
+            if vector is None:
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return vector.tolist()
+
+    def put(self, key: str, embedding: list[float], seconds: float) -> None:
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["miss_seconds"] += seconds
+            self._remember(key, vector)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    (key, vector.tobytes()),
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Return hit rate and the estimated embedding latency saved by hits."""
+        with self._lock:
+            hits, misses = self._stats["hits"], self._stats["misses"]
+            avg_miss = self._stats["miss_seconds"] / misses if misses else 0.0
+            return {
+                "hits": hits,
+                "misses": misses,
+                "size": len(self._entries),
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "avg_embed_seconds": round(avg_miss, 4),
+                "saved_seconds": round(hits * avg_miss, 3),
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves repeated query embeddings from an EmbeddingCache."""
+
+    def __init__(self, embeddings: Embeddings, model: str, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = cache
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        # Document embeddings are one-off during builds; don't churn the query LRU
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self.cache.key(self.model, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        embedding = self.embeddings.embed_query(text)
+        self.cache.put(key, embedding, time.perf_counter() - start)
+        return embedding
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Embed many queries, sending only the cache misses to the provider in one batch."""
+        keys = [self.cache.key(self.model, text) for text in texts]
+        embeddings = [self.cache.get(key) for key in keys]
+        misses = list(dict.fromkeys(text for text, e in zip(texts, embeddings) if e is None))
+        if misses:
+            start = time.perf_counter()
+            fresh = dict(zip(misses, self.embeddings.embed_documents(misses)))
+            seconds = (time.perf_counter() - start) / len(misses)
+            for i, embedding in enumerate(embeddings):
+                if embedding is None:
+                    embeddings[i] = fresh[texts[i]]
+                    self.cache.put(keys[i], embeddings[i], seconds)
+        return embeddings
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = self.cache.key(self.model, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        embedding = await self.embeddings.aembed_query(text)
+        self.cache.put(key, embedding, time.perf_counter() - start)
+        return embedding
+
+
+# Process-wide cache shared by every vector store handle
+embedding_cache = EmbeddingCache(
+    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+    path=settings.EMBEDDING_CACHE_PATH,
+)
@@ -0,0 +1,152 @@
+"""
+embeddings.py — Embedding provider selected by settings.
+
+Providers:
+- openai  OpenAIEmbeddings (remote; one network round-trip per call)
+- local   sentence-transformers model running on this machine (CPU by default),
+          usable offline once the model is in the HuggingFace cache
+
+The provider comes from Settings.EMBEDDING_PROVIDER, or is inferred from
+Settings.EMBEDDING_MODEL ("sentence-transformers/..." → local) when unset.
+
+The local backend encodes in batches of LOCAL_EMBED_BATCH_SIZE, can fan
+large document batches (builds) out to a pool of worker processes, and
+can run a dynamically int8-quantized copy of the model for faster CPU
+inference. `sentence-transformers` is an optional dependency, imported
+only when the local provider is used.
+"""
+
+import atexit
+import logging
+import threading
+
+from langchain_core.embeddings import Embeddings
+
+from config.settings import Settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=logging.INFO)
+
+PROVIDERS = ("openai", "local")
+
+
+def embedding_provider(settings: Settings) -> str:
+    """Return the configured provider name, inferring it from the model name if unset."""
+    provider = (settings.EMBEDDING_PROVIDER or "").strip().lower()
+    if not provider:
+        provider = "local" if settings.EMBEDDING_MODEL.startswith("sentence-transformers/") else "openai"
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown EMBEDDING_PROVIDER '{provider}'. Use one of: {', '.join(PROVIDERS)}")
+    return provider
+
+
+def get_embeddings(settings: Settings) -> Embeddings:
+    """Create the embedding model for the configured provider."""
+    provider = embedding_provider(settings)
+    if provider == "local":
+        return LocalEmbeddings(
+            model_name=settings.EMBEDDING_MODEL,
+            device=settings.LOCAL_EMBED_DEVICE,
+            batch_size=settings.LOCAL_EMBED_BATCH_SIZE,
+            processes=settings.LOCAL_EMBED_PROCESSES,
+            quantize=settings.LOCAL_EMBED_QUANTIZE,
+        )
+
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(model=settings.EMBEDDING_MODEL)
+
+
+class LocalEmbeddings(Embeddings):
+    """sentence-transformers model with batched inference and an optional multi-process pool."""
+
+    def __init__(
+        self,
+        model_name: str,
+        device: str = "cpu",
+        batch_size: int = 64,
+        processes: int = 0,
+        quantize: bool = False,
+    ):
+        """
+        Args:
+            model_name: HuggingFace model id or local path.
+            device: Torch device for in-process encoding.
+            batch_size: Texts per forward pass.
+            processes: Worker processes for document batches (builds);
+                0 or 1 encodes in-process.
+            quantize: Apply dynamic int8 quantization to the model's Linear
+                layers (CPU only).
+        """
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = max(1, batch_size)
+        self.processes = processes
+        self.quantize = quantize
+        self._model = None
+        self._pool = None
+        # Encoding already uses every core; serialize callers instead of oversubscribing
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError as e:
+                raise ImportError(
+                    "The local embedding provider needs sentence-transformers: "
+                    "pip install 'sentence-transformers>=5'"
+                ) from e
+
+            logger.info(f"📥 Loading local embedding model '{self.model_name}' on {self.device}...")
+            model = SentenceTransformer(self.model_name, device=self.device)
+            if self.quantize:
+                model = self._quantized(model)
+            self._model = model
+        return self._model
+
+    def _quantized(self, model):
+        if self.device != "cpu":
+            logger.warning("⚠️ LOCAL_EMBED_QUANTIZE only applies on CPU; using the full-precision model.")
+            return model
+        import torch
+
+        logger.info("🗜️ Quantizing Linear layers to int8 for CPU inference.")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def _start_pool(self):
+        if self._pool is None:
+            logger.info(f"🧵 Starting {self.processes} local embedding worker processes...")
+            self._pool = self.model.start_multi_process_pool(target_devices=[self.device] * self.processes)
+            atexit.register(self.close)
+        return self._pool
+
+    def close(self) -> None:
+        """Stop the worker process pool, if one was started."""
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def _encode(self, texts: list[str], pool=None) -> list[list[float]]:
+        options = {"pool": pool} if pool is not None else {}
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            **options,
+        )
+        return vectors.tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        with self._lock:
+            # Spawning work across processes only pays off for build-sized batches
+            if self.processes > 1 and len(texts) >= self.batch_size * self.processes:
+                return self._encode(texts, pool=self._start_pool())
+            return self._encode(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        with self._lock:
+            return self._encode([text])[0]
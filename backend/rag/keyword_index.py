@@ -0,0 +1,194 @@
+"""
+keyword_index.py — BM25 inverted index over the chunks of a Chroma collection.
+
+Dense search is weak on exact names ("Madhouse", "isekai", a specific
+title); this index catches them and is fused with vector hits in
+retrieval.py.
+
+On-disk layout (`keyword_index/` inside the store's version directory),
+a CSR-style postings list stored as plain .npy arrays so it can be
+memory-mapped at load instead of read into memory:
+
+    terms.npy     sorted vocabulary (fixed-width unicode)
+    offsets.npy   int64, postings of term t are [offsets[t], offsets[t + 1])
+    docs.npy      int32 chunk row of each posting
+    tfs.npy       uint16 term frequency of each posting
+    doc_lens.npy  uint16 token count of each chunk
+    ids.npy       Chroma id of each chunk row
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import time
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=logging.INFO)
+
+INDEX_DIR = "keyword_index"
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the "
+    "this to was were will with who what which when where how i me my you your we our "
+    "anime like similar recommend recommendations show shows some something".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, accent-folded alphanumeric tokens without stopwords."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return [t for t in _TOKEN_RE.findall(text) if t not in STOPWORDS]
+
+
+class KeywordIndex:
+    """Memory-mapped BM25 index returning Chroma chunk ids."""
+
+    def __init__(self, arrays: dict[str, np.ndarray], k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            arrays: The index arrays (see module docstring), in memory or memory-mapped.
+            k1: BM25 term-frequency saturation.
+            b: BM25 document-length normalization.
+        """
+        self.terms = arrays["terms"]
+        self.offsets = arrays["offsets"]
+        self.docs = arrays["docs"]
+        self.tfs = arrays["tfs"]
+        self.doc_lens = arrays["doc_lens"]
+        self.ids = arrays["ids"]
+        self.k1 = k1
+        self.b = b
+        self.avg_len = float(self.doc_lens.mean()) if len(self.doc_lens) else 0.0
+        # The vocabulary is small next to the postings; a dict makes term lookups O(1)
+        self._term_ids = {str(term): i for i, term in enumerate(self.terms)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # -----------------------------------------------------
+    # 🏗️ Build from a vector store
+    # -----------------------------------------------------
+    @classmethod
+    def build(cls, vector_store, page_size: int = 5000) -> "KeywordIndex":
+        """Tokenize every chunk stored in a Chroma store and build the postings."""
+        start = time.perf_counter()
+        collection = vector_store._collection
+        ids: list[str] = []
+        doc_lens: list[int] = []
+        postings: dict[str, list[tuple[int, int]]] = {}
+
+        offset = 0
+        while True:
+            page = collection.get(include=["documents"], limit=page_size, offset=offset)
+            if not len(page["ids"]):
+                break
+            offset += len(page["ids"])
+            for chunk_id, text in zip(page["ids"], page["documents"]):
+                row = len(ids)
+                ids.append(chunk_id)
+                counts = Counter(tokenize(text or ""))
+                doc_lens.append(sum(counts.values()))
+                for term, tf in counts.items():
+                    postings.setdefault(term, []).append((row, tf))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(postings[t]) for t in terms])
+        docs = np.empty(offsets[-1], dtype=np.int32)
+        tfs = np.empty(offsets[-1], dtype=np.uint16)
+        for i, term in enumerate(terms):
+            rows, counts = zip(*postings[term])
+            docs[offsets[i]:offsets[i + 1]] = rows
+            tfs[offsets[i]:offsets[i + 1]] = np.minimum(counts, np.iinfo(np.uint16).max)
+
+        index = cls({
+            "terms": np.array(terms, dtype=str),
+            "offsets": offsets,
+            "docs": docs,
+            "tfs": tfs,
+            "doc_lens": np.minimum(np.array(doc_lens, dtype=np.int64), np.iinfo(np.uint16).max).astype(np.uint16),
+            "ids": np.array(ids, dtype=str),
+        })
+        logger.info(
+            f"🔤 Keyword index built: {len(ids)} chunks, {len(terms)} terms, "
+            f"{len(docs)} postings in {time.perf_counter() - start:.2f}s."
+        )
+        return index
+
+    # -----------------------------------------------------
+    # 💾 Persistence
+    # -----------------------------------------------------
+    def save(self, directory: str) -> str:
+        """Write the index arrays under `directory`, replacing any previous index."""
+        path = os.path.join(directory, INDEX_DIR)
+        tmp_path = path + ".tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name in ("terms", "offsets", "docs", "tfs", "doc_lens", "ids"):
+            np.save(os.path.join(tmp_path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"chunks": len(self.ids), "terms": len(self.terms)}, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, directory: str | None) -> "KeywordIndex | None":
+        """Memory-map the index saved in a version directory, or None if it has none."""
+        path = os.path.join(directory, INDEX_DIR) if directory else None
+        if not path or not os.path.exists(os.path.join(path, "meta.json")):
+            logger.warning("⚠️ No keyword index found — rebuild the vector store to enable hybrid search.")
+            return None
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in ("terms", "offsets", "docs", "tfs", "doc_lens", "ids")
+        }
+        return cls(arrays)
+
+    # -----------------------------------------------------
+    # 🔎 BM25 search
+    # -----------------------------------------------------
+    def search(self, query: str, k: int = 20, allowed_ids: np.ndarray | None = None) -> list[tuple[str, float]]:
+        """
+        Return up to k (chunk_id, bm25_score) pairs, best first.
+
+        Args:
+            allowed_ids: Only rank these chunk ids (e.g. a metadata filter's matches).
+        """
+        rows, weights = [], []
+        n_docs = len(self.ids)
+        for term in set(tokenize(query)):
+            t = self._term_ids.get(term)
+            if t is None:
+                continue
+            lo, hi = self.offsets[t], self.offsets[t + 1]
+            docs = self.docs[lo:hi]
+            tf = self.tfs[lo:hi].astype(np.float32)
+            idf = math.log(1 + (n_docs - (hi - lo) + 0.5) / ((hi - lo) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lens[docs] / self.avg_len)
+            rows.append(docs)
+            weights.append(idf * tf * (self.k1 + 1) / (tf + norm))
+
+        if not rows:
+            return []
+        # Sum per-term contributions over the candidate docs only (not all n_docs)
+        candidates, inverse = np.unique(np.concatenate(rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weights))
+        if allowed_ids is not None:
+            keep = np.isin(self.ids[candidates], allowed_ids)
+            candidates, scores = candidates[keep], scores[keep]
+            if not len(scores):
+                return []
+        top = np.argsort(-scores)[:k] if len(scores) <= k else np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(str(self.ids[candidates[i]]), float(scores[i])) for i in top]
@@ -0,0 +1,308 @@
+"""
+metadata_index.py — Secondary index over typed chunk metadata (genre, score,
+episodes, type, year) and the filters applied before vector search.
+
+`MetadataFilter` describes constraints; `to_where()` turns it into a Chroma
+`where` clause, so Chroma narrows the candidate set before the nearest-
+neighbour search instead of the LLM filtering prose afterwards.
+
+`MetadataIndex` keeps the same fields as compact NumPy columns (one row per
+chunk, saved as `metadata_index.npz` in the version directory). It is used
+to:
+- resolve filters against the catalog (known genres/types, fields present)
+- count matches without touching Chroma, skipping empty searches
+- restrict BM25 hits to the matching chunks
+- pull simple constraints out of a free-text question for CHAIN mode
+  (genres only with METADATA_QUESTION_GENRES, skipping negated ones)
+"""
+
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from dataio.data_loader import genre_key
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=logging.INFO)
+
+INDEX_FILE = "metadata_index.npz"
+
+# Clause boundaries and negations for reading genres out of a question
+_CLAUSE_BREAK = re.compile(r"[,;:!?()]|\.(?!\d)|\b(?:but|and|just|instead|rather|though)\b")
+_NEGATION = re.compile(r"\b(?:no|not|non|without|except|excluding|other than|nothing|avoid|never|don'?t|dont)\b")
+
+
+@dataclass(frozen=True)
+class MetadataFilter:
+    """Constraints on typed metadata; unset fields don't constrain."""
+
+    genres: tuple[str, ...] = ()  # all must match
+    min_score: float | None = None
+    max_score: float | None = None
+    type: str | None = None
+    min_year: int | None = None
+    max_year: int | None = None
+    min_episodes: int | None = None
+    max_episodes: int | None = None
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, f) not in (None, ()) for f in self.__dataclass_fields__)
+
+    def describe(self) -> str:
+        return ", ".join(
+            f"{name}={value}" for name, value in vars(self).items() if value not in (None, ())
+        )
+
+    def to_where(self) -> dict | None:
+        """Chroma `where` clause for this filter (None if it is empty)."""
+        clauses: list[dict] = [{genre_key(g): True} for g in self.genres]
+        for key, op, value in (
+            ("score", "$gte", self.min_score),
+            ("score", "$lte", self.max_score),
+            ("year", "$gte", self.min_year),
+            ("year", "$lte", self.max_year),
+            ("episodes", "$gte", self.min_episodes),
+            ("episodes", "$lte", self.max_episodes),
+        ):
+            if value is not None:
+                clauses.append({key: {op: value}})
+        if self.type is not None:
+            clauses.append({"type": self.type})
+
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class MetadataIndex:
+    """Columnar typed metadata per chunk with vectorized filter evaluation."""
+
+    def __init__(self, arrays: dict[str, np.ndarray], top_rated_score: float = 8.0, question_genres: bool = False):
+        """
+        Args:
+            arrays: ids, score (NaN = unknown), episodes/year (-1 = unknown),
+                type (code, -1 = unknown), types, genre_names, genres (bool matrix).
+            top_rated_score: Minimum score implied by "top-rated" style questions.
+            question_genres: Let `filters_for` turn genre names in the question
+                into required genres (off: only explicit tool arguments filter by genre).
+        """
+        self.ids = arrays["ids"]
+        self.score = arrays["score"]
+        self.episodes = arrays["episodes"]
+        self.year = arrays["year"]
+        self.type = arrays["type"]
+        self.types = arrays["types"]
+        self.genre_names = arrays["genre_names"]
+        self.genres = arrays["genres"]
+        self.top_rated_score = top_rated_score
+        self.question_genres = question_genres
+        self._genre_col = {str(g).lower(): i for i, g in enumerate(self.genre_names)}
+        self._type_code = {str(t).lower(): i for i, t in enumerate(self.types)}
+        # Fields with no known values can't be filtered on (e.g. no Type column in the CSV)
+        self._has = {
+            "score": bool(np.isfinite(self.score).any()),
+            "episodes": bool((self.episodes >= 0).any()),
+            "year": bool((self.year >= 0).any()),
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # -----------------------------------------------------
+    # 🏗️ Build from a vector store
+    # -----------------------------------------------------
+    @classmethod
+    def build(cls, vector_store, page_size: int = 5000) -> "MetadataIndex":
+        """Read the typed metadata of every chunk stored in a Chroma store."""
+        start = time.perf_counter()
+        collection = vector_store._collection
+        ids, scores, episodes, years, types, genres = [], [], [], [], [], []
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            if not len(page["ids"]):
+                break
+            offset += len(page["ids"])
+            for chunk_id, metadata in zip(page["ids"], page["metadatas"]):
+                metadata = metadata or {}
+                ids.append(chunk_id)
+                scores.append(metadata.get("score", np.nan))
+                episodes.append(metadata.get("episodes", -1))
+                years.append(metadata.get("year", -1))
+                types.append(metadata.get("type"))
+                genres.append([g.strip() for g in metadata.get("genres", "").split(",") if g.strip()])
+
+        type_names = sorted({t for t in types if t})
+        type_code = {t: i for i, t in enumerate(type_names)}
+        genre_names = sorted({g for gs in genres for g in gs})
+        genre_col = {g: i for i, g in enumerate(genre_names)}
+        genre_matrix = np.zeros((len(ids), len(genre_names)), dtype=bool)
+        for row, gs in enumerate(genres):
+            genre_matrix[row, [genre_col[g] for g in gs]] = True
+
+        index = cls({
+            "ids": np.array(ids, dtype=str),
+            "score": np.array(scores, dtype=np.float32),
+            "episodes": np.array(episodes, dtype=np.int32),
+            "year": np.array(years, dtype=np.int32),
+            "type": np.array([type_code.get(t, -1) for t in types], dtype=np.int16),
+            "types": np.array(type_names, dtype=str),
+            "genre_names": np.array(genre_names, dtype=str),
+            "genres": genre_matrix,
+        })
+        logger.info(
+            f"🏷️ Metadata index built: {len(ids)} chunks, {len(genre_names)} genres, "
+            f"{len(type_names)} types in {time.perf_counter() - start:.2f}s."
+        )
+        return index
+
+    # -----------------------------------------------------
+    # 💾 Persistence
+    # -----------------------------------------------------
+    def save(self, directory: str) -> str:
+        path = os.path.join(directory, INDEX_FILE)
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            ids=self.ids, score=self.score, episodes=self.episodes, year=self.year,
+            type=self.type, types=self.types, genre_names=self.genre_names, genres=self.genres,
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(
+        cls, directory: str | None, top_rated_score: float = 8.0, question_genres: bool = False
+    ) -> "MetadataIndex | None":
+        """Load the index saved in a version directory, or None if it has none."""
+        path = os.path.join(directory, INDEX_FILE) if directory else None
+        if not path or not os.path.exists(path):
+            logger.warning("⚠️ No metadata index found — rebuild the vector store to enable metadata filters.")
+            return None
+        with np.load(path) as data:
+            return cls(
+                {name: data[name] for name in data.files},
+                top_rated_score=top_rated_score,
+                question_genres=question_genres,
+            )
+
+    # -----------------------------------------------------
+    # 🔎 Filtering
+    # -----------------------------------------------------
+    def resolve(self, metadata_filter: MetadataFilter) -> MetadataFilter:
+        """
+        Normalize a filter against the catalog: canonical genre/type names,
+        and constraints on unknown genres/types or absent fields dropped.
+        """
+        genres = tuple(
+            str(self.genre_names[self._genre_col[g.lower()]])
+            for g in metadata_filter.genres if g.lower() in self._genre_col
+        )
+        kind = metadata_filter.type
+        if kind is not None:
+            code = self._type_code.get(kind.lower())
+            kind = str(self.types[code]) if code is not None else None
+        resolved = replace(metadata_filter, genres=genres, type=kind)
+        for name, present in self._has.items():
+            if not present:
+                resolved = replace(resolved, **{f"min_{name}": None, f"max_{name}": None})
+        return resolved
+
+    def mask(self, metadata_filter: MetadataFilter) -> np.ndarray:
+        """Boolean mask of the chunks matching a (resolved) filter."""
+        mask = np.ones(len(self.ids), dtype=bool)
+        for g in metadata_filter.genres:
+            mask &= self.genres[:, self._genre_col[g.lower()]]
+        if metadata_filter.min_score is not None:
+            mask &= self.score >= metadata_filter.min_score
+        if metadata_filter.max_score is not None:
+            mask &= self.score <= metadata_filter.max_score
+        for column, lo, hi in (
+            (self.year, metadata_filter.min_year, metadata_filter.max_year),
+            (self.episodes, metadata_filter.min_episodes, metadata_filter.max_episodes),
+        ):
+            if lo is not None:
+                mask &= column >= lo
+            if hi is not None:
+                mask &= (column >= 0) & (column <= hi)
+        if metadata_filter.type is not None:
+            mask &= self.type == self._type_code[metadata_filter.type.lower()]
+        return mask
+
+    def matching_ids(self, metadata_filter: MetadataFilter) -> np.ndarray:
+        return self.ids[self.mask(metadata_filter)]
+
+    # -----------------------------------------------------
+    # 💬 Filters from free text
+    # -----------------------------------------------------
+    @staticmethod
+    def _affirmed_text(question: str) -> str:
+        """
+        The question with negated spans removed: from a negation ("no", "not",
+        "without", "other than", ...) to the end of its clause. "no romance
+        please, just action" -> " action ".
+        """
+        kept = []
+        for clause in _CLAUSE_BREAK.split(question.lower()):
+            negation = _NEGATION.search(clause)
+            kept.append(clause[: negation.start()] if negation else clause)
+        return " " + re.sub(r"[^a-z0-9]+", " ", " ".join(kept)) + " "
+
+    def _genres_in(self, question: str) -> tuple[str, ...]:
+        """Catalog genres named in the question outside negated spans."""
+        text = self._affirmed_text(question)
+        return tuple(
+            str(g) for g in self.genre_names
+            if f" {re.sub(r'[^a-z0-9]+', ' ', str(g).lower()).strip()} " in text
+        )
+
+    def filters_for(self, question: str) -> MetadataFilter:
+        """
+        Extract simple constraints from a question: "top-rated" or "score
+        above 8", decades/"after 2010", "movie"/"OVA"/"TV series" and, with
+        `question_genres` on, genre names that aren't negated.
+
+        Genre names in free text are often incidental ("like Cowboy Bebop but
+        without the space setting"), and a wrong genre filter hides exactly
+        the titles asked for, so they only become filters when enabled.
+        """
+        # Keep decimal points ("8.5") but drop sentence punctuation
+        text = re.sub(r"\.(?!\d)", " ", question.lower())
+        text = " " + re.sub(r"[^a-z0-9.]+", " ", text) + " "
+        genres = self._genres_in(question) if self.question_genres else ()
+
+        min_score = None
+        match = re.search(r" (?:score|scored|rated|rating) (?:of |above |over |at least )?(\d(?:\.\d+)?) ", text)
+        if match:
+            min_score = float(match.group(1))
+        elif re.search(r" (?:top|highly|highest|best) rated |top rated|acclaimed| masterpiece", text):
+            min_score = self.top_rated_score
+
+        min_year = max_year = None
+        match = re.search(r" (19|20)?(\d)0s ", text)
+        if match:
+            century = match.group(1) or ("19" if int(match.group(2)) >= 5 else "20")
+            min_year = int(f"{century}{match.group(2)}0")
+            max_year = min_year + 9
+        match = re.search(r" (?:after|since|from) ((?:19|20)\d\d) ", text)
+        if match:
+            min_year = int(match.group(1))
+        match = re.search(r" (?:before|until|pre) ((?:19|20)\d\d) ", text)
+        if match:
+            max_year = int(match.group(1))
+
+        kind = None
+        if re.search(r" (?:movie|movies|film|films) ", text):
+            kind = "Movie"
+        elif re.search(r" (?:ova|ovas) ", text):
+            kind = "OVA"
+        elif re.search(r" tv (?:series|show|shows) ", text):
+            kind = "TV"
+
+        return self.resolve(MetadataFilter(
+            genres=genres, min_score=min_score, type=kind, min_year=min_year, max_year=max_year
+        ))
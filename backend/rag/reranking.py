@@ -0,0 +1,123 @@
+"""
+reranking.py — Second-stage selection over an over-fetched candidate pool.
+
+- `mmr` picks documents that are relevant to the query but unlike the ones
+  already picked (maximal marginal relevance). It runs on the candidates'
+  stored embeddings — nothing is re-embedded — and each greedy step is a
+  single matrix-vector product over the pool.
+- `CrossEncoderReranker` scores (query, document) pairs jointly with a
+  local sentence-transformers cross-encoder. `sentence-transformers` is an
+  optional dependency, imported only when RERANK_MODEL is set.
+"""
+
+import logging
+import threading
+
+import numpy as np
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=logging.INFO)
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def cosine_relevance(query_embedding, embeddings: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each candidate embedding to the query embedding."""
+    query = _unit_rows(np.asarray(query_embedding, dtype=np.float32))
+    return _unit_rows(embeddings) @ query
+
+
+def mmr(relevance: np.ndarray, embeddings: np.ndarray, k: int, lambda_mult: float = 0.7) -> list[int]:
+    """
+    Return the indices of k candidates chosen by maximal marginal relevance.
+
+    Args:
+        relevance: Relevance of each candidate to the query, higher is better
+            (cosine similarity, or normalized re-ranker scores).
+        embeddings: Candidate embeddings, one row per candidate.
+        k: Number of candidates to select.
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0).
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    vectors = _unit_rows(np.asarray(embeddings, dtype=np.float32))
+    relevance = np.asarray(relevance, dtype=np.float32)
+
+    selected: list[int] = []
+    redundancy = np.zeros(n, dtype=np.float32)  # max similarity to anything selected so far
+    for _ in range(k):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        similarity = vectors @ vectors[best]
+        redundancy = similarity if not selected else np.maximum(redundancy, similarity)
+        selected.append(best)
+    return selected
+
+
+class CrossEncoderReranker:
+    """Local cross-encoder scoring (query, document) pairs."""
+
+    def __init__(self, model_name: str, device: str = "cpu", batch_size: int = 32):
+        """
+        Args:
+            model_name: HuggingFace model id or local path of a cross-encoder,
+                e.g. "cross-encoder/ms-marco-MiniLM-L-6-v2".
+            device: Torch device to run on.
+            batch_size: Pairs per forward pass.
+        """
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self._model = None
+        # Scoring already uses every core; serialize callers instead of oversubscribing
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            try:
+                from sentence_transformers import CrossEncoder
+            except ImportError as e:
+                raise ImportError(
+                    "RERANK_MODEL needs sentence-transformers: pip install 'sentence-transformers>=5'"
+                ) from e
+
+            logger.info(f"📥 Loading cross-encoder '{self.model_name}' on {self.device}...")
+            self._model = CrossEncoder(self.model_name, device=self.device)
+        return self._model
+
+    def score(self, query: str, texts: list[str]) -> np.ndarray:
+        """Relevance score of each text for the query (higher is better)."""
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+        with self._lock:
+            scores = self.model.predict(
+                [(query, text) for text in texts],
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+        return np.asarray(scores, dtype=np.float32)
+
+
+_rerankers: dict[tuple[str, str], CrossEncoderReranker] = {}
+_rerankers_lock = threading.Lock()
+
+
+def get_reranker(model_name: str | None, device: str = "cpu") -> CrossEncoderReranker | None:
+    """Return the shared cross-encoder for `model_name` (RERANK_MODEL; None if unset)."""
+    if not model_name:
+        return None
+    key = (model_name, device)
+    with _rerankers_lock:
+        reranker = _rerankers.get(key)
+        if reranker is None:
+            reranker = _rerankers[key] = CrossEncoderReranker(*key)
+    return reranker
@@ -0,0 +1,363 @@
+"""
+retrieval.py — Shared similarity-search helpers for the RAG chain and agent tools.
+
+Both entry points go through these helpers so the sync and async paths
+retrieve identically. The async variant awaits the embedding provider's
+native async API and only offloads the local Chroma query to a thread.
+
+When a KeywordIndex is supplied, retrieval is hybrid: BM25 and vector
+candidates are fused with reciprocal-rank fusion (RRF), so exact names
+and genres surface even when dense similarity ranks them low.
+
+Results are de-duplicated by title: chunks share the `<anime_id>-<n>` id
+prefix, and only the best-ranked chunk of each title is kept, so k=3
+returns three different shows.
+
+A MetadataFilter (genre, score, type, year, ...) is applied before the
+search: Chroma receives it as a `where` clause and BM25 only ranks the
+chunks the MetadataIndex says match. A filter nothing matches falls back
+to unfiltered retrieval rather than returning no context.
+
+Callers ask for k documents (Settings.TOP_K). With MMR or a cross-encoder
+enabled, a larger pool of RETRIEVAL_CANDIDATES distinct titles is fetched
+first and narrowed to k by re-ranking and/or MMR. Prompt-size budgeting
+happens afterwards, in context_builder.py.
+
+Pool size, MMR, re-ranking and fusion parameters come from a
+RetrievalConfig, which each recommender builds from its own Settings;
+calls without one use the process-wide settings.
+
+`search_batch` serves many queries at once (batch recommendations): one
+batched embedding call and one Chroma query per distinct filter.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from config.settings import get_settings
+from rag.embedding_cache import CachedEmbeddings
+from rag.keyword_index import KeywordIndex
+from rag.metadata_index import MetadataFilter, MetadataIndex
+from rag.reranking import cosine_relevance, get_reranker, mmr
+from utils.logger import setup_logger
+from utils.metrics import timed
+
+logger = setup_logger(__name__, level=logging.INFO)
+
+# Dense-only searches fetch this many candidates per result so duplicates can be dropped
+DEDUPE_OVERFETCH = 3
+
+
+@dataclass(frozen=True)
+class RetrievalConfig:
+    """Candidate pool, re-ranking and fusion parameters of one recommender."""
+
+    candidates: int = 12  # RETRIEVAL_CANDIDATES
+    mmr_enabled: bool = False  # MMR_ENABLED
+    mmr_lambda: float = 0.7  # MMR_LAMBDA
+    rerank_model: str | None = None  # RERANK_MODEL
+    rerank_device: str = "cpu"  # RERANK_DEVICE
+    hybrid_candidates: int = 20  # HYBRID_CANDIDATES
+    hybrid_rrf_k: int = 60  # HYBRID_RRF_K
+
+    @classmethod
+    def from_settings(cls, settings) -> "RetrievalConfig":
+        return cls(
+            candidates=settings.RETRIEVAL_CANDIDATES,
+            mmr_enabled=settings.MMR_ENABLED,
+            mmr_lambda=settings.MMR_LAMBDA,
+            rerank_model=settings.RERANK_MODEL,
+            rerank_device=settings.RERANK_DEVICE,
+            hybrid_candidates=settings.HYBRID_CANDIDATES,
+            hybrid_rrf_k=settings.HYBRID_RRF_K,
+        )
+
+
+def _config(config: RetrievalConfig | None) -> RetrievalConfig:
+    return config if config is not None else RetrievalConfig.from_settings(get_settings())
+
+
+def title_key(chunk_id: str | None) -> str | None:
+    """Title a chunk belongs to: its `<anime_id>` id prefix."""
+    return chunk_id.rsplit("-", 1)[0] if chunk_id else chunk_id
+
+
+def _distinct_titles(docs: list[Document], k: int) -> list[Document]:
+    """Keep the first (best-ranked) document of each title, up to k."""
+    seen: set = set()
+    distinct = []
+    for doc in docs:
+        key = title_key(doc.id) or id(doc)
+        if key not in seen:
+            seen.add(key)
+            distinct.append(doc)
+            if len(distinct) == k:
+                break
+    return distinct
+
+
+def _prefilter(metadata_filter: MetadataFilter | None, metadata_index: MetadataIndex | None):
+    """Return (chroma_where, allowed_chunk_ids) for a filter; (None, None) if it doesn't apply."""
+    if not metadata_filter:
+        return None, None
+    if metadata_index is None:
+        return metadata_filter.to_where(), None
+    metadata_filter = metadata_index.resolve(metadata_filter)
+    if not metadata_filter:
+        return None, None
+    allowed = metadata_index.matching_ids(metadata_filter)
+    if not len(allowed):
+        logger.info(f"[FILTERS] no titles match {metadata_filter.describe()} — searching unfiltered")
+        return None, None
+    logger.info(f"[FILTERS] {metadata_filter.describe()} -> {len(allowed)}/{len(metadata_index)} chunks")
+    return metadata_filter.to_where(), allowed
+
+
+def candidate_pool(k: int, config: RetrievalConfig | None = None) -> int:
+    """Distinct titles to retrieve before MMR / re-ranking narrow them to k."""
+    config = _config(config)
+    if config.mmr_enabled or config.rerank_model:
+        return max(k, config.candidates)
+    return k
+
+
+def search(
+    vector_store: Chroma,
+    query: str,
+    k: int = 3,
+    keyword_index: KeywordIndex | None = None,
+    metadata_filter: MetadataFilter | None = None,
+    metadata_index: MetadataIndex | None = None,
+    config: RetrievalConfig | None = None,
+) -> list[Document]:
+    """Return the top-k documents for a query (hybrid if a keyword index is given)."""
+    config = _config(config)
+    where, allowed = _prefilter(metadata_filter, metadata_index)
+    pool = candidate_pool(k, config)
+    with timed("embed_query"):
+        embedding = vector_store.embeddings.embed_query(query)
+    if keyword_index is None:
+        with timed("vector_search"):
+            docs = vector_store.similarity_search_by_vector(embedding, k=pool * DEDUPE_OVERFETCH, filter=where)
+        candidates = _distinct_titles(docs, pool)
+    else:
+        fetch = max(pool, config.hybrid_candidates)
+        with timed("vector_search"):
+            dense = vector_store.similarity_search_by_vector(embedding, k=fetch, filter=where)
+        with timed("keyword_search"):
+            keyword_hits = keyword_index.search(query, fetch, allowed)
+        candidates = _fuse(vector_store, dense, keyword_hits, pool, config.hybrid_rrf_k)
+    return _select(vector_store, query, embedding, candidates, k, config)
+
+
+async def asearch(
+    vector_store: Chroma,
+    query: str,
+    k: int = 3,
+    keyword_index: KeywordIndex | None = None,
+    metadata_filter: MetadataFilter | None = None,
+    metadata_index: MetadataIndex | None = None,
+    config: RetrievalConfig | None = None,
+) -> list[Document]:
+    """Async variant of `search` that never blocks the event loop on I/O."""
+    config = _config(config)
+    where, allowed = _prefilter(metadata_filter, metadata_index)
+    pool = candidate_pool(k, config)
+    if keyword_index is None:
+        with timed("embed_query"):
+            embedding = await vector_store.embeddings.aembed_query(query)
+        with timed("vector_search"):
+            docs = await asyncio.to_thread(
+                vector_store.similarity_search_by_vector, embedding, k=pool * DEDUPE_OVERFETCH, filter=where
+            )
+        candidates = _distinct_titles(docs, pool)
+    else:
+        fetch = max(pool, config.hybrid_candidates)
+
+        async def dense() -> tuple[list[float], list[Document]]:
+            with timed("embed_query"):
+                embedding = await vector_store.embeddings.aembed_query(query)
+            with timed("vector_search"):
+                docs = await asyncio.to_thread(
+                    vector_store.similarity_search_by_vector, embedding, k=fetch, filter=where
+                )
+            return embedding, docs
+
+        def keyword() -> list:
+            with timed("keyword_search"):
+                return keyword_index.search(query, fetch, allowed)
+
+        # BM25 runs while the query embedding is in flight
+        (embedding, dense_docs), keyword_hits = await asyncio.gather(dense(), asyncio.to_thread(keyword))
+        candidates = await asyncio.to_thread(
+            _fuse, vector_store, dense_docs, keyword_hits, pool, config.hybrid_rrf_k
+        )
+
+    if pool > k or config.rerank_model:
+        # Cross-encoder inference and the embedding lookup are CPU/disk bound
+        return await asyncio.to_thread(_select, vector_store, query, embedding, candidates, k, config)
+    return _select(vector_store, query, embedding, candidates, k, config)
+
+
+def embed_queries(vector_store: Chroma, queries: list[str]) -> list[list[float]]:
+    """Embed many queries with one provider call (through the query cache when enabled)."""
+    embeddings = vector_store.embeddings
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.embed_queries(queries)
+    return embeddings.embed_documents(queries)
+
+
+def search_batch(
+    vector_store: Chroma,
+    queries: list[str],
+    k: int = 3,
+    keyword_index: KeywordIndex | None = None,
+    metadata_filters: list[MetadataFilter | None] | None = None,
+    metadata_index: MetadataIndex | None = None,
+    config: RetrievalConfig | None = None,
+) -> list[list[Document]]:
+    """
+    `search` for many queries at once: the queries are embedded in one
+    batched call and queries sharing a metadata filter go to Chroma as a
+    single multi-vector query. Returns one result list per query.
+    """
+    if not queries:
+        return []
+    config = _config(config)
+    filters = metadata_filters or [None] * len(queries)
+    prefiltered = [_prefilter(f, metadata_index) for f in filters]
+    with timed("embed_query"):
+        embeddings = embed_queries(vector_store, queries)
+    pool = candidate_pool(k, config)
+    fetch = pool * DEDUPE_OVERFETCH if keyword_index is None else max(pool, config.hybrid_candidates)
+
+    groups: dict[str, list[int]] = {}
+    for i, (where, _) in enumerate(prefiltered):
+        groups.setdefault(json.dumps(where, sort_keys=True), []).append(i)
+
+    dense: list[list[Document]] = [[] for _ in queries]
+    for rows in groups.values():
+        with timed("vector_search"):
+            result = vector_store._collection.query(
+                query_embeddings=[embeddings[i] for i in rows],
+                n_results=fetch,
+                where=prefiltered[rows[0]][0],
+                include=["documents", "metadatas"],
+            )
+        for j, i in enumerate(rows):
+            dense[i] = [
+                Document(id=chunk_id, page_content=text or "", metadata=metadata or {})
+                for chunk_id, text, metadata in zip(result["ids"][j], result["documents"][j], result["metadatas"][j])
+            ]
+
+    results = []
+    for query, embedding, docs, (_, allowed) in zip(queries, embeddings, dense, prefiltered):
+        if keyword_index is None:
+            candidates = _distinct_titles(docs, pool)
+        else:
+            keyword_hits = keyword_index.search(query, fetch, allowed)
+            candidates = _fuse(vector_store, docs, keyword_hits, pool, config.hybrid_rrf_k)
+        results.append(_select(vector_store, query, embedding, candidates, k, config))
+    return results
+
+
+def format_document(doc: Document, content: str | None = None) -> str:
+    """Render one document for the LLM, appending its typed metadata."""
+    metadata = doc.metadata or {}
+    content = doc.page_content if content is None else content
+    facts = [
+        f"{label}: {metadata[key]}"
+        for key, label in (("score", "Score"), ("type", "Type"), ("episodes", "Episodes"), ("year", "Year"))
+        if metadata.get(key) is not None
+    ]
+    return f"{content}\n({' | '.join(facts)})" if facts else content
+
+
+def format_context(docs: list[Document]) -> str:
+    """Join retrieved chunks for the LLM, appending each title's typed metadata."""
+    return "\n\n".join(format_document(doc) for doc in docs)
+
+
+def _fuse(
+    vector_store: Chroma, dense: list[Document], keyword_hits: list[tuple[str, float]], k: int, rrf_k: int = 60
+) -> list[Document]:
+    """Reciprocal-rank fusion of dense and BM25 rankings; returns the top-k distinct titles."""
+    scores: dict[str, float] = {}
+    for ranking in ([d.id for d in dense], [chunk_id for chunk_id, _ in keyword_hits]):
+        for rank, chunk_id in enumerate(ranking):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (rrf_k + rank + 1)
+
+    top, seen = [], set()
+    for chunk_id in sorted(scores, key=scores.get, reverse=True):
+        if title_key(chunk_id) not in seen:
+            seen.add(title_key(chunk_id))
+            top.append(chunk_id)
+            if len(top) == k:
+                break
+
+    # Keyword-only hits still need their text from Chroma
+    docs = {d.id: d for d in dense}
+    missing = [chunk_id for chunk_id in top if chunk_id not in docs]
+    if missing:
+        docs.update((d.id, d) for d in vector_store.get_by_ids(missing))
+    return [docs[chunk_id] for chunk_id in top if chunk_id in docs]
+
+
+# -----------------------------------------------------
+# 🎯 Candidate selection
+# -----------------------------------------------------
+def _select(
+    vector_store: Chroma, query: str, query_embedding, candidates: list[Document], k: int, config: RetrievalConfig
+) -> list[Document]:
+    """Narrow candidates to k with the cross-encoder and/or MMR."""
+    reranker = get_reranker(config.rerank_model, config.rerank_device)
+    if (reranker is None or len(candidates) < 2) and not (config.mmr_enabled and len(candidates) > k):
+        return candidates[:k]
+    with timed("rerank"):
+        return _rerank(vector_store, query, query_embedding, candidates, k, reranker, config)
+
+
+def _rerank(
+    vector_store: Chroma,
+    query: str,
+    query_embedding,
+    candidates: list[Document],
+    k: int,
+    reranker,
+    config: RetrievalConfig,
+):
+    relevance = None
+    if reranker is not None and len(candidates) > 1:
+        scores = reranker.score(query, [d.page_content for d in candidates])
+        order = np.argsort(-scores, kind="stable")
+        candidates = [candidates[i] for i in order]
+        relevance = scores[order]
+
+    if config.mmr_enabled and len(candidates) > k:
+        embeddings = _stored_embeddings(vector_store, candidates)
+        if relevance is None:
+            relevance = cosine_relevance(query_embedding, embeddings)
+        else:
+            # Put cross-encoder logits on the same 0..1 scale as cosine similarity
+            spread = relevance.max() - relevance.min()
+            relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones_like(relevance)
+        candidates = [candidates[i] for i in mmr(relevance, embeddings, k, config.mmr_lambda)]
+
+    return candidates[:k]
+
+
+def _stored_embeddings(vector_store: Chroma, docs: list[Document]) -> np.ndarray:
+    """Embeddings Chroma already holds for the given documents (one row each)."""
+    stored = vector_store._collection.get(ids=[d.id for d in docs], include=["embeddings"])
+    by_id = dict(zip(stored["ids"], stored["embeddings"]))
+    dim = len(next(iter(by_id.values()))) if by_id else 1
+    return np.array(
+        [by_id[d.id] if d.id in by_id else np.zeros(dim) for d in docs], dtype=np.float32
+    )
+
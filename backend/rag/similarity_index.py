@@ -0,0 +1,176 @@
+"""
+similarity_index.py — Precomputed "titles similar to X" table.
+
+Built from the embeddings already stored in a Chroma collection, so it
+costs no extra embedding calls:
+
+1. Each title is represented by the normalized mean of its chunk vectors.
+2. Cosine top-N neighbours are computed with blocked matrix products
+   (block_size × n_titles scores at a time, bounding memory).
+3. The neighbour table and a normalized-title lookup are saved as
+   `similarity_index.npz` inside the store's version directory, so it
+   follows the blue/green version it was built from.
+
+Lookups are a dict hit plus an array slice — no LLM and no embedding call.
+"""
+
+import difflib
+import logging
+import os
+import re
+import time
+import unicodedata
+
+import numpy as np
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=logging.INFO)
+
+INDEX_FILE = "similarity_index.npz"
+
+
+def normalize_title(title: str) -> str:
+    """Case-, accent- and punctuation-insensitive form of a title for lookups."""
+    title = unicodedata.normalize("NFKD", title).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", " ", title.casefold()).strip()
+
+
+class SimilarityIndex:
+    """Top-N nearest titles per title, with a title lookup index."""
+
+    def __init__(self, titles: np.ndarray, neighbours: np.ndarray, scores: np.ndarray):
+        """
+        Args:
+            titles: Title names, one per row.
+            neighbours: (n_titles, top_n) row indices of the nearest titles, best first.
+            scores: (n_titles, top_n) cosine similarities matching `neighbours`.
+        """
+        self.titles = titles
+        self.neighbours = neighbours
+        self.scores = scores
+        self._lookup = {normalize_title(str(t)): i for i, t in enumerate(titles)}
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    # -----------------------------------------------------
+    # 🏗️ Build from a vector store
+    # -----------------------------------------------------
+    @classmethod
+    def build(cls, vector_store, top_n: int = 20, block_size: int = 512, page_size: int = 5000) -> "SimilarityIndex":
+        """
+        Compute the neighbour table from a Chroma store's stored embeddings.
+
+        Args:
+            vector_store: Chroma store whose chunks carry a "Name" metadata field.
+            top_n: Neighbours kept per title.
+            block_size: Titles scored per matrix product (memory ≈ block_size × n_titles × 4 bytes).
+            page_size: Chunks read from Chroma per request.
+        """
+        start = time.perf_counter()
+        titles, vectors = cls._title_vectors(vector_store._collection, page_size)
+        n = len(titles)
+        k = min(top_n, n - 1)
+        neighbours = np.empty((n, max(k, 0)), dtype=np.int32)
+        scores = np.empty((n, max(k, 0)), dtype=np.float32)
+
+        if k > 0:
+            for lo in range(0, n, block_size):
+                hi = min(lo + block_size, n)
+                sims = vectors[lo:hi] @ vectors.T
+                # A title is not similar to itself
+                sims[np.arange(hi - lo), np.arange(lo, hi)] = -np.inf
+                top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+                top_scores = np.take_along_axis(sims, top, axis=1)
+                order = np.argsort(-top_scores, axis=1)
+                neighbours[lo:hi] = np.take_along_axis(top, order, axis=1)
+                scores[lo:hi] = np.take_along_axis(top_scores, order, axis=1)
+
+        logger.info(
+            f"🧭 Similarity index built for {n} titles (top {k}) in {time.perf_counter() - start:.2f}s."
+        )
+        return cls(np.array(titles, dtype=str), neighbours, scores)
+
+    @staticmethod
+    def _title_vectors(collection, page_size: int) -> tuple[list[str], np.ndarray]:
+        """Return title names and the normalized mean chunk vector of each title."""
+        titles: list[str] = []
+        rows: dict[str, int] = {}
+        sums = None
+        offset = 0
+        while True:
+            page = collection.get(include=["embeddings", "metadatas"], limit=page_size, offset=offset)
+            if not len(page["ids"]):
+                break
+            offset += len(page["ids"])
+
+            embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+            index = np.empty(len(embeddings), dtype=np.int64)
+            for i, metadata in enumerate(page["metadatas"]):
+                title = (metadata or {}).get("Name") or ""
+                if title not in rows:
+                    rows[title] = len(titles)
+                    titles.append(title)
+                index[i] = rows[title]
+
+            if sums is None:
+                sums = np.zeros((max(len(titles), 1024), embeddings.shape[1]), dtype=np.float32)
+            elif len(titles) > len(sums):
+                # Grow geometrically so the copy cost stays linear overall
+                grown = np.zeros((max(len(titles), 2 * len(sums)), sums.shape[1]), dtype=np.float32)
+                grown[:len(sums)] = sums
+                sums = grown
+            np.add.at(sums, index, embeddings)
+
+        if sums is None:
+            raise RuntimeError("Cannot build a similarity index from an empty vector store.")
+        vectors = sums[:len(titles)]
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return titles, vectors
+
+    # -----------------------------------------------------
+    # 💾 Persistence
+    # -----------------------------------------------------
+    def save(self, directory: str) -> str:
+        path = os.path.join(directory, INDEX_FILE)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, titles=self.titles, neighbours=self.neighbours, scores=self.scores)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, directory: str | None) -> "SimilarityIndex | None":
+        """Load the index saved in a version directory, or None if it has none."""
+        path = os.path.join(directory, INDEX_FILE) if directory else None
+        if not path or not os.path.exists(path):
+            logger.warning("⚠️ No similarity index found — rebuild the vector store to enable similar-title lookups.")
+            return None
+        with np.load(path) as data:
+            return cls(data["titles"], data["neighbours"], data["scores"])
+
+    # -----------------------------------------------------
+    # 🔎 Lookups
+    # -----------------------------------------------------
+    def find(self, title: str) -> int | None:
+        """Row of the title best matching `title` (exact after normalization, else fuzzy)."""
+        key = normalize_title(title)
+        row = self._lookup.get(key)
+        if row is None and key:
+            close = difflib.get_close_matches(key, self._lookup.keys(), n=1, cutoff=0.8)
+            row = self._lookup[close[0]] if close else None
+        return row
+
+    def similar(self, title: str, k: int = 10) -> tuple[str, list[tuple[str, float]]] | None:
+        """
+        Return (matched_title, [(similar_title, score), ...]) best first,
+        or None if no title matches.
+        """
+        row = self.find(title)
+        if row is None:
+            return None
+        matches = [
+            (str(self.titles[j]), round(float(s), 4))
+            for j, s in zip(self.neighbours[row, :k], self.scores[row, :k])
+        ]
+        return str(self.titles[row]), matches
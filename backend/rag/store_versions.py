@@ -0,0 +1,131 @@
+"""
+store_versions.py — Blue/green versioning of the Chroma persist directory.
+
+Layout under Settings.CHROMA_DIR:
+    active.json              pointer: {"current": "...", "previous": "..."}
+    versions/<version>/      one self-contained Chroma directory per build
+
+Builds write into a fresh version directory, which only becomes live once
+the pointer is atomically replaced. The previous version is kept so the
+pointer can be flipped back instantly. A pre-versioning store living
+directly in CHROMA_DIR is treated as version ".".
+"""
+
+import json
+import os
+import shutil
+import time
+
+POINTER_FILE = "active.json"
+VERSIONS_DIR = "versions"
+LEGACY_VERSION = "."
+
+
+class StoreVersions:
+    """Manages versioned Chroma directories and the active-version pointer."""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Settings.CHROMA_DIR — the directory holding all versions.
+        """
+        self.root = root
+
+    @property
+    def pointer_path(self) -> str:
+        return os.path.join(self.root, POINTER_FILE)
+
+    def path(self, version: str) -> str:
+        """Return the persist directory of a version."""
+        if version == LEGACY_VERSION:
+            return self.root
+        return os.path.join(self.root, VERSIONS_DIR, version)
+
+    def _read_pointer(self) -> dict:
+        if os.path.exists(self.pointer_path):
+            with open(self.pointer_path, encoding="utf-8") as f:
+                return json.load(f)
+        if os.path.exists(os.path.join(self.root, "chroma.sqlite3")):
+            return {"current": LEGACY_VERSION, "previous": None}
+        return {"current": None, "previous": None}
+
+    def current(self) -> str | None:
+        """Name of the live version, or None if nothing has been built yet."""
+        return self._read_pointer()["current"]
+
+    def previous(self) -> str | None:
+        """Name of the version that was live before the current one."""
+        return self._read_pointer().get("previous")
+
+    def current_dir(self) -> str | None:
+        version = self.current()
+        return self.path(version) if version else None
+
+    def versions(self) -> list[str]:
+        """All version directories on disk, oldest first."""
+        versions_root = os.path.join(self.root, VERSIONS_DIR)
+        if not os.path.isdir(versions_root):
+            return []
+        return sorted(os.listdir(versions_root))
+
+    # -----------------------------------------------------
+    # 🏗️ Creating and switching versions
+    # -----------------------------------------------------
+    def create(self, copy_current: bool = False) -> str:
+        """
+        Create a new, not-yet-active version directory.
+
+        Args:
+            copy_current: Seed it with a copy of the live version (for
+                incremental builds); otherwise it starts empty.
+        """
+        # Timestamp with microseconds so names sort in creation order
+        version = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() // 1000 % 1_000_000:06d}"
+        target = self.path(version)
+        current_dir = self.current_dir()
+        if copy_current and current_dir:
+            # Only copy Chroma's own files (the legacy root also holds versions/)
+            shutil.copytree(
+                current_dir, target,
+                ignore=shutil.ignore_patterns(VERSIONS_DIR, POINTER_FILE),
+            )
+        else:
+            os.makedirs(target)
+        return version
+
+    def pending(self, marker: str) -> str | None:
+        """Newest inactive version containing `marker` (e.g. a build checkpoint)."""
+        current = self.current()
+        for version in reversed(self.versions()):
+            if version != current and os.path.exists(os.path.join(self.path(version), marker)):
+                return version
+        return None
+
+    def activate(self, version: str) -> None:
+        """Atomically make `version` live, remembering the old one as previous."""
+        pointer = {"current": version, "previous": self.current()}
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.pointer_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(pointer, f)
+        os.replace(tmp_path, self.pointer_path)
+
+    def rollback(self) -> str:
+        """Swap current and previous versions; returns the new live version."""
+        previous = self.previous()
+        if not previous or not os.path.isdir(self.path(previous)):
+            raise FileNotFoundError("No previous vector store version to roll back to.")
+        self.activate(previous)
+        return previous
+
+    def discard(self, version: str) -> None:
+        """Delete an inactive version directory."""
+        if version not in (self.current(), self.previous(), LEGACY_VERSION):
+            shutil.rmtree(self.path(version), ignore_errors=True)
+
+    def prune(self, keep: str | None = None) -> None:
+        """Delete every version except current, previous and `keep`."""
+        live = {self.current(), self.previous(), keep}
+        for version in self.versions():
+            if version not in live:
+                shutil.rmtree(self.path(version), ignore_errors=True)
@@ -0,0 +1,71 @@
+"""
+tokens.py — Token counting for prompt budgets.
+
+Uses the chat model's tiktoken encoding (tiktoken ships with
+langchain-openai). tiktoken downloads the BPE file on first use, with no
+timeout, so encodings are never loaded on the request path: the startup
+warm-up (and each new ContextBuilder) starts loading them on a background
+thread, and until an encoding is ready — or if it is unavailable: unknown
+model, offline host without a TIKTOKEN_CACHE_DIR copy — counts fall back
+to an estimate of 4 characters per token.
+"""
+
+import logging
+import threading
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=logging.INFO)
+
+CHARS_PER_TOKEN = 4
+
+# model name -> encoding (None = unavailable, estimate)
+_encodings: dict[str, object | None] = {}
+_loaders: dict[str, threading.Thread] = {}
+_lock = threading.Lock()
+
+
+def _load(model_name: str) -> None:
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"⚠️ No tiktoken encoding for '{model_name}' ({type(e).__name__}) — estimating tokens.")
+        encoding = None
+    with _lock:
+        _encodings[model_name] = encoding
+
+
+def load_encoding(model_name: str, timeout: float | None = 0.0):
+    """
+    Start loading `model_name`'s encoding in the background (once) and wait
+    up to `timeout` seconds for it (None = until loaded).
+
+    Returns the encoding, or None while it is still loading or unavailable.
+    """
+    with _lock:
+        if model_name in _encodings:
+            return _encodings[model_name]
+        loader = _loaders.get(model_name)
+        if loader is None:
+            loader = threading.Thread(target=_load, args=(model_name,), name="tiktoken-load", daemon=True)
+            _loaders[model_name] = loader
+            loader.start()
+    loader.join(timeout)
+    return _encodings.get(model_name)
+
+
+def count_tokens(text: str, model_name: str = "gpt-4o-mini") -> int:
+    """Number of tokens `text` takes in a prompt for `model_name` (estimated until its encoding is loaded)."""
+    if not text:
+        return 0
+    encoding = _encodings.get(model_name)
+    if encoding is None:
+        if model_name not in _encodings:
+            load_encoding(model_name)  # don't wait; later counts use it
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
@@ -2,98 +2,510 @@
 VectorStoreBuilder — builds and loads a Chroma vector database for RAG.
 
 Key features:
-- Uses OpenAIEmbeddings ('text-embedding-3-large') or HuggingFace transformer
+- Uses OpenAIEmbeddings ('text-embedding-3-large') or a local sentence-transformers
+  model, selected by settings (see embeddings.py)
 - Accepts config from Settings (paths, collection name, etc.)
+- Query embeddings served from a shared cache (see embedding_cache.py)
 - Structured logging and clear error handling
-- Uses CharacterTextSplitter for chunking
+- Uses CharacterTextSplitter for chunking, or one document per title
+  (INDEX_MODE="title", optionally truncated)
+- Batched, parallel, resumable embedding with rate-limit backoff
+- Stable per-title IDs enabling incremental (delta) re-indexing
+- Reads the active blue/green version (see store_versions.py)
+- Builds a BM25 keyword index next to the collection (see keyword_index.py)
+- Carries genre/score/episodes/type/year as typed metadata, with a
+  secondary index for pre-filtered search (see metadata_index.py)
 """
 
+import csv
+import hashlib
+import json
 import os
 import logging
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from itertools import batched
+from typing import Iterable, Iterator
 from dotenv import load_dotenv
 from langchain_community.document_loaders.csv_loader import CSVLoader
 from langchain_text_splitters import CharacterTextSplitter
 from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
-from config.settings import Settings
+from langchain_core.documents import Document
+from config.settings import Settings, get_settings
+from dataio.data_loader import anime_metadata
+from rag.embedding_cache import CachedEmbeddings, embedding_cache
+from rag.embeddings import get_embeddings
+from rag.keyword_index import KeywordIndex
+from rag.metadata_index import MetadataIndex
+from rag.store_versions import StoreVersions
 from utils.logger import setup_logger
+from utils.metrics import timed
 
 # Load environment variables early
 load_dotenv()
 
 logger = setup_logger(__name__, level=logging.INFO)
-settings = Settings()
+settings = get_settings()
+
+CHECKPOINT_FILE = ".build_checkpoint.json"
+
+
+def _retry_after(error: Exception) -> float | None:
+    """Return the server-suggested delay (Retry-After header) for rate-limit errors, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class BuildCancelled(Exception):
+    """Raised inside a build when its BuildProgress has been cancelled."""
+
+
+class BuildProgress:
+    """
+    Receives phase and progress updates from a build.
+
+    The default implementation is a no-op; background build jobs subclass
+    it to publish status and set `cancelled` to stop a build between batches.
+    """
+
+    cancelled: bool = False
+
+    def phase(self, name: str) -> None:
+        """Called when the build enters a phase (loading, splitting, embedding, similarity, persisting)."""
+
+    def advance(self, done: int, total: int) -> None:
+        """Called after each embedded batch with chunk counts."""
+
+    def check_cancelled(self) -> None:
+        if self.cancelled:
+            raise BuildCancelled("Build cancelled.")
 
 
 class VectorStoreBuilder:
     """Handles creating and loading a Chroma vector store from processed CSV data."""
 
-    def __init__(self, processed_csv: str, settings: Settings = settings):
+    def __init__(
+        self,
+        processed_csv: str,
+        settings: Settings = settings,
+        persist_directory: str | None = None,
+        progress: "BuildProgress | None" = None,
+    ):
         """
         Args:
             processed_csv: Path to processed CSV file.
             settings: Global Settings instance.
+            persist_directory: Chroma directory to use; defaults to the
+                active version under settings.CHROMA_DIR.
+            progress: Receives build phase/progress updates and can cancel the build.
         """
         self.processed_csv = processed_csv
         self.settings = settings
-        self.persist_directory = settings.CHROMA_DIR
+        self.persist_directory = persist_directory or StoreVersions(settings.CHROMA_DIR).current_dir()
         self.collection_name = settings.CHROMA_COLLECTION
+        self.build_stats: dict = {}
+        self.progress = progress or BuildProgress()
 
-        # ✅ Use correct argument (Pydantic v2 + LangChain 1.0 compatible)
-        self.embedding = OpenAIEmbeddings(
-            model=settings.EMBEDDING_MODEL  # <— previously model_name
-        )
+        # OpenAI or local sentence-transformers, per EMBEDDING_PROVIDER
+        self.embedding = get_embeddings(settings)
+
+        # Serve repeated query embeddings from the shared in-process cache
+        if settings.EMBEDDING_CACHE_ENABLED:
+            self.embedding = CachedEmbeddings(
+                self.embedding, settings.EMBEDDING_MODEL, embedding_cache
+            )
 
     # -----------------------------------------------------
     # 🧠 Create vector store from CSV
     # -----------------------------------------------------
-    def create_vector_store(self) -> Chroma:
-        """Load CSV, split into chunks, embed, and persist to Chroma."""
+    def create_vector_store(
+        self,
+        incremental: bool = False,
+        documents: Iterable[Document] | None = None,
+        fingerprint: str | None = None,
+    ) -> Chroma:
+        """
+        Load CSV, split into chunks, embed, and persist to Chroma, then
+        build the BM25 keyword and typed-metadata indexes over the
+        resulting collection.
+
+        Args:
+            incremental: Only embed added/changed titles and delete removed
+                ones, diffing against what is already in the collection.
+            documents: Optional document stream (e.g. AnimeDataLoader.iter_documents)
+                used instead of loading the processed CSV; consumed lazily so
+                memory stays bounded by the embedding batch size.
+            fingerprint: Identifies the streamed input for checkpoint/resume.
+        """
         try:
-            if not os.path.exists(self.processed_csv):
-                raise FileNotFoundError(f"CSV file not found: {self.processed_csv}")
-
-            logger.info(f"📄 Loading CSV from {self.processed_csv}...")
-            loader = CSVLoader(
-                file_path=self.processed_csv,
-                encoding="utf-8",
-                metadata_columns=[],
-            )
-            documents = loader.load()
-            logger.info(f"✅ Loaded {len(documents)} documents.")
+            with timed("build_total"):
+                if documents is None:
+                    chunks = self.load_chunks()
+                else:
+                    chunks = self.iter_chunks(documents)
 
-            # Split into overlapping chunks
-            logger.info("✂️ Splitting documents (chunk_size=1000, overlap=200)...")
-            splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-            chunks = splitter.split_documents(documents)
-            logger.info(f"✅ Created {len(chunks)} text chunks.")
+                if incremental:
+                    vector_store = self._update_incrementally(chunks)
+                else:
+                    # Embed in batches and persist to Chroma (resumable)
+                    if fingerprint is not None:
+                        fingerprint = f"{fingerprint}:{self.layout}"
+                    vector_store = self.index_documents(chunks, fingerprint=fingerprint)
 
-            # Create and persist Chroma DB
-            logger.info("🧠 Creating Chroma vector store...")
-            vector_store = Chroma.from_documents(
-                collection_name=self.collection_name,
-                documents=chunks,
-                embedding=self.embedding,
-                persist_directory=self.persist_directory,
-            )
-            logger.info(
-                f"✅ Vector store created and persisted at '{self.persist_directory}' "
-                f"(collection: {self.collection_name})"
-            )
+                # Index what was actually stored, so incremental and resumed builds are covered too
+                with timed("build_indexes"):
+                    KeywordIndex.build(vector_store).save(self.persist_directory)
+                    MetadataIndex.build(vector_store).save(self.persist_directory)
+                logger.info(
+                    f"✅ Vector store created and persisted at '{self.persist_directory}' "
+                    f"(collection: {self.collection_name})"
+                )
 
-            return vector_store
+                return vector_store
 
+        except BuildCancelled:
+            raise
         except Exception as e:
             logger.exception(f"❌ Vector store build failed: {e}")
             raise
 
+    def load_documents(self) -> list[Document]:
+        """Load every row of the processed CSV as a Document with typed metadata."""
+        if not os.path.exists(self.processed_csv):
+            raise FileNotFoundError(f"CSV file not found: {self.processed_csv}")
+
+        self.progress.phase("loading")
+        logger.info(f"📄 Loading CSV from {self.processed_csv}...")
+        with open(self.processed_csv, encoding="utf-8", newline="") as f:
+            header = next(csv.reader(f), [])
+        loader = CSVLoader(
+            file_path=self.processed_csv,
+            encoding="utf-8",
+            # Everything but combined_info is metadata (Name, Genre, Score, ...)
+            metadata_columns=[col for col in header if col != "combined_info"],
+        )
+        with timed("build_load"):
+            documents = loader.load()
+        for doc in documents:
+            raw = doc.metadata
+            doc.metadata = {
+                "source": raw["source"], "row": raw["row"], "Name": raw.get("Name", ""), **anime_metadata(raw)
+            }
+        logger.info(f"✅ Loaded {len(documents)} documents.")
+        return documents
+
+    @property
+    def layout(self) -> str:
+        """How titles are cut into indexed documents; part of every content hash."""
+        if self.settings.INDEX_MODE.lower() == "title":
+            return f"title:{self.settings.TITLE_DOC_MAX_CHARS}"
+        return "chunks:1000:200"
+
+    @staticmethod
+    def _truncate(text: str, max_chars: int) -> str:
+        """Shorten the overview at a sentence boundary, keeping the title and genres."""
+        if max_chars <= 0 or len(text) <= max_chars:
+            return text
+        head, sep, genres = text.rpartition(" Genres: ")
+        if not sep:
+            head, genres = text, ""
+        budget = max(0, max_chars - len(sep) - len(genres))
+        cut = head[:budget]
+        sentence_end = cut.rfind(". ")
+        if sentence_end > budget // 2:
+            cut = cut[:sentence_end + 1]
+        return f"{cut.rstrip()}{sep}{genres}"
+
+    def iter_chunks(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """
+        Split documents into chunks with stable IDs, one document at a time.
+
+        Each title gets an `anime_id` derived from its name and a
+        `content_hash` of its text, typed metadata and layout (so a score
+        change or an INDEX_MODE switch is picked up by incremental builds);
+        chunk IDs are `<anime_id>-<n>`, so the same catalog row always maps
+        to the same Chroma IDs. With INDEX_MODE="title" every title yields
+        exactly one document, `<anime_id>-0`, truncated to
+        TITLE_DOC_MAX_CHARS if set.
+        """
+        splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+        per_title = self.settings.INDEX_MODE.lower() == "title"
+        layout = self.layout
+
+        seen: dict[str, int] = {}
+        for doc in documents:
+            anime_id = hashlib.sha1(doc.metadata.get("Name", "").encode("utf-8")).hexdigest()[:16]
+            # Disambiguate titles that share a name
+            seen[anime_id] = seen.get(anime_id, 0) + 1
+            if seen[anime_id] > 1:
+                anime_id = f"{anime_id}.{seen[anime_id]}"
+            doc.metadata["anime_id"] = anime_id
+            typed = {k: v for k, v in doc.metadata.items() if k not in ("source", "row", "anime_id")}
+            digest = hashlib.sha1(doc.page_content.encode("utf-8"))
+            digest.update(json.dumps(typed, sort_keys=True).encode("utf-8"))
+            digest.update(layout.encode("utf-8"))
+            doc.metadata["content_hash"] = digest.hexdigest()[:16]
+
+            if per_title:
+                doc.page_content = self._truncate(doc.page_content, self.settings.TITLE_DOC_MAX_CHARS)
+                doc.id = f"{anime_id}-0"
+                yield doc
+                continue
+
+            for n, chunk in enumerate(splitter.split_documents([doc])):
+                chunk.id = f"{anime_id}-{n}"
+                yield chunk
+
+    def load_chunks(self) -> list[Document]:
+        """Load the processed CSV and split it into chunks with stable IDs."""
+        documents = self.load_documents()
+
+        # Split into overlapping chunks
+        self.progress.phase("splitting")
+        logger.info(f"✂️ Splitting documents ({self.layout})...")
+        with timed("build_split"):
+            chunks = list(self.iter_chunks(documents))
+        logger.info(f"✅ Created {len(chunks)} text chunks.")
+        return chunks
+
+    # -----------------------------------------------------
+    # 🔁 Incremental (delta) re-indexing
+    # -----------------------------------------------------
+    def _update_incrementally(self, chunks: Iterable[Document]) -> Chroma:
+        """Embed only added/changed titles and delete removed ones."""
+        vector_store = Chroma(
+            collection_name=self.collection_name,
+            embedding_function=self.embedding,
+            persist_directory=self.persist_directory,
+        )
+
+        # anime_id -> (content_hash, [chunk ids]) for what is already indexed
+        existing: dict[str, tuple[str | None, list[str]]] = {}
+        stored = vector_store._collection.get(include=["metadatas"])
+        for chunk_id, metadata in zip(stored["ids"], stored["metadatas"]):
+            anime_id = (metadata or {}).get("anime_id", chunk_id)
+            content_hash, ids = existing.setdefault(anime_id, ((metadata or {}).get("content_hash"), []))
+            ids.append(chunk_id)
+
+        # Filter the chunk stream down to added/changed titles, noting what we saw
+        incoming: dict[str, str] = {}
+        new_ids: set[str] = set()
+
+        def changed_chunks() -> Iterator[Document]:
+            for chunk in chunks:
+                anime_id = chunk.metadata["anime_id"]
+                incoming[anime_id] = chunk.metadata["content_hash"]
+                if anime_id not in existing or existing[anime_id][0] != incoming[anime_id]:
+                    new_ids.add(chunk.id)
+                    yield chunk
+
+        vector_store = self.index_documents(changed_chunks(), reset=False)
+
+        added = [a for a in incoming if a not in existing]
+        updated = [a for a in incoming if a in existing and existing[a][0] != incoming[a]]
+        deleted = [a for a in existing if a not in incoming]
+        unchanged = len(incoming) - len(added) - len(updated)
+
+        # Drop removed titles and leftover chunks of titles that now split differently
+        stale_ids = [cid for a in updated + deleted for cid in existing[a][1] if cid not in new_ids]
+        if stale_ids:
+            vector_store.delete(ids=stale_ids)
+
+        self.build_stats.update(
+            chunks=vector_store._collection.count(),
+            added=len(added),
+            updated=len(updated),
+            deleted=len(deleted),
+            unchanged=unchanged,
+        )
+        logger.info(
+            f"🔁 Incremental update: {len(added)} added, {len(updated)} updated, "
+            f"{len(deleted)} deleted, {unchanged} unchanged."
+        )
+        return vector_store
+
+    # -----------------------------------------------------
+    # ⚡ Batched, parallel, resumable embedding
+    # -----------------------------------------------------
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(self.persist_directory, CHECKPOINT_FILE)
+
+    def has_pending_build(self) -> bool:
+        """True if an interrupted build left a checkpoint that can be resumed."""
+        return bool(self.persist_directory) and os.path.exists(self.checkpoint_path)
+
+    def index_documents(
+        self,
+        documents: Iterable[Document],
+        reset: bool = True,
+        fingerprint: str | None = None,
+    ) -> Chroma:
+        """
+        Embed documents in batches on a bounded thread pool and upsert each
+        completed batch into Chroma.
+
+        `documents` may be a generator: batches are pulled lazily and at most
+        2 × EMBED_CONCURRENCY batches are in flight, so memory is bounded by
+        the batch size rather than the catalog size.
+
+        Completed batch numbers are checkpointed next to the collection, so
+        re-running the same build after an interruption skips them. Progress
+        and throughput (chunks/sec) are logged per batch and kept in
+        `self.build_stats`.
+
+        Args:
+            documents: Chunks to embed, in a deterministic order.
+            reset: Clear a collection that has data but no matching checkpoint.
+                Disabled for incremental updates, which add to existing data.
+            fingerprint: Identifies the input for resuming; computed from
+                `documents` when it is a list, otherwise checkpointing only
+                works if the caller provides one.
+        """
+        batch_size = max(1, self.settings.EMBED_BATCH_SIZE)
+        concurrency = max(1, self.settings.EMBED_CONCURRENCY)
+        if fingerprint is None and isinstance(documents, list):
+            fingerprint = self._fingerprint(documents, batch_size)
+        elif fingerprint is not None:
+            fingerprint = f"{fingerprint}:{batch_size}"
+        total = len(documents) if isinstance(documents, list) else 0
+
+        vector_store = Chroma(
+            collection_name=self.collection_name,
+            embedding_function=self.embedding,
+            persist_directory=self.persist_directory,
+        )
+
+        completed = self._load_checkpoint(fingerprint) if fingerprint else set()
+        if completed:
+            logger.info(f"⏩ Resuming build: {len(completed)} batches already embedded.")
+        elif reset and vector_store._collection.count():
+            # Stale or foreign data without a matching checkpoint — start clean
+            vector_store.reset_collection()
+
+        done = 0
+        embedded = 0
+        resumed = 0
+        start = time.perf_counter()
+
+        self.progress.phase("embedding")
+        logger.info(
+            f"🧠 Embedding chunks (batch_size={batch_size}, concurrency={concurrency})..."
+        )
+
+        def _record(n: int, batch: list[Document], embeddings) -> None:
+            nonlocal done, embedded
+            # Writes stay on this thread; only embedding runs in parallel
+            with timed("build_upsert_batch"):
+                vector_store._collection.upsert(
+                    ids=[d.id or f"chunk-{n * batch_size + i}" for i, d in enumerate(batch)],
+                    embeddings=embeddings,
+                    documents=[d.page_content for d in batch],
+                    metadatas=[d.metadata or None for d in batch],
+                )
+            completed.add(n)
+            if fingerprint:
+                self._save_checkpoint(fingerprint, completed)
+
+            done += len(batch)
+            embedded += len(batch)
+            rate = embedded / max(time.perf_counter() - start, 1e-9)
+            logger.info(f"📈 Embedded {done}/{total or '?'} chunks ({rate:.1f} chunks/sec)")
+            self.progress.advance(done, total)
+            self.progress.check_cancelled()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            in_flight: dict = {}
+            try:
+                for n, batch in enumerate(map(list, batched(documents, batch_size))):
+                    if n in completed:
+                        done += len(batch)
+                        resumed += 1
+                        continue
+                    future = pool.submit(self._embed_with_backoff, [d.page_content for d in batch])
+                    in_flight[future] = (n, batch)
+
+                    # Backpressure: don't pull more input than we can embed
+                    while len(in_flight) >= 2 * concurrency:
+                        finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            _record(*in_flight.pop(future), future.result())
+
+                for future in as_completed(list(in_flight)):
+                    _record(*in_flight.pop(future), future.result())
+            except BaseException:
+                for future in in_flight:
+                    future.cancel()
+                raise
+
+        elapsed = time.perf_counter() - start
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        self.build_stats = {
+            "chunks": done,
+            "embedded_chunks": embedded,
+            "resumed_batches": resumed,
+            "chunks_per_second": round(embedded / elapsed, 2) if elapsed else 0.0,
+        }
+        logger.info(
+            f"✅ Embedded {embedded} chunks in {elapsed:.2f}s "
+            f"({self.build_stats['chunks_per_second']} chunks/sec)."
+        )
+        return vector_store
+
+    def _embed_with_backoff(self, texts: list[str]) -> list[list[float]]:
+        """Embed one batch, retrying transient and rate-limit errors with exponential backoff."""
+        max_retries = self.settings.EMBED_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            try:
+                with timed("build_embed_batch"):
+                    return self.embedding.embed_documents(texts)
+            except Exception as e:
+                if attempt == max_retries:
+                    raise
+                delay = _retry_after(e) or min(60.0, 2 ** attempt) * (1 + random.random())
+                logger.warning(
+                    f"⏳ Embedding batch failed ({type(e).__name__}); "
+                    f"retry {attempt + 1}/{max_retries} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+    @staticmethod
+    def _fingerprint(documents: list[Document], batch_size: int) -> str:
+        digest = hashlib.sha256(str(batch_size).encode())
+        for doc in documents:
+            digest.update(doc.page_content.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _load_checkpoint(self, fingerprint: str) -> set[int]:
+        if not self.has_pending_build():
+            return set()
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("fingerprint") != fingerprint:
+            logger.info("🔁 Checkpoint does not match current data — starting a fresh build.")
+            return set()
+        return set(checkpoint.get("completed", []))
+
+    def _save_checkpoint(self, fingerprint: str, completed: set[int]) -> None:
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "completed": sorted(completed)}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
     # -----------------------------------------------------
     # 📦 Load existing vector store
     # -----------------------------------------------------
     def load_vector_store(self) -> Chroma:
         """Load an existing persisted Chroma vector store."""
         try:
-            if not os.path.exists(self.persist_directory):
+            if not self.persist_directory or not os.path.exists(self.persist_directory):
                 raise FileNotFoundError(
                     f"No Chroma DB found at {self.persist_directory}. Run build first."
                 )
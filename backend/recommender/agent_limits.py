@@ -0,0 +1,161 @@
+"""
+agent_limits.py — Per-request budgets for AGENT mode.
+
+A single question may not:
+- make more than AGENT_MAX_MODEL_CALLS model calls (LangChain's
+  ModelCallLimitMiddleware)
+- make more than AGENT_MAX_TOOL_CALLS tool calls (ToolCallLimitMiddleware)
+- run longer than AGENT_TIMEOUT_SECONDS (enforced by the recommender's
+  stream loop; sync streams run on a worker via `until_deadline`)
+
+Every limit raises; AnimeRecommender catches the error and answers through
+the CHAIN executor instead. Identical tool calls repeated within one
+request are answered from the earlier result without running the tool.
+
+How often each limit triggers is counted process-wide (`limit_counts()`).
+"""
+
+import contextvars
+import json
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Iterator
+
+from langchain.agents.middleware import (
+    AgentMiddleware,
+    ModelCallLimitMiddleware,
+    ToolCallLimitMiddleware,
+)
+from langchain.agents.middleware.model_call_limit import ModelCallLimitExceededError
+from langchain.agents.middleware.tool_call_limit import ToolCallLimitExceededError
+from langchain.tools.tool_node import ToolCallRequest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from config.settings import Settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=logging.INFO)
+
+
+class AgentTimeoutError(Exception):
+    """The agent ran past AGENT_TIMEOUT_SECONDS for one request."""
+
+
+# Errors that end an agent run and trigger the CHAIN fallback
+LIMIT_ERRORS = (ModelCallLimitExceededError, ToolCallLimitExceededError, AgentTimeoutError)
+
+
+
+def until_deadline(stream: Iterator, deadline: float, message: str) -> Iterator:
+    """
+    Iterate `stream` on a worker thread, raising AgentTimeoutError(message)
+    once `deadline` (perf_counter) passes — even while a model or tool call
+    hangs. The hung call itself can't be interrupted; the abandoned worker
+    stops at its next item.
+    """
+    items: queue.SimpleQueue = queue.SimpleQueue()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in stream:
+                if stop.is_set():
+                    return
+                items.put((item, None))
+            items.put((None, StopIteration()))
+        except BaseException as e:
+            items.put((None, e))
+
+    # Copy the context so stage timings still reach the tracked request
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(produce,), name="agent-stream", daemon=True)
+    worker.start()
+    try:
+        while True:
+            try:
+                item, error = items.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                raise AgentTimeoutError(message) from None
+            if isinstance(error, StopIteration):
+                return
+            if error is not None:
+                raise error
+            yield item
+    finally:
+        stop.set()
+
+
+_counts: Counter = Counter()
+_counts_lock = threading.Lock()
+
+
+def record(event: str) -> None:
+    with _counts_lock:
+        _counts[event] += 1
+
+
+def limit_counts() -> dict[str, int]:
+    """Times each limit triggered (and duplicate tool calls were skipped, prefetches served) since startup."""
+    with _counts_lock:
+        return dict(_counts)
+
+
+def record_limit(error: Exception) -> str:
+    """Count a limit error and return its name."""
+    limit = {
+        ModelCallLimitExceededError: "model_calls",
+        ToolCallLimitExceededError: "tool_calls",
+        AgentTimeoutError: "timeout",
+    }.get(type(error), "other")
+    record(limit)
+    return limit
+
+
+class DedupeToolCallsMiddleware(AgentMiddleware):
+    """Answer a tool call repeated with identical arguments from the earlier result."""
+
+    @staticmethod
+    def _key(tool_call) -> str:
+        return f"{tool_call['name']}:{json.dumps(tool_call.get('args', {}), sort_keys=True, default=str)}"
+
+    def _previous_result(self, request: ToolCallRequest) -> ToolMessage | None:
+        messages = request.state.get("messages", []) if isinstance(request.state, dict) else []
+        results = {m.tool_call_id: m for m in messages if isinstance(m, ToolMessage)}
+        key = self._key(request.tool_call)
+        for message in messages:
+            if not isinstance(message, AIMessage):
+                continue
+            for call in message.tool_calls:
+                if call["id"] != request.tool_call["id"] and call["id"] in results and self._key(call) == key:
+                    return results[call["id"]]
+        return None
+
+    def _reuse(self, request: ToolCallRequest, previous: ToolMessage) -> ToolMessage:
+        record("duplicate_tool_calls")
+        logger.info(f"[TOOL] {request.tool_call['name']} repeated with the same arguments — reusing result")
+        return ToolMessage(
+            content=previous.content,
+            artifact=previous.artifact,
+            name=previous.name,
+            tool_call_id=request.tool_call["id"],
+        )
+
+    def wrap_tool_call(self, request: ToolCallRequest, handler):
+        previous = self._previous_result(request)
+        return self._reuse(request, previous) if previous is not None else handler(request)
+
+    async def awrap_tool_call(self, request: ToolCallRequest, handler):
+        previous = self._previous_result(request)
+        return self._reuse(request, previous) if previous is not None else await handler(request)
+
+
+def limit_middleware(settings: Settings) -> list[AgentMiddleware]:
+    """Middleware enforcing the configured AGENT budgets (0 disables a limit)."""
+    middleware: list[AgentMiddleware] = [DedupeToolCallsMiddleware()]
+    if settings.AGENT_MAX_MODEL_CALLS > 0:
+        middleware.append(ModelCallLimitMiddleware(run_limit=settings.AGENT_MAX_MODEL_CALLS, exit_behavior="error"))
+    if settings.AGENT_MAX_TOOL_CALLS > 0:
+        middleware.append(ToolCallLimitMiddleware(run_limit=settings.AGENT_MAX_TOOL_CALLS, exit_behavior="error"))
+    return middleware
@@ -5,55 +5,260 @@ Supports two modes:
   - RAG_CHAIN: always retrieves context first (deterministic)
   - RAG_AGENT: lets the LLM decide when to use tools (agentic)
 
+CHAIN mode runs on a direct executor (retrieve, fill the precompiled
+prompt, one streaming model call) unless CHAIN_EXECUTOR="agent" selects
+the original create_agent-based pipeline.
+
 This module orchestrates model initialization, tool creation,
 and streaming-based generation of recommendations.
 """
 
+import asyncio
 import logging
+import time
+from typing import AsyncIterator, Iterator
 from dotenv import load_dotenv
 
 from langchain.chat_models import init_chat_model
 from langchain.agents import create_agent
-from langchain.agents.middleware import dynamic_prompt, ModelRequest
+from langchain.agents.middleware import AgentMiddleware, ModelRequest
+from langchain_core.messages import AIMessageChunk, HumanMessage, SystemMessage
+from langchain_chroma import Chroma
 
 from utils.logger import setup_logger
 from rag.vector_store import VectorStoreBuilder
-from tools.retrieval_tools import make_retrieve_context_tool
+from rag.context_builder import ContextBuilder
+from rag.retrieval import RetrievalConfig, asearch, embed_queries, search, search_batch
+from rag.keyword_index import KeywordIndex
+from rag.metadata_index import MetadataIndex
+from rag.similarity_index import SimilarityIndex
+from rag.store_versions import StoreVersions
+from tools.retrieval_tools import ContextRetriever, make_retrieve_context_tool, make_similar_titles_tool
+from recommender.agent_limits import (
+    LIMIT_ERRORS, AgentTimeoutError, limit_middleware, record, record_limit, until_deadline,
+)
 from recommender.prompt_template import get_anime_prompt
-from config.settings import Settings
+from recommender.speculative_retrieval import SpeculativeRetrievalMiddleware
+from recommender.answer_cache import answer_cache
+from config.settings import Settings, get_settings
+from utils.metrics import TOKENS, TOOL_CALLS, observe, timed
 
 logger = setup_logger(__name__, level=logging.INFO)
 
 
+class ContextPromptMiddleware(AgentMiddleware):
+    """
+    Dynamic prompt middleware for CHAIN mode.
+
+    Retrieves context for the latest user message and injects the filled
+    anime prompt as the system message. Score/type/year constraints (and,
+    with METADATA_QUESTION_GENRES, non-negated genres) found in the message
+    are applied as metadata filters before the search,
+    and the retrieved documents are compressed to the context token budget.
+    Implements both the sync and async hooks so `astream()` retrieves
+    through the async embedding API.
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        keyword_index: KeywordIndex | None = None,
+        metadata_index: MetadataIndex | None = None,
+        k: int = 3,
+        context_builder: ContextBuilder | None = None,
+        retrieval_config: RetrievalConfig | None = None,
+    ):
+        super().__init__()
+        self.vector_store = vector_store
+        self.keyword_index = keyword_index
+        self.metadata_index = metadata_index
+        self.k = k
+        self.context_builder = context_builder or ContextBuilder()
+        self.retrieval_config = retrieval_config
+        # Compiled once; filled with plain str.format per request
+        self.template = get_anime_prompt().template
+
+    def _search_kwargs(self, query: str) -> dict:
+        metadata_filter = self.metadata_index.filters_for(query) if self.metadata_index else None
+        return {
+            "keyword_index": self.keyword_index,
+            "metadata_filter": metadata_filter,
+            "metadata_index": self.metadata_index,
+            "config": self.retrieval_config,
+        }
+
+    def _fill(self, query: str, docs) -> str:
+        context = self.context_builder.build(query, docs)
+        prompt = self.template.format(context=context.text, question=query)
+        tokens = self.context_builder.count(prompt)
+        TOKENS.inc(tokens, kind="prompt")
+        logger.info(f"[PROMPT] {tokens} prompt tokens ({context.describe()})")
+        return prompt
+
+    def prompt_for(self, query: str) -> str:
+        """Retrieve context for a question and return the filled anime prompt."""
+        with timed("prompt_context"):
+            return self._fill(query, search(self.vector_store, query, k=self.k, **self._search_kwargs(query)))
+
+    async def aprompt_for(self, query: str) -> str:
+        """Async variant of `prompt_for`."""
+        with timed("prompt_context"):
+            docs = await asearch(self.vector_store, query, k=self.k, **self._search_kwargs(query))
+            return self._fill(query, docs)
+
+    def prompts_for(self, queries: list[str]) -> list[str]:
+        """`prompt_for` many questions with batched embedding and vector search."""
+        filters = [self._search_kwargs(q)["metadata_filter"] for q in queries]
+        results = search_batch(
+            self.vector_store, queries, k=self.k, keyword_index=self.keyword_index,
+            metadata_filters=filters, metadata_index=self.metadata_index, config=self.retrieval_config,
+        )
+        return [self._fill(q, docs) for q, docs in zip(queries, results)]
+
+    def wrap_model_call(self, request: ModelRequest, handler):
+        prompt = self.prompt_for(request.state["messages"][-1].text)
+        return handler(request.override(system_prompt=prompt))
+
+    async def awrap_model_call(self, request: ModelRequest, handler):
+        prompt = await self.aprompt_for(request.state["messages"][-1].text)
+        return await handler(request.override(system_prompt=prompt))
+
+
+class DirectChain:
+    """
+    CHAIN mode without the agent runtime.
+
+    Retrieves context, fills the prompt and streams a single model call —
+    no graph state, middleware dispatch or per-call template construction.
+    Exposes the agent's `stream` / `astream` interface (stream_mode
+    "messages"), so AnimeRecommender drives both executors the same way.
+    """
+
+    def __init__(self, model, prompt: ContextPromptMiddleware):
+        """
+        Args:
+            model: Chat model to stream from.
+            prompt: Retrieval + prompt filling shared with the agent-based chain.
+        """
+        self.model = model
+        self.prompt = prompt
+
+    @staticmethod
+    def _question(inputs: dict) -> str:
+        message = inputs["messages"][-1]
+        return message["content"] if isinstance(message, dict) else message.text
+
+    def stream(self, inputs: dict, stream_mode: str = "messages") -> Iterator[tuple]:
+        question = self._question(inputs)
+        messages = [SystemMessage(content=self.prompt.prompt_for(question)), HumanMessage(content=question)]
+        for chunk in self.model.stream(messages):
+            yield chunk, {"langgraph_node": "model"}
+
+    async def astream(
+        self, inputs: dict, stream_mode: str = "messages", prompt: str | None = None
+    ) -> AsyncIterator[tuple]:
+        """Async stream; `prompt` skips retrieval when it was already filled (batches)."""
+        question = self._question(inputs)
+        if prompt is None:
+            prompt = await self.prompt.aprompt_for(question)
+        messages = [SystemMessage(content=prompt), HumanMessage(content=question)]
+        async for chunk in self.model.astream(messages):
+            yield chunk, {"langgraph_node": "model"}
+
+
 class AnimeRecommender:
     """Handles end-to-end anime recommendation using RAG Chain or RAG Agent."""
 
-    def __init__(self, settings: Settings = Settings()):
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        mode: str | None = None,
+        model=None,
+        vector_store: Chroma | None = None,
+        similarity_index: SimilarityIndex | None = None,
+        keyword_index: KeywordIndex | None = None,
+        metadata_index: MetadataIndex | None = None,
+    ):
+        """
+        Args:
+            settings: Settings to use; defaults to the shared get_settings().
+            mode: 'AGENT' or 'CHAIN'; defaults to settings.RAG_MODE.
+            model: Pre-initialized chat model to share across recommenders.
+            vector_store: Pre-loaded Chroma store to share across recommenders.
+            similarity_index: Precomputed similar-title table for `vector_store`;
+                loaded from the live version when the store is loaded here.
+            keyword_index: BM25 index for `vector_store` enabling hybrid
+                retrieval; loaded like `similarity_index`.
+            metadata_index: Typed-metadata index for `vector_store` enabling
+                filtered retrieval; loaded like `similarity_index`.
+        """
         load_dotenv()
+        settings = settings or get_settings()
         self.settings = settings
-        self.rag_mode = settings.RAG_MODE.upper()
-        self.model = init_chat_model(settings.MODEL_NAME)
+        self.rag_mode = (mode or settings.RAG_MODE).upper()
+        self.model = model or init_chat_model(settings.MODEL_NAME)
+        self.answer_cache = answer_cache if settings.ANSWER_CACHE_ENABLED else None
 
-        # Load Chroma store using configured settings
-        self.vector_store = VectorStoreBuilder(
+        # Load Chroma store using configured settings (unless one is shared in)
+        if vector_store is None:
+            current_dir = StoreVersions(settings.CHROMA_DIR).current_dir()
+            if similarity_index is None:
+                similarity_index = SimilarityIndex.load(current_dir)
+            if keyword_index is None and settings.HYBRID_SEARCH_ENABLED:
+                keyword_index = KeywordIndex.load(current_dir)
+            if metadata_index is None and settings.METADATA_FILTERS_ENABLED:
+                metadata_index = MetadataIndex.load(
+                    current_dir, settings.METADATA_TOP_RATED_SCORE, settings.METADATA_QUESTION_GENRES
+                )
+        self.vector_store = vector_store or VectorStoreBuilder(
             processed_csv="",  # not used here
             settings=settings
         ).load_vector_store()
+        self.similarity_index = similarity_index
+        self.keyword_index = keyword_index
+        self.metadata_index = metadata_index
+        self.context_builder = ContextBuilder.from_settings(settings)
+        self.retrieval_config = RetrievalConfig.from_settings(settings)
 
         logger.info(f"AnimeRecommender initialized in {self.rag_mode} mode.")
+        self.agent = self._create_agent()
 
+    def _create_agent(self):
         if self.rag_mode == "AGENT":
-            self.agent = self._create_rag_agent()
-        else:
-            self.agent = self._create_rag_chain()
+            # Answers requests that exhaust the agent's budgets
+            self.fallback = DirectChain(self.model, self._context_prompt())
+            return self._create_rag_agent()
+        self.fallback = None
+        return self._create_rag_chain()
+
+    def use_vector_store(
+        self,
+        vector_store: Chroma,
+        similarity_index: SimilarityIndex | None = None,
+        keyword_index: KeywordIndex | None = None,
+        metadata_index: MetadataIndex | None = None,
+    ) -> None:
+        """Switch to a new vector store (blue/green swap) without restarting."""
+        self.vector_store = vector_store
+        self.similarity_index = similarity_index
+        self.keyword_index = keyword_index
+        self.metadata_index = metadata_index
+        # In-flight streams keep using the agent (and store) they started with
+        self.agent = self._create_agent()
 
     # ---------------------------------------------------------
     # 🧠 RAG AGENT MODE
     # ---------------------------------------------------------
     def _create_rag_agent(self):
         """Agentic mode: LLM decides when/how to call retrieval tools."""
-        retrieve_context = make_retrieve_context_tool(self.vector_store)
+        retriever = ContextRetriever(
+            self.vector_store, self.keyword_index, self.metadata_index,
+            k=self.settings.TOP_K, context_builder=self.context_builder, retrieval_config=self.retrieval_config,
+        )
+        retrieve_context = make_retrieve_context_tool(retriever)
         tools = [retrieve_context]
+        if self.similarity_index is not None:
+            tools.append(make_similar_titles_tool(self.similarity_index))
 
         system_prompt = """
         You are an expert anime recommender agent.
@@ -64,68 +269,335 @@ class AnimeRecommender:
 
         Steps to follow:
         1. Understand user intent and preferences.
-        2. Retrieve additional info if needed (via 'retrieve_context').
+        2. Retrieve additional info if needed (via 'retrieve_context'). If you
+           need several searches, request them together in one turn; they
+           run in parallel.
         3. Recommend 3 anime titles with:
            - A short summary (2–3 lines)
            - Why it matches user preferences
         4. Be factual, concise, and avoid fabricating data.
         """
+        if self.similarity_index is not None:
+            system_prompt += """
+        For "anime similar to <title>" requests, call 'find_similar_titles'
+        first and only retrieve details for the titles it returns.
+        """
+
+        middleware = limit_middleware(self.settings)
+        if self.settings.AGENT_SPECULATIVE_RETRIEVAL:
+            middleware.append(SpeculativeRetrievalMiddleware(
+                retriever, self.metadata_index, self.settings.AGENT_SPECULATIVE_MIN_OVERLAP
+            ))
 
         return create_agent(
             model=self.model,
             tools=tools,
             system_prompt=system_prompt,
+            middleware=middleware,
         )
 
     # ---------------------------------------------------------
     # ⚡ RAG CHAIN MODE
     # ---------------------------------------------------------
+    def _context_prompt(self) -> ContextPromptMiddleware:
+        return ContextPromptMiddleware(
+            self.vector_store, self.keyword_index, self.metadata_index,
+            k=self.settings.TOP_K, context_builder=self.context_builder, retrieval_config=self.retrieval_config,
+        )
+
     def _create_rag_chain(self):
         """Fixed pipeline mode: always retrieves before generating response."""
-
-        @dynamic_prompt
-        def prompt_with_context(request: ModelRequest) -> str:
-            last_query = request.state["messages"][-1].text
-            retrieved_docs = self.vector_store.similarity_search(last_query, k=3)
-            context = "\n\n".join(doc.page_content for doc in retrieved_docs)
-            template = get_anime_prompt()
-            return template.format(context=context, question=last_query)
-
-        return create_agent(self.model, tools=[], middleware=[prompt_with_context])
+        prompt = self._context_prompt()
+        if self.settings.CHAIN_EXECUTOR.lower() == "agent":
+            return create_agent(self.model, tools=[], middleware=[prompt])
+        return DirectChain(self.model, prompt)
 
     # ---------------------------------------------------------
     # 🚀 RECOMMENDATION STREAMING
     # ---------------------------------------------------------
-    def recommend(self, question: str) -> str:
-        """Stream recommendations and log incremental updates."""
+    def stream(self, question: str) -> Iterator[str]:
+        """
+        Yield token-level text deltas as the model generates them.
+
+        Cache hits from the answer cache are yielded as a single delta;
+        completed answers are written back to the cache.
+        """
+        with timed("request"):
+            with timed("answer_cache"):
+                cached, embedding, generation = self._cache_lookup(question)
+            if cached is not None:
+                yield cached
+                return
+
+            parts = []
+            for delta in self._stream_agent(question):
+                parts.append(delta)
+                yield delta
+            self._cache_store(question, "".join(parts), embedding, generation)
+
+    async def astream(self, question: str) -> AsyncIterator[str]:
+        """Async variant of `stream` built on the agent's `astream()` API."""
+        with timed("request"):
+            with timed("answer_cache"):
+                cached, embedding, generation = await self._acache_lookup(question)
+            if cached is not None:
+                yield cached
+                return
+
+            parts = []
+            async for delta in self._astream_agent(question):
+                parts.append(delta)
+                yield delta
+            self._cache_store(question, "".join(parts), embedding, generation)
+
+    def _deadline(self, start: float) -> float | None:
+        timeout = self.settings.AGENT_TIMEOUT_SECONDS
+        return start + timeout if self.rag_mode == "AGENT" and timeout > 0 else None
+
+    def _log_fallback(self, error: Exception) -> None:
+        limit = record_limit(error)
+        record("fallbacks")
+        logger.warning(f"[AGENT LIMIT] {limit}: {error} — answering via CHAIN")
+
+    def _stream_agent(self, question: str) -> Iterator[str]:
+        """
+        Drive the agent and yield text deltas.
+
+        Uses the message-level stream mode so each step only carries the
+        new chunk instead of re-serializing the full message list. In AGENT
+        mode the stream runs on a worker so the wall-clock budget also
+        bounds a hung model or tool call, and an exhausted budget switches
+        to the CHAIN fallback.
+        """
+        logger.info(f"[QUERY] {question}")
+        logger.info("[STREAMING OUTPUT START]")
+
+        start = time.perf_counter()
+        first_token_at = None
+        emitted: list[str] = []
+        inputs = {"messages": [{"role": "user", "content": question}]}
+        agent, fallback = self.agent, self.fallback
+
+        def deltas(stream) -> Iterator[str]:
+            nonlocal first_token_at
+            for msg, metadata in stream:
+                delta = self._text_delta(msg)
+                if not delta:
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    observe("first_token", first_token_at - start)
+                    logger.info(f"[TTFT] {first_token_at - start:.3f}s")
+                emitted.append(delta)
+                yield delta
+
+        try:
+            stream = agent.stream(inputs, stream_mode="messages")
+            deadline = self._deadline(start)
+            if deadline is not None:
+                stream = until_deadline(stream, deadline, f"no answer within {self.settings.AGENT_TIMEOUT_SECONDS}s")
+            yield from deltas(stream)
+        except LIMIT_ERRORS as e:
+            if fallback is None:
+                raise
+            self._log_fallback(e)
+            if first_token_at is not None:
+                yield "\n\n"
+            yield from deltas(fallback.stream(inputs, stream_mode="messages"))
+
+        self._record_generation(start, emitted)
+        logger.info(f"[STREAMING OUTPUT END] {time.perf_counter() - start:.3f}s")
+
+    async def _astream_agent(self, question: str, prompt: str | None = None) -> AsyncIterator[str]:
+        """
+        Async variant of `_stream_agent`; the time budget also cancels in-flight calls.
+        `prompt` is a CHAIN prompt already filled for `question` (DirectChain batches).
+        """
         logger.info(f"[QUERY] {question}")
         logger.info("[STREAMING OUTPUT START]")
 
-        final_response = None
-        last_text = ""
-
-        for step in self.agent.stream(
-            {"messages": [{"role": "user", "content": question}]},
-            stream_mode="values",
-        ):
-            msg = step["messages"][-1]
-
-            # 🛠️ Log tool calls
-            if hasattr(msg, "tool_calls") and msg.tool_calls:
-                logger.info(f"Calling tools: {[tc['name'] for tc in msg.tool_calls]}")
-                continue
-
-            # ⚙️ Skip raw tool results
-            if getattr(msg, "type", None) == "tool":
-                continue
-
-            # 💬 Print incremental text
-            if getattr(msg, "type", None) == "ai" and getattr(msg, "content", None):
-                new_text = msg.content[len(last_text):]
-                if new_text.strip():
-                    logger.info("")
-                last_text = msg.content
-                final_response = msg.content
-
-        logger.info("[STREAMING OUTPUT END]")
+        start = time.perf_counter()
+        first_token_at = None
+        emitted: list[str] = []
+        inputs = {"messages": [{"role": "user", "content": question}]}
+        agent, fallback = self.agent, self.fallback
+
+        async def deltas(stream, deadline: float | None) -> AsyncIterator[str]:
+            nonlocal first_token_at
+            iterator = aiter(stream)
+            try:
+                while True:
+                    timeout = asyncio.timeout(None if deadline is None else max(0.0, deadline - time.perf_counter()))
+                    try:
+                        async with timeout:
+                            msg, metadata = await anext(iterator)
+                    except StopAsyncIteration:
+                        return
+                    except TimeoutError:
+                        if timeout.expired():
+                            raise AgentTimeoutError(
+                                f"no answer within {self.settings.AGENT_TIMEOUT_SECONDS}s"
+                            ) from None
+                        raise
+                    delta = self._text_delta(msg)
+                    if not delta:
+                        continue
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        observe("first_token", first_token_at - start)
+                        logger.info(f"[TTFT] {first_token_at - start:.3f}s")
+                    emitted.append(delta)
+                    yield delta
+            finally:
+                await iterator.aclose()
+
+        if prompt is not None:
+            stream = agent.astream(inputs, stream_mode="messages", prompt=prompt)
+        else:
+            stream = agent.astream(inputs, stream_mode="messages")
+        try:
+            async for delta in deltas(stream, self._deadline(start)):
+                yield delta
+        except LIMIT_ERRORS as e:
+            if fallback is None:
+                raise
+            self._log_fallback(e)
+            if first_token_at is not None:
+                yield "\n\n"
+            async for delta in deltas(fallback.astream(inputs, stream_mode="messages"), None):
+                yield delta
+
+        self._record_generation(start, emitted)
+        logger.info(f"[STREAMING OUTPUT END] {time.perf_counter() - start:.3f}s")
+
+    # ---------------------------------------------------------
+    # 📦 BATCH RECOMMENDATIONS
+    # ---------------------------------------------------------
+    async def arecommend_batch(
+        self, questions: list[str], concurrency: int = 8
+    ) -> AsyncIterator[tuple[int, str | None, str | None]]:
+        """
+        Answer many questions, yielding (index, answer, error) as each completes.
+
+        All questions are embedded in one batched call, which also serves
+        the answer-cache lookups and warms the query cache for agent
+        retrieval. With the direct CHAIN executor the vector searches run
+        together and each generation streams from its prefilled prompt.
+        At most `concurrency` generations run at once.
+        """
+        agent = self.agent
+        embeddings = await asyncio.to_thread(embed_queries, self.vector_store, questions)
+
+        pending, generations = [], {}
+        for i, (question, embedding) in enumerate(zip(questions, embeddings)):
+            cached, generations[i] = self._cached_answer(question, embedding)
+            if cached is not None:
+                yield i, cached, None
+            else:
+                pending.append(i)
+
+        prompts: dict[int, str] = {}
+        if pending and isinstance(agent, DirectChain):
+            filled = await asyncio.to_thread(agent.prompt.prompts_for, [questions[i] for i in pending])
+            prompts = dict(zip(pending, filled))
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def answer(i: int) -> tuple[int, str | None, str | None]:
+            async with semaphore:
+                try:
+                    deltas = self._astream_agent(questions[i], prompt=prompts.get(i))
+                    text = "".join([delta async for delta in deltas])
+                except Exception as e:
+                    logger.exception(f"❌ Batch question {i} failed")
+                    return i, None, str(e)
+            self._cache_store(questions[i], text, embeddings[i], generations[i])
+            return i, text or "[No response generated]", None
+
+        logger.info(f"[BATCH] {len(questions)} questions, {len(pending)} to generate, concurrency {concurrency}")
+        tasks = [asyncio.ensure_future(answer(i)) for i in pending]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield await done
+        finally:
+            # The consumer went away (e.g. client disconnect): stop outstanding generations
+            for task in tasks:
+                task.cancel()
+
+    # ---------------------------------------------------------
+    # 🗃️ ANSWER CACHE
+    # ---------------------------------------------------------
+    def _cached_answer(self, question: str, embedding=None) -> tuple[str | None, int | None]:
+        """
+        Answer-cache lookup: exact match on the normalized question, then the
+        most similar cached question for the precomputed query `embedding`.
+        Returns (answer, cache_generation) — the generation tags the later write.
+        """
+        if self.answer_cache is None:
+            return None, None
+        generation = self.answer_cache.generation
+        answer = self.answer_cache.get_exact(self.rag_mode, question)
+        if answer is not None:
+            logger.info("[CACHE HIT] exact")
+            return answer, generation
+
+        answer = self.answer_cache.get_similar(self.rag_mode, embedding)
+        if answer is not None:
+            logger.info("[CACHE HIT] semantic")
+        return answer, generation
+
+    def _needs_query_embedding(self, question: str) -> bool:
+        """Whether the lookup reaches the semantic stage (so exact hits skip the embedding call)."""
+        cache = self.answer_cache
+        return cache is not None and cache.semantic_enabled and not cache.contains(self.rag_mode, question)
+
+    def _cache_lookup(self, question: str):
+        """Return (cached_answer, query_embedding, cache_generation)."""
+        embedding = None
+        if self._needs_query_embedding(question):
+            embedding = self.vector_store.embeddings.embed_query(question)
+        answer, generation = self._cached_answer(question, embedding)
+        return answer, embedding, generation
+
+    async def _acache_lookup(self, question: str):
+        """Async variant of `_cache_lookup`."""
+        embedding = None
+        if self._needs_query_embedding(question):
+            embedding = await self.vector_store.embeddings.aembed_query(question)
+        answer, generation = self._cached_answer(question, embedding)
+        return answer, embedding, generation
+
+    def _cache_store(self, question: str, answer: str, embedding, generation) -> None:
+        if self.answer_cache is not None and answer:
+            self.answer_cache.put(self.rag_mode, question, answer, embedding, generation)
+
+    def _record_generation(self, start: float, emitted: list[str]) -> None:
+        observe("generation", time.perf_counter() - start)
+        TOKENS.inc(self.context_builder.count("".join(emitted)), kind="completion")
+
+    @staticmethod
+    def _text_delta(msg) -> str:
+        """Return the text carried by a streamed model chunk, logging tool calls."""
+        # ⚙️ Skip raw tool results and anything not produced by the model
+        if not isinstance(msg, AIMessageChunk):
+            return ""
+
+        # 🛠️ Log tool calls (names arrive on the first chunk of each call)
+        tool_names = [tc["name"] for tc in msg.tool_call_chunks if tc.get("name")]
+        if tool_names:
+            for name in tool_names:
+                TOOL_CALLS.inc(tool=name)
+            logger.info(f"Calling tools: {tool_names}")
+
+        # 💬 Incremental text
+        return msg.text
+
+    def recommend(self, question: str) -> str:
+        """Stream recommendations and return the full generated answer."""
+        final_response = "".join(self.stream(question))
+        return final_response or "[No response generated]"
+
+    async def arecommend(self, question: str) -> str:
+        """Async variant of `recommend`; never blocks the event loop on LLM I/O."""
+        final_response = "".join([delta async for delta in self.astream(question)])
         return final_response or "[No response generated]"
@@ -0,0 +1,165 @@
+"""
+answer_cache.py — Semantic response cache in front of AnimeRecommender.
+
+Lookups happen in two tiers:
+  1. Exact match on a normalized query (no embedding needed)
+  2. Cosine similarity against cached query embeddings, above a threshold
+
+Entries are scoped per RAG mode, expire after a TTL and are evicted LRU.
+The whole cache is invalidated whenever the vector store is rebuilt.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from config.settings import get_settings
+
+settings = get_settings()
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCT = re.compile(r"[\s?!.]+$")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and strip trailing punctuation."""
+    return _TRAILING_PUNCT.sub("", _WHITESPACE.sub(" ", query.strip().lower()))
+
+
+@dataclass
+class _Entry:
+    answer: str
+    embedding: np.ndarray | None
+    created_at: float
+
+
+class SemanticAnswerCache:
+    """Thread-safe LRU + TTL cache of generated answers keyed by (mode, query)."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, similarity: float = 0.95):
+        """
+        Args:
+            max_entries: Maximum number of cached answers across all modes.
+            ttl_seconds: Lifetime of an entry; expired entries are never served.
+            similarity: Cosine similarity threshold for semantic hits (>= 1 disables them).
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.generation = 0
+
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.similarity < 1.0
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return now - entry.created_at > self.ttl_seconds
+
+    # -----------------------------------------------------
+    # 🔎 Lookups
+    # -----------------------------------------------------
+    def get_exact(self, mode: str, query: str) -> str | None:
+        """Return a cached answer for the normalized query, if fresh."""
+        key = (mode, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry, time.time()):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self._stats["exact_hits"] += 1
+            return entry.answer
+
+    def contains(self, mode: str, query: str) -> bool:
+        """Whether a fresh exact entry exists (no hit counting or LRU update)."""
+        key = (mode, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry, time.time())
+
+    def get_similar(self, mode: str, embedding) -> str | None:
+        """Return the answer of the most similar cached query above the threshold."""
+        if embedding is None or not self.semantic_enabled:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+
+        query_vec = self._unit(embedding)
+        now = time.time()
+        with self._lock:
+            keys, vectors = [], []
+            for key, entry in list(self._entries.items()):
+                if self._expired(entry, now):
+                    del self._entries[key]
+                elif key[0] == mode and entry.embedding is not None:
+                    keys.append(key)
+                    vectors.append(entry.embedding)
+
+            if vectors:
+                scores = np.stack(vectors) @ query_vec
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity:
+                    self._entries.move_to_end(keys[best])
+                    self._stats["semantic_hits"] += 1
+                    return self._entries[keys[best]].answer
+
+            self._stats["misses"] += 1
+            return None
+
+    # -----------------------------------------------------
+    # 💾 Writes & invalidation
+    # -----------------------------------------------------
+    def put(self, mode: str, query: str, answer: str, embedding=None, generation: int | None = None) -> None:
+        """
+        Cache an answer. Writes tagged with a stale `generation` (i.e. started
+        before the last invalidation) are dropped.
+        """
+        vector = self._unit(embedding) if embedding is not None else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            key = (mode, normalize_query(query))
+            self._entries[key] = _Entry(answer=answer, embedding=vector, created_at=time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop every entry (called when the underlying collection is rebuilt)."""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries))
+        lookups = stats["exact_hits"] + stats["semantic_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["exact_hits"] + stats["semantic_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    @staticmethod
+    def _unit(embedding) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+
+# Process-wide cache shared by every recommender
+answer_cache = SemanticAnswerCache(
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+    similarity=settings.ANSWER_CACHE_SIMILARITY,
+)
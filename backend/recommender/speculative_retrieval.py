@@ -0,0 +1,191 @@
+"""
+speculative_retrieval.py — Prefetch retrieval for the raw question in AGENT mode.
+
+Most agent runs start with a single retrieve_context call whose query is
+a paraphrase of the user's question. With AGENT_SPECULATIVE_RETRIEVAL on,
+that retrieval starts as soon as the run begins — concurrently with the
+first model turn — and the agent's first matching retrieve_context call
+is answered from it instead of paying another embedding + search.
+
+A call is served from the prefetch when it asks for the filters the
+question implies (MetadataIndex.filters_for) and its query shares at
+least AGENT_SPECULATIVE_MIN_OVERLAP of its keywords (Jaccard) with the
+question. Anything else runs the tool normally.
+
+The prefetch runs the tool's ContextRetriever directly, so its
+retrieve_context latency and tool_context tokens are recorded only when
+the agent is served from it.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain.tools.tool_node import ToolCallRequest
+from langchain_core.messages import HumanMessage, ToolMessage
+
+from rag.keyword_index import tokenize
+from recommender.agent_limits import record
+from rag.metadata_index import MetadataFilter, MetadataIndex
+from tools.retrieval_tools import ContextRetriever, RetrievedContext
+from utils.logger import setup_logger
+from utils.metrics import TOKENS, observe
+
+logger = setup_logger(__name__, level=logging.INFO)
+
+# Prefetches of runs that ended without reaching after_agent (errors, limits) expire
+_STALE_SECONDS = 300
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
+
+
+@dataclass
+class _Prefetch:
+    question: str
+    metadata_filter: MetadataFilter
+    result: Future | asyncio.Future
+    started: float
+
+
+class SpeculativeRetrievalMiddleware(AgentMiddleware):
+    """Starts retrieve_context for the question up front and serves the agent's matching call from it."""
+
+    tool_name = "retrieve_context"
+
+    def __init__(
+        self, retriever: ContextRetriever, metadata_index: MetadataIndex | None = None, min_overlap: float = 0.5
+    ):
+        """
+        Args:
+            retriever: The retrieve_context tool's retriever (run directly, without metrics).
+            metadata_index: Derives the question's implied filters, and
+                canonicalizes the filters of tool calls for comparison.
+            min_overlap: Keyword Jaccard similarity between the tool query and
+                the question needed to serve the prefetched result.
+        """
+        super().__init__()
+        self.retriever = retriever
+        self.metadata_index = metadata_index
+        self.min_overlap = min_overlap
+        self._prefetches: dict[str, _Prefetch] = {}
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # 🚀 Start the prefetch with the run
+    # -----------------------------------------------------
+    @staticmethod
+    def _question(state) -> HumanMessage | None:
+        messages = state.get("messages", []) if isinstance(state, dict) else []
+        return next((m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+
+    def _filter(self, question: str) -> MetadataFilter:
+        return self.metadata_index.filters_for(question) if self.metadata_index else MetadataFilter()
+
+    def _register(self, message: HumanMessage, metadata_filter: MetadataFilter, result) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, p in self._prefetches.items() if now - p.started > _STALE_SECONDS]:
+                self._prefetches.pop(key).result.cancel()
+            self._prefetches[message.id] = _Prefetch(message.text, metadata_filter, result, now)
+
+    def before_agent(self, state, runtime):
+        message = self._question(state)
+        if message is not None and message.id:
+            metadata_filter = self._filter(message.text)
+            future = _executor.submit(self.retriever.retrieve, message.text, metadata_filter)
+            self._register(message, metadata_filter, future)
+        return None
+
+    async def abefore_agent(self, state, runtime):
+        message = self._question(state)
+        if message is not None and message.id:
+            metadata_filter = self._filter(message.text)
+            task = asyncio.ensure_future(self.retriever.aretrieve(message.text, metadata_filter))
+            self._register(message, metadata_filter, task)
+        return None
+
+    def after_agent(self, state, runtime):
+        message = self._question(state)
+        with self._lock:
+            prefetch = self._prefetches.pop(message.id, None) if message is not None else None
+        if prefetch is not None:
+            prefetch.result.cancel()
+        return None
+
+    async def aafter_agent(self, state, runtime):
+        return self.after_agent(state, runtime)
+
+    # -----------------------------------------------------
+    # 🎯 Serve the agent's first matching call
+    # -----------------------------------------------------
+    def _claim(self, request: ToolCallRequest) -> _Prefetch | None:
+        """Take the run's prefetch if this tool call asks for the same retrieval."""
+        if request.tool_call["name"] != self.tool_name:
+            return None
+        message = self._question(request.state)
+        if message is None:
+            return None
+        with self._lock:
+            prefetch = self._prefetches.get(message.id)
+        if prefetch is None:
+            return None
+
+        args = request.tool_call.get("args", {})
+        requested = MetadataFilter(
+            genres=tuple(args.get("genres") or ()),
+            min_score=args.get("min_score"),
+            type=args.get("type"),
+            min_year=args.get("min_year"),
+            max_year=args.get("max_year"),
+        )
+        if self.metadata_index is not None:
+            requested = self.metadata_index.resolve(requested)
+        if requested != prefetch.metadata_filter:
+            return None
+
+        asked, prefetched = set(tokenize(args.get("query", ""))), set(tokenize(prefetch.question))
+        if not asked or len(asked & prefetched) / len(asked | prefetched) < self.min_overlap:
+            return None
+
+        with self._lock:
+            # Serve each prefetch once; later calls ask for something new
+            return self._prefetches.pop(message.id, None)
+
+    def _message(self, request: ToolCallRequest, prefetch: _Prefetch, result: RetrievedContext) -> ToolMessage:
+        # Count the retrieval the tool would have recorded, now that it is used
+        observe(self.tool_name, result.seconds)
+        TOKENS.inc(result.tokens, kind="tool_context")
+        record("prefetch_hits")
+        logger.info(
+            f"[PREFETCH] {self.tool_name} -> '{request.tool_call['args'].get('query')}' served from prefetch "
+            f"started {time.monotonic() - prefetch.started:.3f}s ago"
+        )
+        return ToolMessage(
+            content=result.content, artifact=result.docs, name=self.tool_name, tool_call_id=request.tool_call["id"]
+        )
+
+    def wrap_tool_call(self, request: ToolCallRequest, handler):
+        prefetch = self._claim(request)
+        if prefetch is None or not isinstance(prefetch.result, Future):
+            return handler(request)
+        try:
+            result = prefetch.result.result()
+        except Exception as e:
+            logger.warning(f"⚠️ Prefetched retrieval failed ({e}) — running the tool call.")
+            return handler(request)
+        return self._message(request, prefetch, result)
+
+    async def awrap_tool_call(self, request: ToolCallRequest, handler):
+        prefetch = self._claim(request)
+        if prefetch is None:
+            return await handler(request)
+        try:
+            result = await asyncio.wrap_future(prefetch.result) if isinstance(prefetch.result, Future) else await prefetch.result
+        except Exception as e:
+            logger.warning(f"⚠️ Prefetched retrieval failed ({e}) — running the tool call.")
+            return await handler(request)
+        return self._message(request, prefetch, result)
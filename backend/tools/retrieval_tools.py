@@ -1,38 +1,173 @@
 # tools/retrieval_tools.py
-from langchain.tools import tool
+from langchain_core.tools import StructuredTool
 from langchain_chroma import Chroma
+from pydantic import BaseModel, Field
+from rag.context_builder import ContextBuilder
+from rag.retrieval import RetrievalConfig, search, asearch
+from rag.keyword_index import KeywordIndex
+from rag.metadata_index import MetadataFilter, MetadataIndex
+from rag.similarity_index import SimilarityIndex
 from utils.logger import setup_logger
+from utils.metrics import TOKENS, timed
+from dataclasses import dataclass
+import asyncio
 import logging
+import time
 
 logger = setup_logger(__name__, level=logging.INFO)
 
 
-def make_retrieve_context_tool(vector_store: Chroma):
+class RetrieveContextInput(BaseModel):
+    """Arguments of the retrieve_context tool."""
+
+    query: str = Field(..., description="What to search for.")
+    genres: list[str] = Field(default_factory=list, description="Only titles having all of these genres, e.g. ['Action'].")
+    min_score: float | None = Field(default=None, description="Only titles scored at least this (0-10).")
+    type: str | None = Field(default=None, description="Only this format: TV, Movie, OVA, ONA, Special.")
+    min_year: int | None = Field(default=None, description="Only titles released in or after this year.")
+    max_year: int | None = Field(default=None, description="Only titles released in or before this year.")
+
+
+@dataclass
+class RetrievedContext:
+    """One retrieve_context result and what it cost."""
+
+    content: str  # tool message text
+    docs: list  # tool message artifact
+    tokens: int
+    seconds: float
+
+
+class ContextRetriever:
+    """
+    retrieve_context's search and context compression, without metrics:
+    the tool records them for each call, the AGENT prefetch only for the
+    results the agent actually uses.
     """
-    Factory that returns a retrieval tool bound to a given vector_store.
 
-    Uses `as_retriever()` interface (LangChain 1.0) for standardized retrieval.
+    def __init__(
+        self,
+        vector_store: Chroma,
+        keyword_index: KeywordIndex | None = None,
+        metadata_index: MetadataIndex | None = None,
+        k: int = 3,
+        context_builder: ContextBuilder | None = None,
+        retrieval_config: RetrievalConfig | None = None,
+    ):
+        self.vector_store = vector_store
+        self.keyword_index = keyword_index
+        self.metadata_index = metadata_index
+        self.k = k
+        self.context_builder = context_builder or ContextBuilder()
+        self.retrieval_config = retrieval_config
+
+    def _search_kwargs(self, metadata_filter: MetadataFilter) -> dict:
+        return {
+            "keyword_index": self.keyword_index,
+            "metadata_filter": metadata_filter,
+            "metadata_index": self.metadata_index,
+            "config": self.retrieval_config,
+        }
+
+    def _format(self, query: str, docs, started: float) -> RetrievedContext:
+        # Compress retrieved content for LLM consumption
+        context = self.context_builder.build(query, docs)
+        logger.info(f"[TOOL] retrieve_context <- {context.describe()}")
+
+        # Return both raw text (for reasoning) and docs (for metadata)
+        return RetrievedContext(
+            f"Retrieved context:\n{context.text}", docs, context.tokens, time.perf_counter() - started
+        )
+
+    def retrieve(self, query: str, metadata_filter: MetadataFilter) -> RetrievedContext:
+        started = time.perf_counter()
+        docs = search(self.vector_store, query, k=self.k, **self._search_kwargs(metadata_filter))
+        return self._format(query, docs, started)
+
+    async def aretrieve(self, query: str, metadata_filter: MetadataFilter) -> RetrievedContext:
+        started = time.perf_counter()
+        docs = await asearch(self.vector_store, query, k=self.k, **self._search_kwargs(metadata_filter))
+        return self._format(query, docs, started)
+
+
+def make_retrieve_context_tool(retriever: ContextRetriever):
     """
+    Factory that returns a retrieval tool running `retriever` (hybrid BM25
+    + vector retrieval when it has a keyword_index, k documents per call,
+    compressed by its context builder).
 
-    # ✅ Step 1: Build retriever with fine-grained control
-    retriever = vector_store.as_retriever(
-        search_type="similarity",
-        search_kwargs={"k": 3},
+    Optional genre/score/type/year arguments are applied as metadata
+    filters before the search, so one call returns only matching titles.
+
+    The tool exposes both a sync and a native async implementation so it
+    runs without blocking the event loop when the agent is driven via
+    `astream()`.
+    """
+
+    def _filter(genres, min_score, type, min_year, max_year) -> MetadataFilter:
+        return MetadataFilter(
+            genres=tuple(genres or ()), min_score=min_score, type=type, min_year=min_year, max_year=max_year
         )
 
-    # ✅ Step 2: Define the actual tool callable
-    @tool(response_format="content_and_artifact", return_direct=False)
-    def retrieve_context(query: str):
+    def retrieve_context(query: str, genres=None, min_score=None, type=None, min_year=None, max_year=None):
         """Retrieve the most relevant anime context for the given query."""
         logger.info(f"[TOOL] retrieve_context -> {query}")
+        metadata_filter = _filter(genres, min_score, type, min_year, max_year)
+        with timed("retrieve_context"):
+            result = retriever.retrieve(query, metadata_filter)
+        TOKENS.inc(result.tokens, kind="tool_context")
+        return result.content, result.docs
 
-        # get_relevant_documents() is the standard retriever API
-        docs = retriever.invoke(query)
+    async def aretrieve_context(query: str, genres=None, min_score=None, type=None, min_year=None, max_year=None):
+        """Retrieve the most relevant anime context for the given query."""
+        logger.info(f"[TOOL] retrieve_context -> {query}")
+        metadata_filter = _filter(genres, min_score, type, min_year, max_year)
+        with timed("retrieve_context"):
+            result = await retriever.aretrieve(query, metadata_filter)
+        TOKENS.inc(result.tokens, kind="tool_context")
+        return result.content, result.docs
 
-        # join retrieved content for LLM consumption
-        context = "\n\n".join(d.page_content for d in docs)
+    return StructuredTool.from_function(
+        func=retrieve_context,
+        coroutine=aretrieve_context,
+        name="retrieve_context",
+        description=(
+            "Retrieve the most relevant anime context for the given query, "
+            "optionally filtered by genres, minimum score, type and release years."
+        ),
+        args_schema=RetrieveContextInput,
+        response_format="content_and_artifact",
+        return_direct=False,
+    )
 
-        # Return both raw text (for reasoning) and docs (for metadata)
-        return f"Retrieved context:\n{context}", docs
 
-    return retrieve_context
+def make_similar_titles_tool(similarity_index: SimilarityIndex, k: int = 10):
+    """
+    Factory that returns a "titles similar to X" tool backed by the
+    precomputed similarity index — an in-memory lookup, no embedding call
+    (typo'd titles fall back to a fuzzy scan, run off the event loop).
+    """
+
+    def find_similar_titles(title: str):
+        """Find the anime titles most similar to the given anime title."""
+        logger.info(f"[TOOL] find_similar_titles -> {title}")
+        result = similarity_index.similar(title, k=k)
+        if result is None:
+            return f"No anime titled '{title}' was found in the catalog.", []
+        matched, matches = result
+        lines = "\n".join(f"{i}. {name} (similarity {score:.2f})" for i, (name, score) in enumerate(matches, 1))
+        return f"Titles most similar to {matched}:\n{lines}", matches
+
+    async def afind_similar_titles(title: str):
+        """Find the anime titles most similar to the given anime title."""
+        # Exact matches are instant, but a miss falls back to an O(n) fuzzy scan of all titles
+        return await asyncio.to_thread(find_similar_titles, title)
+
+    return StructuredTool.from_function(
+        func=find_similar_titles,
+        coroutine=afind_similar_titles,
+        name="find_similar_titles",
+        description="Find the anime titles most similar to a given anime title (precomputed, instant).",
+        response_format="content_and_artifact",
+        return_direct=False,
+    )
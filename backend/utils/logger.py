@@ -1,10 +1,166 @@
+import atexit
+import copy
+import json
 import logging
-import sys
+import logging.handlers
 import os
-from config.settings import Settings
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from config.settings import get_settings
 
 # Initialize settings once globally
-settings = Settings()
+settings = get_settings()
+
+# Output handlers shared by every module logger (created on first use)
+_handlers: list[logging.Handler] | None = None
+_queue_handler: logging.Handler | None = None
+_listener: logging.handlers.QueueListener | None = None
+_handlers_lock = threading.Lock()
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records with the message merged and the traceback as text, for any formatter."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message (+ exception)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Thins out a logger's high-frequency records (INFO and below).
+
+    Keeps a `sample_rate` fraction of them and at most `per_second` per
+    second; warnings and errors always pass. The next record let through
+    after drops notes how many were suppressed.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, per_second: float = 0.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.per_second = per_second
+        self.suppressed = 0
+        self._window = 0
+        self._in_window = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        with self._lock:
+            keep = self.sample_rate >= 1 or random.random() < self.sample_rate
+            if keep and self.per_second > 0:
+                window = int(time.monotonic())
+                if window != self._window:
+                    self._window, self._in_window = window, 0
+                keep = self._in_window < self.per_second
+                self._in_window += keep
+            if not keep:
+                self.suppressed += 1
+                return False
+            suppressed, self.suppressed = self.suppressed, 0
+        if suppressed:
+            record.msg, record.args = f"{record.getMessage()} [+{suppressed} suppressed]", None
+        return True
+
+
+def _parse_rules(spec: str) -> dict[str, float]:
+    """'rag.retrieval=0.1,recommender=0.5' -> {'rag.retrieval': 0.1, 'recommender': 0.5}"""
+    rules = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        rules[name.strip()] = float(value)
+    return rules
+
+
+def _rule_for(name: str, rules: dict[str, float]) -> float | None:
+    """Most specific rule for a logger name ('rag' covers 'rag.retrieval')."""
+    matches = [prefix for prefix in rules if name == prefix or name.startswith(prefix + ".")]
+    return rules[max(matches, key=len)] if matches else None
+
+
+def _sampling_filter(name: str) -> SamplingFilter | None:
+    rate = _rule_for(name, _parse_rules(settings.LOG_SAMPLE_RATES))
+    limit = _rule_for(name, _parse_rules(settings.LOG_RATE_LIMITS))
+    if rate is None and limit is None:
+        return None
+    return SamplingFilter(1.0 if rate is None else rate, limit or 0.0)
+
+
+def _output_handlers() -> list[logging.Handler]:
+    """Console (+ local file) handlers, created once and shared by all loggers."""
+    global _handlers, _queue_handler, _listener
+    with _handlers_lock:
+        if _handlers is not None:
+            return [_queue_handler] if _queue_handler is not None else _handlers
+
+        if settings.LOG_FORMAT.lower() == "json":
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+        # --- Console handler (always enabled) ---
+        console_handler = logging.StreamHandler(sys.stderr if settings.LOG_STREAM.lower() == "stderr" else sys.stdout)
+        try:
+            console_handler.stream.reconfigure(encoding="utf-8")
+        except Exception:
+            pass  # Safe fallback for environments without reconfigure()
+        console_handler.setFormatter(formatter)
+        _handlers = [console_handler]
+
+        # --- File handler (only in local if enabled) ---
+        file_logging = getattr(settings, "ENABLE_FILE_LOGGING", True) and settings.ENVIRONMENT.lower() == "local"
+        if file_logging:
+            os.makedirs("logs", exist_ok=True)
+            file_handler = logging.FileHandler("logs/app.log", encoding="utf-8")
+            file_handler.setFormatter(formatter)
+            _handlers.append(file_handler)
+
+        # --- Queue mode: callers only enqueue, a listener thread does the I/O ---
+        if settings.LOG_QUEUE:
+            log_queue: queue.Queue = queue.Queue(-1)
+            _queue_handler = _QueueHandler(log_queue)
+            _listener = logging.handlers.QueueListener(log_queue, *_handlers, respect_handler_level=True)
+            _listener.start()
+            # Flush what is still queued when the process exits
+            atexit.register(_listener.stop)
+
+        status = "📜 File logging enabled (local environment)." if file_logging else (
+            f"☁️ Running in {settings.ENVIRONMENT.upper()} — logging to console only."
+        )
+        record = logging.LogRecord(__name__, logging.INFO, __file__, 0, status, None, None)
+        for handler in _handlers:
+            handler.handle(record)
+
+        return [_queue_handler] if _queue_handler is not None else _handlers
+
 
 def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     """
@@ -13,6 +169,12 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     Behavior:
       • Local environment: logs to console + file (if ENABLE_FILE_LOGGING=True)
       • Azure / other environments: logs only to console (stdout)
+      • LOG_QUEUE=True: records are handed to a background listener thread,
+        so console/file I/O stays off the calling (request) thread
+      • LOG_FORMAT=json: one JSON object per line
+      • LOG_STREAM=stderr: console logs go to stderr instead of stdout
+      • LOG_SAMPLE_RATES / LOG_RATE_LIMITS: per-logger sampling and
+        records-per-second caps for INFO and below
     """
 
     logger = logging.getLogger(name)
@@ -22,28 +184,11 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     if logger.hasHandlers():
         return logger
 
-    # --- Console handler (always enabled) ---
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    try:
-        console_handler.stream.reconfigure(encoding="utf-8")
-    except Exception:
-        pass  # Safe fallback for environments without reconfigure()
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
-    # --- File handler (only in local if enabled) ---
-    if getattr(settings, "ENABLE_FILE_LOGGING", True) and settings.ENVIRONMENT.lower() == "local":
-        os.makedirs("logs", exist_ok=True)
-        file_handler = logging.FileHandler("logs/app.log", encoding="utf-8")
-        file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-        logger.info("📜 File logging enabled (local environment).")
-    else:
-        logger.info(f"☁️ Running in {settings.ENVIRONMENT.upper()} — logging to console only.")
+    for handler in _output_handlers():
+        logger.addHandler(handler)
+
+    sampling = _sampling_filter(name)
+    if sampling is not None:
+        logger.addFilter(sampling)
 
     return logger
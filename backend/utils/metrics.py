@@ -0,0 +1,203 @@
+"""
+metrics.py — In-process latency histograms and counters, rendered in the
+Prometheus text exposition format (served on GET /metrics).
+
+Hot-path code wraps each stage in `timed("<stage>")`, which records the
+duration into the `anime_stage_seconds{stage=...}` histogram and, when a
+request is being tracked (`track_request()`), into that request's timing
+breakdown (returned as a Server-Timing header when TIMING_HEADERS is on).
+
+Stages:
+  request           whole recommend / stream call (incl. answer-cache lookup)
+  answer_cache      answer-cache lookup
+  embed_query       query embedding (cache hits included)
+  vector_search     Chroma similarity search
+  keyword_search    BM25 search (hybrid retrieval)
+  rerank            cross-encoder re-ranking and/or MMR
+  context_build     de-duplicating / compressing retrieved documents
+  prompt_context    CHAIN-mode retrieval + prompt filling (prompt_with_context)
+  retrieve_context  one retrieve_context tool call
+  first_token       time to the first generated token
+  generation        agent / chain run until the last token
+  build_*           VectorStoreBuilder phases (load, split, embed_batch,
+                    upsert_batch, indexes, total)
+
+Nothing here depends on prometheus_client; the registry is a handful of
+locked dicts, cheap enough to update on every request.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+# Seconds; covers sub-millisecond cache hits up to multi-minute builds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+_request_timings: ContextVar[dict[str, float] | None] = ContextVar("request_timings", default=None)
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels -> [per-bucket counts..., sum, count]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_number(cumulative)}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(values[-2])}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {_number(values[-1])}"
+
+
+# -----------------------------------------------------
+# 📊 Registry
+# -----------------------------------------------------
+STAGE_SECONDS = Histogram("anime_stage_seconds", "Latency of each recommendation / build stage.", ("stage",))
+HTTP_SECONDS = Histogram(
+    "anime_http_request_seconds", "HTTP request latency (until the response starts).", ("method", "route", "status")
+)
+TOKENS = Counter(
+    "anime_tokens_total",
+    "Tokens by kind: prompt (filled CHAIN prompt), tool_context (retrieve_context results), completion.",
+    ("kind",),
+)
+TOOL_CALLS = Counter("anime_tool_calls_total", "Tool calls issued by the agent.", ("tool",))
+
+_METRICS = [STAGE_SECONDS, HTTP_SECONDS, TOKENS, TOOL_CALLS]
+_collectors: list[Callable[[], Iterator[str]]] = []
+
+
+def register_collector(collector: Callable[[], Iterator[str]]) -> None:
+    """Add a callable yielding extra exposition lines (e.g. gauges read from elsewhere) at scrape time."""
+    _collectors.append(collector)
+
+
+def render() -> str:
+    """Every metric in the Prometheus text format (version 0.0.4)."""
+    lines = []
+    for metric in _METRICS:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------------------------------
+# ⏱️ Stage timing
+# -----------------------------------------------------
+def observe(stage: str, seconds: float) -> None:
+    """Record `seconds` for `stage` (and in the tracked request's breakdown)."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time the enclosed block as `stage`; failed attempts are recorded too."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def track_request() -> Iterator[dict[str, float]]:
+    """
+    Collect the stage timings of the enclosed work into a dict.
+
+    The dict is shared with worker threads started via asyncio.to_thread /
+    run_in_threadpool, which copy the context.
+    """
+    timings: dict[str, float] = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def server_timing(timings: dict[str, float]) -> str:
+    """Format stage timings as a Server-Timing header value (milliseconds)."""
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
@@ -2,7 +2,7 @@
 
 import { useState } from "react";
 import SearchBar from "./components/SearchBar";
-import { fetchRecommendations } from "@/lib/api";
+import { streamRecommendations } from "@/lib/api";
 
 export default function Home() {
   const [answer, setAnswer] = useState<string | null>(null);
@@ -16,8 +16,13 @@ export default function Home() {
     setAnswer(null);
 
     try {
-      const data = await fetchRecommendations(query);
-      setAnswer(data.answer || "No answer received.");
+      let received = "";
+      await streamRecommendations(query, (delta) => {
+        received += delta;
+        setAnswer(received);
+        setLoading(false);
+      });
+      if (!received) setAnswer("No answer received.");
     } catch (err) {
       console.error(err);
       setError("Failed to fetch recommendations.");
@@ -17,3 +17,54 @@ export async function fetchRecommendations(query: string) {
 
   return res.json();
 }
+
+/**
+ * Stream recommendations from the SSE endpoint, invoking `onDelta`
+ * for every text fragment as soon as the backend produces it.
+ */
+export async function streamRecommendations(
+  query: string,
+  onDelta: (delta: string) => void
+) {
+  const res = await fetch("http://localhost:8080/recommend/stream", {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({
+      question: query,
+      mode: "AGENT",
+    }),
+  });
+
+  if (!res.ok || !res.body) {
+    const errorText = await res.text();
+    throw new Error(`Failed to fetch recommendations: ${errorText}`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // SSE frames are separated by a blank line
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      const event = frame.match(/^event: (.*)$/m)?.[1];
+      const data = frame.match(/^data: (.*)$/m)?.[1];
+      if (!event || !data) continue;
+
+      const payload = JSON.parse(data);
+      if (event === "token") onDelta(payload.delta);
+      if (event === "error") throw new Error(payload.detail);
+    }
+  }
+}